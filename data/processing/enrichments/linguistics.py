@@ -14,19 +14,35 @@ This script processes each hymn to extract:
    - Noun chunks
    - Named entities
    - Syntactic patterns
+
+Linguistic features are streamed to `linguistic_features.jsonl`, one compact
+record per hymn (see tools/linguistics_format.py for the encoding and reader).
 """
 
+import argparse
+import hashlib
 import json
+import sys
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from collections import Counter
 import spacy
 from tqdm import tqdm
 
+# Make the tools package importable when run from the repository root
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+from tools.io_utils import JsonArrayWriter, atomic_write, iter_json_array, write_json_atomic
+from tools.linguistics_format import FeaturesWriter, features_have_lemmas, iter_compact_features
+
 # Constants
 DATA_DIR = Path("data")
 BASE_DIR = DATA_DIR / "base"
 LINGUISTICS_DIR = DATA_DIR / "enriched" / "linguistics"
+METRICS_PATH = LINGUISTICS_DIR / "text_metrics.json"
+FEATURES_PATH = LINGUISTICS_DIR / "linguistic_features.jsonl"
+SUMMARY_PATH = LINGUISTICS_DIR / "linguistics_summary.json"
+MANIFEST_PATH = LINGUISTICS_DIR / "linguistics_manifest.json"
+MANIFEST_VERSION = 2  # 2: features store lemmas
 
 class LinguisticsExtractor:
     """Extract linguistic features using spaCy"""
@@ -39,7 +55,19 @@ class LinguisticsExtractor:
         spacy.require_cpu()
         print("Model loaded successfully!")
     
-    def extract_text_metrics(self, hymn_data: Dict[str, Any]) -> Dict[str, Any]:
+    def parse_lines(self, hymn_data: Dict[str, Any]) -> List[Any]:
+        """Run the spaCy pipeline once over every line of a hymn"""
+        return list(self.nlp.pipe(hymn_data["lines"]))
+    
+    def extract(self, hymn_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Extract text metrics and linguistic features from a single parse of a hymn"""
+        docs = self.parse_lines(hymn_data)
+        return (
+            self.extract_text_metrics(hymn_data, docs),
+            self.extract_linguistic_features(hymn_data, docs)
+        )
+    
+    def extract_text_metrics(self, hymn_data: Dict[str, Any], docs: Optional[List[Any]] = None) -> Dict[str, Any]:
         """Extract basic text metrics from a hymn
         
         Includes:
@@ -47,6 +75,9 @@ class LinguisticsExtractor:
         - Line length statistics
         - Vocabulary statistics
         """
+        if docs is None:
+            docs = self.parse_lines(hymn_data)
+        
         metrics = {
             "hymn_id": hymn_data["hymn_id"],
             "total_words": 0,
@@ -60,9 +91,7 @@ class LinguisticsExtractor:
         all_words = []
         
         # Process each line
-        for i, line in enumerate(hymn_data["lines"], 1):
-            doc = self.nlp(line)
-            
+        for i, (line, doc) in enumerate(zip(hymn_data["lines"], docs), 1):
             # Get word and token counts
             words = [token.text.lower() for token in doc if not token.is_punct and not token.is_space]
             
@@ -89,33 +118,25 @@ class LinguisticsExtractor:
         
         return metrics
     
-    def extract_linguistic_features(self, hymn_data: Dict[str, Any]) -> Dict[str, Any]:
+    def extract_linguistic_features(self, hymn_data: Dict[str, Any], docs: Optional[List[Any]] = None) -> Dict[str, Any]:
         """Extract detailed linguistic features from a hymn
         
-        Includes:
-        - POS tags and frequencies
-        - Dependency relationships
-        - Noun chunks
+        Includes, per line:
+        - Tokens with lemmas and POS tags
+        - Dependency labels and head token indices
+        - Noun chunks (with character offsets and root token)
         - Named entities
-        - Syntactic patterns
         """
+        if docs is None:
+            docs = self.parse_lines(hymn_data)
+        
         features = {
             "hymn_id": hymn_data["hymn_id"],
-            "pos_counts": Counter(),
-            "dep_counts": Counter(),
-            "noun_chunks": [],
-            "entities": [],
             "per_line": []
         }
         
         # Process each line
-        for i, line in enumerate(hymn_data["lines"], 1):
-            doc = self.nlp(line)
-            
-            # Count POS tags and dependencies
-            features["pos_counts"].update(token.pos_ for token in doc)
-            features["dep_counts"].update(token.dep_ for token in doc)
-            
+        for i, (line, doc) in enumerate(zip(hymn_data["lines"], docs), 1):
             # Extract noun chunks
             line_chunks = []
             for chunk in doc.noun_chunks:
@@ -123,7 +144,10 @@ class LinguisticsExtractor:
                     "text": chunk.text,
                     "root_text": chunk.root.text,
                     "root_pos": chunk.root.pos_,
-                    "root_dep": chunk.root.dep_
+                    "root_dep": chunk.root.dep_,
+                    "start_char": chunk.start_char,
+                    "end_char": chunk.end_char,
+                    "root": chunk.root.i
                 })
             
             # Extract named entities
@@ -136,100 +160,230 @@ class LinguisticsExtractor:
                     "end_char": ent.end_char
                 })
             
-            # Store line features
+            # Store line features as parallel token columns
             features["per_line"].append({
                 "line_num": i,
+                "text": line,
+                "tokens": [token.text for token in doc],
+                "lemmas": [token.lemma_ for token in doc],
+                "pos": [token.pos_ for token in doc],
+                "dep": [token.dep_ for token in doc],
+                "heads": [token.head.i for token in doc],
                 "noun_chunks": line_chunks,
-                "entities": line_entities,
-                "pos_tags": [(token.text, token.pos_) for token in doc],
-                "dependencies": [(token.text, token.dep_, token.head.text) for token in doc]
+                "entities": line_entities
             })
-            
-            # Add chunks and entities to global lists
-            features["noun_chunks"].extend(line_chunks)
-            features["entities"].extend(line_entities)
-        
-        # Convert Counters to dicts for JSON serialization
-        features["pos_counts"] = dict(features["pos_counts"])
-        features["dep_counts"] = dict(features["dep_counts"])
         
         return features
 
-def process_hymns():
-    """Process all hymns and extract linguistic features"""
+def file_sha256(path: Path) -> str:
+    """Content hash of a base file"""
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+def hymn_aggregates(metrics: Dict[str, Any], features: Dict[str, Any]) -> Dict[str, Any]:
+    """Per-hymn counts that the corpus summary is built from"""
+    pos_counts = Counter()
+    entity_counts = Counter()
+    noun_counts = Counter()
+    
+    for line in features["per_line"]:
+        pos_counts.update(line["pos"])
+        entity_counts.update(e["text"] for e in line["entities"])
+        noun_counts.update(
+            chunk["root_text"] for chunk in line["noun_chunks"]
+            if chunk["root_pos"] == "NOUN"
+        )
+    
+    return {
+        "total_words": metrics["total_words"],
+        "vocabulary": sorted(metrics["vocabulary"]),
+        "pos_counts": dict(pos_counts),
+        "entity_counts": dict(entity_counts),
+        "noun_counts": dict(noun_counts)
+    }
+
+def build_summary(manifest: Dict[str, Any], total_hymns: int) -> Dict[str, Any]:
+    """Combine stored per-hymn aggregates into the corpus summary"""
+    entries = manifest["hymns"].values()
+    processed = len(entries)
+    total_words = 0
+    vocabulary = set()
+    pos_distribution = Counter()
+    entity_counts = Counter()
+    noun_counts = Counter()
+    
+    for entry in entries:
+        aggregates = entry["aggregates"]
+        total_words += aggregates["total_words"]
+        vocabulary.update(aggregates["vocabulary"])
+        pos_distribution.update(aggregates["pos_counts"])
+        entity_counts.update(aggregates["entity_counts"])
+        noun_counts.update(aggregates["noun_counts"])
+    
+    return {
+        "total_hymns": total_hymns,
+        "processed_hymns": processed,
+        "total_words": total_words,
+        "total_unique_words": len(vocabulary),
+        "avg_words_per_hymn": total_words / processed if processed else 0,
+        "pos_distribution": dict(pos_distribution),
+        "most_common_entities": dict(entity_counts.most_common(50)),
+        "most_common_nouns": dict(noun_counts.most_common(50))
+    }
+
+def load_manifest() -> Dict[str, Any]:
+    """Load the base-file manifest of the last run
+    
+    Returns an empty manifest when there is none, when it was written by an
+    incompatible version, when any of the outputs it describes is missing, or
+    when the features file predates lemmas (so every hymn is reprocessed
+    instead of copying lemma-less records into the new file).
+    """
+    empty = {"version": MANIFEST_VERSION, "hymns": {}}
+    if not MANIFEST_PATH.exists():
+        return empty
+    if not (METRICS_PATH.exists() and FEATURES_PATH.exists()):
+        return empty
+    if not features_have_lemmas(FEATURES_PATH):
+        return empty
+    
+    with open(MANIFEST_PATH, 'r') as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        return empty
+    return manifest
+
+def _merge_existing(records, order: List[Tuple[str, Optional[str]]], fresh: Dict[str, Any]):
+    """Interleave freshly extracted records with the unchanged ones from the last run
+    
+    Args:
+        records: Iterator over the previous output, in base-file order
+        order: (file name, hymn_id of the previous run or None) for every base file
+        fresh: Newly extracted records keyed by base file name
+    
+    Yields:
+        Records in base-file order
+    """
+    records = iter(records)
+    for file_name, hymn_id in order:
+        if file_name in fresh:
+            yield fresh[file_name]
+            continue
+        if hymn_id is None:
+            continue
+        
+        # Skip over records of removed or reprocessed hymns
+        for record in records:
+            if record["hymn_id"] == hymn_id:
+                yield record
+                break
+        else:
+            raise RuntimeError(
+                f"Hymn {hymn_id} ({file_name}) is listed in {MANIFEST_PATH} but missing "
+                f"from the existing outputs; re-run with --full"
+            )
+
+def process_hymns(full: bool = False):
+    """Process new or changed hymns and merge them into the existing outputs
+    
+    A manifest of base-file content hashes records what the outputs were
+    built from. Only hymns whose base file was added or changed since the
+    last run are parsed; the rest are copied over from the existing outputs.
+    Hymns are written one at a time, so memory use does not grow with the
+    size of the corpus.
+    
+    Args:
+        full: Ignore the manifest and reprocess every hymn
+    """
     
     # Create output directory
     LINGUISTICS_DIR.mkdir(parents=True, exist_ok=True)
     
-    # Initialize extractor
-    extractor = LinguisticsExtractor()
+    previous = {"version": MANIFEST_VERSION, "hymns": {}} if full else load_manifest()
     
-    # Initialize collectors
-    all_metrics = []
-    all_features = []
-    
-    # Process each hymn
+    # Find added, changed and removed base files
     hymn_files = sorted(BASE_DIR.glob("hymn_*.json"))
+    hashes = {hymn_file.name: file_sha256(hymn_file) for hymn_file in hymn_files}
+    
+    to_process = [
+        hymn_file for hymn_file in hymn_files
+        if previous["hymns"].get(hymn_file.name, {}).get("sha256") != hashes[hymn_file.name]
+    ]
+    removed = [name for name in previous["hymns"] if name not in hashes]
+    
+    print(f"\nFound {len(hymn_files)} hymns: {len(to_process)} new or changed, "
+          f"{len(removed)} removed, {len(hymn_files) - len(to_process)} unchanged")
     
-    print(f"\nProcessing {len(hymn_files)} hymns...")
+    if not to_process and not removed and SUMMARY_PATH.exists():
+        print("Linguistic features are up to date.")
+        return
     
-    for hymn_file in tqdm(hymn_files, desc="Extracting linguistic features"):
-        # Load hymn
-        with open(hymn_file, 'r') as f:
-            hymn_data = json.load(f)
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "hymns": {
+            name: entry for name, entry in previous["hymns"].items()
+            if name in hashes
+        }
+    }
+    
+    fresh_metrics = {}
+    fresh_features = {}
+    failed = set()
+    
+    if to_process:
+        # Initialize extractor
+        extractor = LinguisticsExtractor()
         
-        try:
-            # Extract features
-            metrics = extractor.extract_text_metrics(hymn_data)
-            features = extractor.extract_linguistic_features(hymn_data)
+        for hymn_file in tqdm(to_process, desc="Extracting linguistic features"):
+            # Load hymn
+            with open(hymn_file, 'r') as f:
+                hymn_data = json.load(f)
             
-            # Store results
-            all_metrics.append(metrics)
-            all_features.append(features)
+            try:
+                # Extract features
+                metrics, features = extractor.extract(hymn_data)
+            except Exception as e:
+                print(f"Error processing {hymn_file.name}: {e}")
+                manifest["hymns"].pop(hymn_file.name, None)
+                failed.add(hymn_file.name)
+                continue
             
-        except Exception as e:
-            print(f"Error processing {hymn_file.name}: {e}")
-            continue
+            fresh_metrics[hymn_file.name] = metrics
+            fresh_features[hymn_file.name] = features
+            manifest["hymns"][hymn_file.name] = {
+                "hymn_id": hymn_data["hymn_id"],
+                "sha256": hashes[hymn_file.name],
+                "aggregates": hymn_aggregates(metrics, features)
+            }
     
-    # Save results
-    with open(LINGUISTICS_DIR / "text_metrics.json", 'w') as f:
-        json.dump(all_metrics, f, indent=2)
-        
-    with open(LINGUISTICS_DIR / "linguistic_features.json", 'w') as f:
-        json.dump(all_features, f, indent=2)
-    
-    # Generate summary statistics
-    summary = {
-        "total_hymns": len(hymn_files),
-        "processed_hymns": len(all_metrics),
-        "total_words": sum(m["total_words"] for m in all_metrics),
-        "total_unique_words": len(set(word for m in all_metrics for word in m["vocabulary"].keys())),
-        "avg_words_per_hymn": sum(m["total_words"] for m in all_metrics) / len(all_metrics),
-        "pos_distribution": Counter(),
-        "most_common_entities": Counter(),
-        "most_common_nouns": Counter()
-    }
+    # Merge into the existing outputs, in base-file order; hymns that failed
+    # this time are dropped rather than kept with stale features
+    order = [
+        (hymn_file.name, None if hymn_file.name in failed
+         else previous["hymns"].get(hymn_file.name, {}).get("hymn_id"))
+        for hymn_file in hymn_files
+    ]
+    old_metrics = iter_json_array(METRICS_PATH) if previous["hymns"] else iter(())
+    old_features = iter_compact_features(FEATURES_PATH) if previous["hymns"] else iter(())
     
-    # Aggregate statistics
-    for features in all_features:
-        summary["pos_distribution"].update(features["pos_counts"])
-        summary["most_common_entities"].update(e["text"] for e in features["entities"])
-        summary["most_common_nouns"].update(
-            chunk["root_text"] for chunk in features["noun_chunks"]
-            if chunk["root_pos"] == "NOUN"
-        )
+    with atomic_write(METRICS_PATH) as metrics_file, JsonArrayWriter(metrics_file) as metrics_writer:
+        for metrics in _merge_existing(old_metrics, order, fresh_metrics):
+            metrics_writer.write(metrics)
     
-    # Convert Counters to dicts and get top items
-    summary["pos_distribution"] = dict(summary["pos_distribution"])
-    summary["most_common_entities"] = dict(summary["most_common_entities"].most_common(50))
-    summary["most_common_nouns"] = dict(summary["most_common_nouns"].most_common(50))
+    with FeaturesWriter(FEATURES_PATH) as features_writer:
+        for features in _merge_existing(old_features, order, fresh_features):
+            features_writer.write(features)
     
-    with open(LINGUISTICS_DIR / "linguistics_summary.json", 'w') as f:
-        json.dump(summary, f, indent=2)
+    # Update the summary from the stored per-hymn aggregates
+    summary = build_summary(manifest, len(hymn_files))
+    write_json_atomic(SUMMARY_PATH, summary)
+    
+    # The manifest goes last, so an interrupted run is simply redone
+    write_json_atomic(MANIFEST_PATH, manifest, indent=None)
     
     print("\nLinguistic processing complete!")
     print(f"Results saved in: {LINGUISTICS_DIR}")
-    print(f"\nProcessed {len(all_metrics)}/{len(hymn_files)} hymns")
+    print(f"\nParsed {len(fresh_features)}/{len(to_process)} new or changed hymns")
+    print(f"Processed {summary['processed_hymns']}/{len(hymn_files)} hymns")
     print(f"Total words: {summary['total_words']}")
     print(f"Unique words: {summary['total_unique_words']}")
     print(f"Average words per hymn: {summary['avg_words_per_hymn']:.1f}")
@@ -240,5 +394,14 @@ def process_hymns():
     for entity, count in list(summary["most_common_entities"].items())[:10]:
         print(f"  {entity}: {count}")
 
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Extract linguistic features from the base hymns")
+    parser.add_argument("--full", action="store_true",
+                        help="Reprocess every hymn instead of only new or changed ones")
+    args = parser.parse_args()
+    
+    process_hymns(full=args.full)
+
 if __name__ == "__main__":
-    process_hymns() 
\ No newline at end of file
+    main()
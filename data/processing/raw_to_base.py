@@ -35,24 +35,44 @@ The base dataset format for each hymn:
     }
 """
 
+import argparse
 import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import time
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 
 from sortes.extractors.normalizer import OrphicLineNormalizer
 
+# Allow running as a script from the repository root; like the linguistics
+# enrichment, this step uses the shared atomic writers in tools/io_utils.py
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from tools.io_utils import atomic_write, write_json_atomic
+
 # Constants
 DATA_DIR = Path("data")
 RAW_DATA = DATA_DIR / "raw" / "orphic_hymns.json"
 BASE_DIR = DATA_DIR / "base"
+STAGES = ("normalize", "serialize", "write")
+
+# One normalizer per pool worker, created by the pool initializer
+_normalizer: Optional[OrphicLineNormalizer] = None
+
+def get_normalizer() -> OrphicLineNormalizer:
+    """The worker-wide OrphicLineNormalizer"""
+    global _normalizer
+    if _normalizer is None:
+        _normalizer = OrphicLineNormalizer()
+    return _normalizer
 
-def process_hymn(hymn_id: str, hymn_data: Dict[str, Any]) -> Dict[str, Any]:
+def process_hymn(hymn_id: str, hymn_data: Dict[str, Any], normalizer: Optional[OrphicLineNormalizer] = None) -> Dict[str, Any]:
     """Process a single hymn into clean base format"""
     
-    # Create normalizer and process text
-    normalizer = OrphicLineNormalizer()
+    # A fresh normalizer per hymn unless the caller shares one
+    normalizer = normalizer or OrphicLineNormalizer()
     normalized = normalizer.normalize_hymn(hymn_data)
     
     return {
@@ -65,15 +85,60 @@ def process_hymn(hymn_id: str, hymn_data: Dict[str, Any]) -> Dict[str, Any]:
         "sequence": int(hymn_id)  # Position in collection
     }
 
-def process_raw_data(input_file: Path = RAW_DATA, output_dir: Path = BASE_DIR):
+def convert_hymn(hymn_id: str, hymn_data: Dict[str, Any], output_dir: Path,
+                 normalizer: Optional[OrphicLineNormalizer] = None) -> Dict[str, Any]:
+    """
+    Normalize, serialize and atomically write one hymn, timing each stage
+    
+    Returns:
+        Result record with hymn_id, status, line count (or error) and
+        per-stage timings in seconds
+    """
+    timings = {stage: 0.0 for stage in STAGES}
+    try:
+        stage_start = time.perf_counter()
+        processed = process_hymn(hymn_id, hymn_data, normalizer)
+        timings["normalize"] = time.perf_counter() - stage_start
+        
+        stage_start = time.perf_counter()
+        text = json.dumps(processed, indent=2)
+        timings["serialize"] = time.perf_counter() - stage_start
+        
+        stage_start = time.perf_counter()
+        with atomic_write(output_dir / f"hymn_{hymn_id}.json") as f:
+            f.write(text)
+        timings["write"] = time.perf_counter() - stage_start
+    except Exception as e:
+        return {"hymn_id": hymn_id, "status": "failed", "error": str(e), "timings": timings}
+    
+    return {"hymn_id": hymn_id, "status": "ok", "lines": len(processed["lines"]), "timings": timings}
+
+def convert_shard(shard: List[Tuple[str, Dict[str, Any]]], output_dir: Path,
+                  shared_normalizer: bool = False) -> List[Dict[str, Any]]:
+    """Convert a share of the hymns, optionally reusing the worker's normalizer"""
+    normalizer = get_normalizer() if shared_normalizer else None
+    return [convert_hymn(hymn_id, hymn_data, output_dir, normalizer) for hymn_id, hymn_data in shard]
+
+def _init_worker() -> None:
+    """Pool initializer: build the worker's normalizer once, before any hymn"""
+    get_normalizer()
+
+def process_raw_data(input_file: Path = RAW_DATA, output_dir: Path = BASE_DIR, workers: int = 1):
     """Process raw hymn data into clean base dataset
     
+    With one worker every hymn gets a fresh normalizer, as it always has.
+    With more, hymns are sharded round-robin across `workers` processes and
+    each process reuses one normalizer for its shard, which assumes the
+    normalizer keeps no state between hymns. Every hymn file is written
+    atomically and results are reported in input order.
+    
     Args:
         input_file: Path to raw orphic_hymns.json
         output_dir: Directory to save processed hymns
+        workers: Worker processes (1 processes the hymns in this process)
     """
     
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     # Verify input file exists
     if not input_file.exists():
@@ -86,42 +151,42 @@ def process_raw_data(input_file: Path = RAW_DATA, output_dir: Path = BASE_DIR):
     print(f"\nLoading raw data from {input_file}...")
     with open(input_file, 'r') as f:
         hymns = json.load(f)
+    load_time = time.perf_counter() - start_time
     
     # Create output directory
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Process each hymn
     total_hymns = len(hymns)
-    successful = 0
-    failed = 0
+    items = list(hymns.items())
+    workers = max(1, min(workers, total_hymns))
     
-    print(f"\nProcessing {total_hymns} hymns...")
+    print(f"\nProcessing {total_hymns} hymns" + (f" in {workers} worker processes..." if workers > 1 else "..."))
     
-    for i, (hymn_id, hymn_data) in enumerate(hymns.items(), 1):
-        hymn_start = time.time()
-        print(f"\nProcessing hymn {hymn_id}: {hymn_data['title']} ({i}/{total_hymns})")
-        
-        try:
-            # Process hymn
-            processed = process_hymn(hymn_id, hymn_data)
-            
-            # Save result
-            output_file = output_dir / f"hymn_{hymn_id}.json"
-            with open(output_file, 'w') as f:
-                json.dump(processed, f, indent=2)
-            
-            # Report progress
-            elapsed = time.time() - hymn_start
-            print(f"✓ Success: {len(processed['lines'])} lines in {elapsed:.1f}s")
+    if workers > 1:
+        shards = [items[i::workers] for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            shard_results = list(executor.map(convert_shard, shards, [output_dir] * workers, [True] * workers))
+        by_id = {result["hymn_id"]: result for results in shard_results for result in results}
+        results = [by_id[hymn_id] for hymn_id, _ in items]
+    else:
+        results = convert_shard(items, output_dir)
+    
+    successful = 0
+    failed = 0
+    stage_totals = {stage: 0.0 for stage in STAGES}
+    for (hymn_id, hymn_data), result in zip(items, results):
+        for stage in STAGES:
+            stage_totals[stage] += result["timings"][stage]
+        if result["status"] == "ok":
+            print(f"✓ Hymn {hymn_id}: {hymn_data['title']} - {result['lines']} lines "
+                  f"({sum(result['timings'].values()) * 1000:.1f} ms)")
             successful += 1
-            
-        except Exception as e:
-            print(f"✗ Error processing hymn {hymn_id}: {e}")
+        else:
+            print(f"✗ Error processing hymn {hymn_id}: {result['error']}")
             failed += 1
-            continue
     
     # Save summary
-    total_time = time.time() - start_time
+    total_time = time.perf_counter() - start_time
     summary = {
         "timestamp": datetime.now().isoformat(),
         "input_file": str(input_file),
@@ -129,26 +194,39 @@ def process_raw_data(input_file: Path = RAW_DATA, output_dir: Path = BASE_DIR):
         "total_hymns": total_hymns,
         "successful": successful,
         "failed": failed,
+        "failed_hymns": [result["hymn_id"] for result in results if result["status"] != "ok"],
+        "workers": workers,
         "total_time": total_time,
-        "average_time_per_hymn": total_time / total_hymns
+        "average_time_per_hymn": total_time / total_hymns,
+        # Stage times are summed over hymns (across workers), in seconds
+        "stage_times": {"load": load_time, **stage_totals},
+        "average_stage_times_per_hymn": {stage: stage_totals[stage] / total_hymns for stage in STAGES}
     }
     
-    with open(output_dir / "processing_summary.json", 'w') as f:
-        json.dump(summary, f, indent=2)
+    write_json_atomic(output_dir / "processing_summary.json", summary)
     
-    print(f"\nProcessing complete in {total_time:.1f}s!")
+    print(f"\nProcessing complete in {total_time:.2f}s!")
     print(f"Successful: {successful}/{total_hymns}")
     print(f"Failed: {failed}/{total_hymns}")
-    print(f"Average time per hymn: {summary['average_time_per_hymn']:.1f}s")
+    print("Time per stage: " + ", ".join(
+        f"{stage} {summary['stage_times'][stage] * 1000:.1f} ms" for stage in ("load",) + STAGES
+    ))
     print(f"Results saved in: {output_dir}")
 
 def main():
     """Main entry point with error handling"""
+    parser = argparse.ArgumentParser(description="Convert the raw Orphic Hymns into the base dataset")
+    parser.add_argument("--input", type=str, default=str(RAW_DATA), help="Raw orphic_hymns.json")
+    parser.add_argument("--output-dir", type=str, default=str(BASE_DIR), help="Base dataset directory")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes, each reusing one normalizer for its shard (0 = one per CPU)")
+    args = parser.parse_args()
+    
     try:
-        process_raw_data()
+        process_raw_data(Path(args.input), Path(args.output_dir), args.workers if args.workers > 0 else os.cpu_count() or 1)
     except Exception as e:
         print(f"\nError: {e}")
         exit(1)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -12,9 +12,9 @@ import httpx
 from pathlib import Path
 import sys
 
-# Add parent directory to path to import from entity_classifier
+# Add the repository root to the path to import from tools.entity_classifier
 sys.path.append(str(Path(__file__).resolve().parent.parent))
-from entity_classifier import classify_entity, DeityClassification
+from tools.entity_classifier import classify_entity, DeityClassification
 
 # Sample data
 EXAMPLE_ENTITIES = [
@@ -63,9 +63,7 @@ async def run_example():
             classification = await classify_entity(entity, context)
             
             # Print results
-            print(f"Result: {classification.category} (confidence: {classification.confidence:.2f})")
-            print(f"Description: {classification.description}")
-            print(f"Attributes: {', '.join(classification.attributes)}")
+            print(f"Result: {classification.category}")
             print("-" * 60)
             
             # Save for final output
@@ -85,7 +83,7 @@ async def run_example():
     print(f"\nResults saved to {output_file}")
     print("\nTo use this functionality in your own code:")
     print("""
-from entity_classifier import classify_entity
+from tools.entity_classifier import classify_entity
 
 async def main():
     classification = await classify_entity(
@@ -11,6 +11,7 @@ setup(
         "python-dotenv",
         "httpx",
         "pydantic",
+        "numpy",
         "spacy",
         "tiktoken",
         "tqdm",
@@ -0,0 +1,31 @@
+"""Regression tests for sentence_classifier's entity locations and annotation"""
+
+from tools.sentence_classifier import EntityLocation, SentenceEntityIndex, annotate_sentence
+
+LINE_KEY = "Hymn 0, Line 9"
+LINE = "and on the holy Daimon, I also call on Daimon baneful to mortals"
+
+def make_index() -> SentenceEntityIndex:
+    return SentenceEntityIndex(
+        {"Daimon": "Other"},
+        {LINE_KEY: [("Daimon", 16, 22, "0", 9), ("Daimon", 39, 45, "0", 9)]},
+        {LINE_KEY: LINE}
+    )
+
+def test_fuzzy_match_locates_each_occurrence_of_a_repeated_entity():
+    locations = make_index().classify(LINE)
+    assert [(loc.start, loc.end) for loc in locations] == [(16, 22), (39, 45)]
+
+def test_annotate_marks_a_repeated_entity_once_per_occurrence():
+    annotated = annotate_sentence(LINE, make_index().classify(LINE))
+    assert annotated == "and on the holy «Daimon[Other], I also call on «Daimon[Other] baneful to mortals"
+
+def test_annotate_skips_duplicate_and_overlapping_locations():
+    locations = [
+        EntityLocation("Daimon", "Other", 16, 22),
+        EntityLocation("Daimon", "Other", 16, 22),
+        EntityLocation("holy Daimon", "Other", 11, 22),
+        EntityLocation("Daimon", "Other", 39, 45)
+    ]
+    annotated = annotate_sentence(LINE, locations)
+    assert annotated == "and on the «holy Daimon[Other], I also call on «Daimon[Other] baneful to mortals"
@@ -3,56 +3,49 @@
 Script to check how numerals are labeled in the linguistic features.
 """
 
-import json
+import sys
 from pathlib import Path
 
-# Load the linguistic features data
-LINGUISTICS_DIR = Path("data") / "enriched" / "linguistics"
-features_path = LINGUISTICS_DIR / "linguistic_features.json"
+# Allow running as a script from the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tools.corpus_db import open_corpus_db
+from tools.entity_index import load_entity_index
 
-with open(features_path, 'r') as f:
-    features_data = json.load(f)
+# Load the entity occurrence index (numeric entities are kept aside, with the reason)
+index = load_entity_index()
+numeric_entities = index.numeric_entities()
 
 # Words to check
 numeric_words = [
     "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
-    "first", "second", "third", "fourth", "fifth", 
+    "first", "second", "third", "fourth", "fifth",
     "thrice", "twice", "once"
 ]
 
+# Every numeric word in the corpus with the entity (if any) covering it
+conn = open_corpus_db()
+rows = conn.execute(f"""
+    SELECT t.text, t.pos, l.hymn_id, l.line_num, e.text, e.label
+    FROM tokens t
+    JOIN lines l ON l.line_id = t.line_id
+    LEFT JOIN entities e ON e.line_id = t.line_id
+        AND t.start_char >= e.start_char AND t.end_char <= e.end_char
+    WHERE lower(t.text) IN ({", ".join("?" * len(numeric_words))})
+    ORDER BY t.line_id, t.position
+""", numeric_words).fetchall()
+conn.close()
+
 # Track findings
 findings = []
-
-# Search through data
-for hymn in features_data[:20]:  # Limit to first 20 hymns for speed
-    hymn_id = hymn.get("hymn_id", "unknown")
-    
-    for line_data in hymn.get("per_line", []):
-        line_num = line_data.get("line_num", 0)
-        pos_tags = line_data.get("pos_tags", [])
-        
-        for pos_tag in pos_tags:
-            if isinstance(pos_tag, list) and len(pos_tag) >= 2:
-                word, pos = pos_tag[0], pos_tag[1]
-                
-                if word.lower() in numeric_words:
-                    # Check if this word is also in entities
-                    is_entity = False
-                    entity_label = None
-                    for entity in line_data.get("entities", []):
-                        if entity.get("text") == word:
-                            is_entity = True
-                            entity_label = entity.get("label", "")
-                            break
-                    
-                    findings.append({
-                        "word": word,
-                        "pos": pos,
-                        "hymn_id": hymn_id,
-                        "line_num": line_num,
-                        "is_entity": is_entity,
-                        "entity_label": entity_label
-                    })
+for word, pos, hymn_id, line_num, entity_text, entity_label in rows:
+    findings.append({
+        "word": word,
+        "pos": pos,
+        "hymn_id": hymn_id,
+        "line_num": line_num,
+        "is_entity": entity_text == word,
+        "entity_label": entity_label if entity_text == word else None
+    })
 
 # Print findings
 if findings:
@@ -62,31 +55,17 @@ if findings:
 else:
     print("No numeric words found in the checked hymns.")
 
-# Now check how numeric values are labeled
-numeric_values = []
-
-for hymn in features_data[:20]:  # Limit to first 20 hymns for speed
-    hymn_id = hymn.get("hymn_id", "unknown")
-    
-    for line_data in hymn.get("per_line", []):
-        line_num = line_data.get("line_num", 0)
-        
-        for entity in line_data.get("entities", []):
-            entity_text = entity.get("text", "")
-            entity_label = entity.get("label", "")
-            
-            # Check if entity is a number or looks like a number
-            if entity_text.isdigit() or (entity_text and entity_text[0].isdigit()):
-                numeric_values.append({
-                    "entity": entity_text,
-                    "label": entity_label,
-                    "hymn_id": hymn_id,
-                    "line_num": line_num
-                })
-
-if numeric_values:
-    print(f"\nFound {len(numeric_values)} numeric entities:")
-    for value in numeric_values:
-        print(f"Entity: {value['entity']}, Label: {value['label']}, Location: Hymn {value['hymn_id']}, Line {value['line_num']}")
+# Now check how numeric entities were labeled and why they were filtered
+if numeric_entities:
+    print(f"\nFound {len(numeric_entities)} numeric entities (removed from the entity index):")
+    for occurrence, label, reason in numeric_entities:
+        print(f"Entity: {occurrence.entity}, Label: {label}, Filtered by: {reason}, Location: Hymn {occurrence.hymn_id}, Line {occurrence.line_num}")
 else:
-    print("\nNo numeric entities found in the checked hymns.") 
\ No newline at end of file
+    print("\nNo numeric entities found in the entity index.")
+
+# Entities that start with a digit but were kept
+digit_entities = [o for o in index if o.entity[:1].isdigit()]
+if digit_entities:
+    print(f"\nFound {len(digit_entities)} kept entities starting with a digit:")
+    for occurrence in digit_entities:
+        print(f"Entity: {occurrence.entity}, Location: Hymn {occurrence.hymn_id}, Line {occurrence.line_num}")
@@ -0,0 +1,107 @@
+"""
+Append-only on-disk cache of entity classifications.
+
+Each classification is appended to a JSONL file as soon as it arrives, keyed
+by (model, entity, SHA-256 of the context). An interrupted batch run loses
+nothing, and a rerun only asks the LLM about entities (or contexts) it has
+not seen before.
+
+Record format, one per line:
+    {"model": "gemma3:27b", "entity": "Zeus", "context_sha256": "...", "category": "Olympian"}
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# Constants
+DATA_DIR = Path("data")
+DEITIES_DIR = DATA_DIR / "enriched" / "deities"
+CACHE_PATH = DEITIES_DIR / "classification_cache.jsonl"
+
+# Results worth asking the LLM about again
+UNCACHEABLE_CATEGORIES = {"Error", "Unknown"}
+
+def context_hash(context: str) -> str:
+    """SHA-256 of a classification context"""
+    return hashlib.sha256(context.encode("utf-8")).hexdigest()
+
+class ClassificationCache:
+    """Append-only JSONL cache of (model, entity, context) -> category"""
+
+    def __init__(self, path: Path = CACHE_PATH):
+        self.path = Path(path)
+        self.entries: Dict[Tuple[str, str, str], str] = {}
+        self.hits = 0
+        self.misses = 0
+        self._f = None
+        self._load()
+
+    def _load(self) -> None:
+        """Read existing records; a torn last line from a crash is ignored"""
+        if not self.path.exists():
+            return
+        with open(self.path, 'r', encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                key = (record["model"], record["entity"], record["context_sha256"])
+                self.entries[key] = record["category"]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __enter__(self) -> "ClassificationCache":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def get(self, model: str, entity: str, context: str) -> Optional[str]:
+        """Cached category, or None"""
+        category = self.entries.get((model, entity, context_hash(context)))
+        if category is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return category
+
+    def put(self, model: str, entity: str, context: str, category: str) -> None:
+        """Record a classification and append it to disk immediately"""
+        if category in UNCACHEABLE_CATEGORIES:
+            return
+        digest = context_hash(context)
+        self.entries[(model, entity, digest)] = category
+
+        if self._f is None:
+            self._open_for_append()
+        self._f.write(json.dumps({
+            "model": model,
+            "entity": entity,
+            "context_sha256": digest,
+            "category": category
+        }, ensure_ascii=False))
+        self._f.write("\n")
+        self._f.flush()
+
+    def _open_for_append(self) -> None:
+        """Open the append handle, terminating a torn last line left by a crash"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        torn = False
+        if self.path.exists() and self.path.stat().st_size:
+            with open(self.path, 'rb') as f:
+                f.seek(-1, 2)
+                torn = f.read(1) != b"\n"
+        self._f = open(self.path, 'a', encoding="utf-8")
+        if torn:
+            # Otherwise the next record would be glued onto the torn line and lost with it
+            self._f.write("\n")
+
+    def close(self) -> None:
+        """Close the append handle"""
+        if self._f is not None:
+            self._f.close()
+            self._f = None
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Classification Maintenance for Cleros Orphicae
+
+This script applies declarative maintenance rules and consistency checks to
+deity_classifications.json in a single streaming pass. check_categories.py,
+normalize_categories.py and clean_classifications.py are thin wrappers that
+select a subset of the rules below.
+
+Each rule has a `when` condition and an action: `set_category` or `drop`.
+Conditions are combined with AND:
+    entity              entity text equals the value
+    category            category equals the value
+    category_contains   category contains the value (case-insensitive)
+    category_not        category differs from the value
+
+Rules run in table order on every record, so a record reclassified by an
+earlier rule is no longer matched by a later rule on its old category.
+Checks report matching records as they were read, before any rule.
+
+The file is only rewritten (atomically) when a rule changed something;
+--dry-run prints the diff instead.
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Allow running as a script from the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tools.corpus import CLASSIFICATIONS_PATH
+from tools.io_utils import JsonArrayWriter, atomic_write, iter_json_array
+
+RULES: List[Dict[str, Any]] = [
+    {
+        "name": "normalize-titan",
+        "description": "Normalize Titan variants such as 'Titan (pre-Olympian primordial deities)'",
+        "when": {"category_contains": "titan", "category_not": "Titan"},
+        "set_category": "Titan"
+    },
+    {
+        "name": "reclassify-lydians",
+        "description": "Lydians are a people, not an irrelevant mention",
+        "when": {"entity": "Lydians", "category": "IRRELEVANT"},
+        "set_category": "Other"
+    },
+    {
+        "name": "drop-irrelevant",
+        "description": "Remove entries classified as IRRELEVANT",
+        "when": {"category": "IRRELEVANT"},
+        "drop": True
+    }
+]
+
+CHECKS: List[Dict[str, Any]] = [
+    {
+        "name": "titan-variants",
+        "title": "Variants of 'Titan'",
+        "when": {"category_contains": "titan", "category_not": "Titan"}
+    },
+    {
+        "name": "irrelevant",
+        "title": "Entities marked as IRRELEVANT",
+        "when": {"category": "IRRELEVANT"}
+    }
+]
+
+CONDITIONS = {
+    "entity": lambda item, value: item.get("entity") == value,
+    "category": lambda item, value: item.get("category") == value,
+    "category_contains": lambda item, value: value.lower() in item.get("category", "").lower(),
+    "category_not": lambda item, value: item.get("category") != value
+}
+
+def matches(when: Dict[str, str], item: Dict[str, Any]) -> bool:
+    """Whether a record satisfies every condition of a rule or check"""
+    return all(CONDITIONS[condition](item, value) for condition, value in when.items())
+
+def select(table: List[Dict[str, Any]], names: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """
+    Pick entries of RULES or CHECKS by name, keeping table order
+
+    Args:
+        table: RULES or CHECKS
+        names: Names to keep; None keeps every entry
+
+    Raises:
+        ValueError: For unknown names or conditions
+    """
+    known = {entry["name"] for entry in table}
+    unknown = set(names or []) - known
+    if unknown:
+        raise ValueError(f"Unknown name(s) {', '.join(sorted(unknown))}; expected one of {', '.join(sorted(known))}")
+    selected = [entry for entry in table if names is None or entry["name"] in names]
+    for entry in selected:
+        bad = set(entry["when"]) - set(CONDITIONS)
+        if bad:
+            raise ValueError(f"{entry['name']}: unknown condition(s) {', '.join(sorted(bad))}")
+    return selected
+
+class MaintenanceReport:
+    """Everything observed during one maintenance pass"""
+    def __init__(self):
+        self.read = 0
+        self.written = 0
+        self.before: Counter = Counter()
+        self.after: Counter = Counter()
+        self.applied: Counter = Counter()
+        self.findings: Dict[str, List[Dict[str, Any]]] = {}
+        self.diff: List[str] = []
+        self.saved = False
+
+    @property
+    def changes(self) -> int:
+        return sum(self.applied.values())
+
+    def __repr__(self):
+        return f"MaintenanceReport(read={self.read}, written={self.written}, changes={self.changes}, saved={self.saved})"
+
+class _Unchanged(Exception):
+    """Raised inside atomic_write to discard the temporary output"""
+
+def apply_rules(item: Dict[str, Any], rules: List[Dict[str, Any]], report: MaintenanceReport) -> Optional[Dict[str, Any]]:
+    """
+    Run the rules on one record
+
+    Returns:
+        The (possibly updated) record, or None if a rule dropped it
+    """
+    original = item
+    location = f"Hymn {item.get('hymn_id')}, Line {item.get('line_num')}"
+    for rule in rules:
+        if not matches(rule["when"], item):
+            continue
+        report.applied[rule["name"]] += 1
+        if rule.get("drop"):
+            report.diff.append(f"- {location} [{rule['name']}] {json.dumps(original, ensure_ascii=False)}")
+            return None
+        item = dict(item, category=rule["set_category"])
+
+    if item is not original:
+        report.diff.append(f"~ {location} {item.get('entity')}: {original.get('category')} -> {item['category']}")
+    return item
+
+def run_maintenance(
+    path: Path = CLASSIFICATIONS_PATH,
+    rule_names: Optional[List[str]] = None,
+    check_names: Optional[List[str]] = None,
+    dry_run: bool = False
+) -> MaintenanceReport:
+    """
+    Apply rules and checks to a classification file in one pass
+
+    Records are streamed from the file and, unless dry_run is set, streamed to
+    a temporary file that replaces the original only if a rule changed
+    something.
+
+    Args:
+        path: Classification file (JSON array)
+        rule_names: Rules to apply; None applies all, [] applies none
+        check_names: Checks to run; None runs all, [] runs none
+        dry_run: Never write, only report (the diff is in report.diff)
+
+    Returns:
+        The pass's MaintenanceReport
+    """
+    rules = select(RULES, rule_names)
+    checks = select(CHECKS, check_names)
+    report = MaintenanceReport()
+    report.findings = {check["name"]: [] for check in checks}
+
+    def process(writer: Optional[JsonArrayWriter]) -> None:
+        for item in iter_json_array(path):
+            report.read += 1
+            report.before[item.get("category")] += 1
+            for check in checks:
+                if matches(check["when"], item):
+                    report.findings[check["name"]].append(item)
+
+            item = apply_rules(item, rules, report)
+            if item is None:
+                continue
+            report.written += 1
+            report.after[item.get("category")] += 1
+            if writer is not None:
+                writer.write(item)
+
+    if dry_run or not rules:
+        process(None)
+        return report
+
+    try:
+        with atomic_write(path) as f:
+            # Keep the file's indent=2 layout, so a rewrite only diffs the changed records
+            with JsonArrayWriter(f, indent=2) as writer:
+                process(writer)
+            if not report.changes:
+                raise _Unchanged()
+        report.saved = True
+    except _Unchanged:
+        pass
+    return report
+
+def print_counts(title: str, counts: Counter) -> None:
+    print(title)
+    for category, count in sorted(counts.items(), key=lambda x: (-x[1], str(x[0]))):
+        print(f"  {category}: {count}")
+
+def print_report(report: MaintenanceReport, path: Path, dry_run: bool = False, show_counts_after: bool = True) -> None:
+    """Print category counts, check findings, rule counts and the diff"""
+    print_counts("Categories found:", report.before)
+
+    for check in CHECKS:
+        found = report.findings.get(check["name"])
+        if found:
+            print(f"\n{check['title']}:")
+            for item in found:
+                print(f"  {item.get('entity')}: {item.get('category')}")
+
+    if not report.changes:
+        if show_counts_after:
+            print("\nNo changes needed, file not updated.")
+        return
+
+    if dry_run:
+        print(f"\nDiff ({len(report.diff)} records):")
+        for line in report.diff:
+            print(f"  {line}")
+
+    if show_counts_after:
+        print()
+        print_counts("Categories after maintenance:", report.after)
+
+    print("\nRules applied:")
+    for rule in RULES:
+        if report.applied[rule["name"]]:
+            print(f"  {rule['name']}: {report.applied[rule['name']]}")
+    print(f"\n{report.read} entries read, {report.written} kept, {report.changes} changes")
+    if report.saved:
+        print(f"Updated classifications saved to {path}")
+    elif dry_run:
+        print("Dry run: file not updated.")
+
+def main(default_rules: Optional[List[str]] = None, description: str = "Apply classification maintenance rules"):
+    """
+    Main entry point
+
+    Args:
+        default_rules: Rules applied when --rules is not given (None means all);
+            used by the wrapper scripts
+        description: Command-line description
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--input", type=str, default=str(CLASSIFICATIONS_PATH), help="Classification file")
+    parser.add_argument("--rules", type=str, default=None,
+                        help="Comma-separated rules to apply (empty for checks only)")
+    parser.add_argument("--dry-run", action="store_true", help="Print the diff without writing")
+    parser.add_argument("--list-rules", action="store_true", help="List the rules and checks")
+    args = parser.parse_args()
+
+    if args.list_rules:
+        for rule in RULES:
+            action = "drop" if rule.get("drop") else f"set category to {rule['set_category']}"
+            print(f"{rule['name']}: {rule['description']} (when {rule['when']}: {action})")
+        for check in CHECKS:
+            print(f"check {check['name']}: {check['title']} (when {check['when']})")
+        return
+
+    if args.rules is not None:
+        rule_names = [name for name in args.rules.split(",") if name]
+    else:
+        rule_names = default_rules
+
+    path = Path(args.input)
+    if not path.exists():
+        parser.error(f"classification file not found: {path}")
+    try:
+        report = run_maintenance(path, rule_names, dry_run=args.dry_run)
+    except ValueError as e:
+        parser.error(str(e))
+    print_report(report, path, args.dry_run, show_counts_after=bool(select(RULES, rule_names)))
+
+if __name__ == "__main__":
+    main()
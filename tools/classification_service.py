@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Classification Service for Cleros Orphicae
+
+This script serves sentence classification and annotation over local HTTP,
+so other tools can reuse one warm SentenceEntityIndex (and the Aho-Corasick
+pattern annotator) instead of starting sentence_classifier.py per sentence.
+
+Endpoints (JSON in, JSON out):
+    GET  /health            index sizes
+    POST /classify          {"sentence": ..., "hymn_id": ..., "line_num": ...}
+    POST /classify/batch    {"sentences": [<sentence object or string>, ...]}
+    POST /annotate          like /classify, plus the annotated sentence
+    POST /annotate/batch    like /classify/batch, plus the annotated sentences
+
+Requests may set "matcher": "lines" (default; SentenceEntityIndex, i.e.
+hymn/line lookup with fuzzy line matching) or "patterns" (Aho-Corasick over
+every classified entity string). Classification takes microseconds, so
+requests are handled directly on the event loop.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from aiohttp import web
+
+# Allow running as a script from the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tools.entity_annotator import AhoCorasickAnnotator
+from tools.entity_ruler import load_entity_patterns
+from tools.sentence_classifier import EntityLocation, SentenceEntityIndex, annotate_sentence
+
+# Constants
+DEFAULT_PORT = 8765
+MAX_BATCH = 10000  # Sentences per batch request
+MATCHERS = ("lines", "patterns")
+
+class RequestError(Exception):
+    """Invalid request body, answered with HTTP 400"""
+
+def parse_sentence(item: Any) -> Tuple[str, Any, Any]:
+    """
+    Read one sentence from a request
+
+    Args:
+        item: A string, or an object with "sentence" and optional "hymn_id"/"line_num"
+
+    Returns:
+        (sentence, hymn_id, line_num)
+    """
+    if isinstance(item, str):
+        return item, None, None
+    if not isinstance(item, dict) or not isinstance(item.get("sentence"), str):
+        raise RequestError('each sentence must be a string or an object with a "sentence" string')
+    line_num = item.get("line_num")
+    # bool is a subclass of int, but true/false are not line numbers
+    if line_num is not None and (isinstance(line_num, bool) or not isinstance(line_num, int)):
+        raise RequestError('"line_num" must be an integer')
+    hymn_id = item.get("hymn_id")
+    return item["sentence"], None if hymn_id is None else str(hymn_id), line_num
+
+class ClassificationService:
+    """Request handlers around a loaded index and annotator"""
+
+    def __init__(self, index: SentenceEntityIndex, annotator: AhoCorasickAnnotator):
+        self.index = index
+        self.annotator = annotator
+        self.started = time.time()
+        self.requests = 0
+        self.sentences = 0
+
+    @classmethod
+    def load(cls) -> "ClassificationService":
+        """Load the sentence index and compile the pattern annotator"""
+        return cls(SentenceEntityIndex.load(), AhoCorasickAnnotator(load_entity_patterns()))
+
+    def locate(self, sentence: str, hymn_id: Any, line_num: Any, matcher: str) -> List[EntityLocation]:
+        """Entity locations of one sentence with the chosen matcher"""
+        if matcher == "patterns":
+            return [EntityLocation(m.text, m.category, m.start, m.end) for m in self.annotator.find(sentence)]
+        return self.index.classify(sentence, hymn_id, line_num)
+
+    def result(self, item: Any, matcher: str, annotate: bool) -> Dict[str, Any]:
+        """Response object for one sentence"""
+        sentence, hymn_id, line_num = parse_sentence(item)
+        locations = self.locate(sentence, hymn_id, line_num, matcher)
+        result = {
+            "entities": [
+                {"entity": loc.entity, "category": loc.category, "start": loc.start, "end": loc.end}
+                for loc in locations
+            ]
+        }
+        if annotate:
+            result["annotated"] = annotate_sentence(sentence, locations)
+        return result
+
+    async def _body(self, request: web.Request) -> Tuple[Dict[str, Any], str]:
+        """Decoded JSON object body and its matcher"""
+        try:
+            body = await request.json()
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise RequestError("request body is not valid UTF-8 JSON")
+        if not isinstance(body, dict):
+            raise RequestError("request body must be a JSON object")
+        matcher = body.get("matcher", "lines")
+        if matcher not in MATCHERS:
+            raise RequestError(f'"matcher" must be one of {", ".join(MATCHERS)}')
+        return body, matcher
+
+    def _handler(self, annotate: bool, batch: bool):
+        """Build a single or batch classify/annotate handler"""
+        async def handle(request: web.Request) -> web.Response:
+            self.requests += 1
+            try:
+                body, matcher = await self._body(request)
+                if not batch:
+                    self.sentences += 1
+                    return web.json_response(self.result(body, matcher, annotate))
+
+                items = body.get("sentences")
+                if not isinstance(items, list):
+                    raise RequestError('"sentences" must be a list')
+                if len(items) > MAX_BATCH:
+                    raise RequestError(f"at most {MAX_BATCH} sentences per batch")
+                self.sentences += len(items)
+                return web.json_response({"results": [self.result(item, matcher, annotate) for item in items]})
+            except RequestError as e:
+                return web.json_response({"error": str(e)}, status=400)
+        return handle
+
+    async def health(self, request: web.Request) -> web.Response:
+        """GET /health"""
+        return web.json_response({
+            "status": "ok",
+            "entities": len(self.index.classifications),
+            "lines": len(self.index.line_entities),
+            "patterns": self.annotator.size,
+            "requests": self.requests,
+            "sentences": self.sentences,
+            "uptime": round(time.time() - self.started, 1)
+        })
+
+    def app(self) -> web.Application:
+        """aiohttp application serving the classification endpoints"""
+        app = web.Application(client_max_size=16 * 1024 * 1024)
+        app.router.add_get("/health", self.health)
+        app.router.add_post("/classify", self._handler(annotate=False, batch=False))
+        app.router.add_post("/classify/batch", self._handler(annotate=False, batch=True))
+        app.router.add_post("/annotate", self._handler(annotate=True, batch=False))
+        app.router.add_post("/annotate/batch", self._handler(annotate=True, batch=True))
+        return app
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Serve sentence classification over local HTTP")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    service = ClassificationService.load()
+    print(f"Loaded {service.index!r} and {service.annotator!r} in {time.perf_counter() - start_time:.2f}s")
+    print(f"Classification service listening on http://{args.host}:{args.port}")
+    web.run_app(service.app(), host=args.host, port=args.port, print=None, access_log=None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Classifier Load Test for Cleros Orphicae
+
+This script drives the entity classifier's request path (shared client,
+bounded concurrency, multi-entity prompts with single-entity fallback)
+against an Ollama server and reports throughput and tail latency for each
+concurrency / group size combination.
+
+By default it starts the fake server from fake_ollama.py in-process, so runs
+are reproducible; pass --url to load-test a real Ollama instead.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Allow running as a script from the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tools.entity_classifier import DEFAULT_MODEL, classify_entity_group, load_entity_contexts
+from tools.fake_ollama import add_fake_arguments, fake_from_args, start_fake_ollama
+from tools.ollama_client import OllamaClient
+from tools.rate_control import AdaptiveLimiter
+
+# Constants
+FAKE_PORT = 11435  # Keeps the in-process fake clear of a real Ollama on 11434
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not ordered:
+        return 0.0
+    rank = min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+def latency_report(latencies: List[float]) -> str:
+    """p50 / p95 / p99 / max of request latencies in milliseconds"""
+    ordered = sorted(latencies)
+    return " ".join(
+        f"{label} {percentile(ordered, q) * 1000:.0f}ms"
+        for label, q in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))
+    )
+
+async def load_test_pairs(max_entities: int) -> List[Tuple[str, str]]:
+    """Most frequent entities with the context the batch classifier would send"""
+    contexts: Dict[str, str] = {}
+    counts: Counter = Counter()
+    for entity, context, *_ in await load_entity_contexts():
+        contexts.setdefault(entity, context)
+        counts[entity] += 1
+    return [(entity, contexts[entity]) for entity, _ in counts.most_common(max_entities)]
+
+async def run_load(
+    pairs: List[Tuple[str, str]],
+    url: str,
+    model: str,
+    concurrency: int,
+    group_size: int,
+    adaptive: bool = False,
+    retries: int = 0
+) -> Dict[str, object]:
+    """
+    Classify all pairs once with the given concurrency and group size.
+
+    With adaptive=True, `concurrency` is the ceiling of an AdaptiveLimiter,
+    as in entity_classifier's batch mode; otherwise it is a fixed limit.
+    Transient failures (timeouts, dropped connections, HTTP 429/5xx) are
+    retried up to `retries` times with exponential backoff.
+
+    Returns:
+        Throughput, per-request latencies (including retries), result
+        category counts and retry counts
+    """
+    groups = [pairs[i:i + group_size] for i in range(0, len(pairs), group_size)]
+    latencies: List[float] = []
+    categories: Counter = Counter()
+    limiter = AdaptiveLimiter(max_concurrency=concurrency) if adaptive else AdaptiveLimiter.fixed(concurrency)
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for group in groups:
+        queue.put_nowait(group)
+
+    # One worker per allowed request, pulling groups like the batch classifier
+    async with OllamaClient(url, max_connections=concurrency, limiter=limiter, retries=retries) as client:
+        async def worker() -> None:
+            while not queue.empty():
+                group = queue.get_nowait()
+                request_start = time.perf_counter()
+                results = await classify_entity_group(group, model=model, client=client)
+                latencies.append(time.perf_counter() - request_start)
+                categories.update(result.category for result in results)
+
+        start_time = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start_time
+
+    return {
+        "elapsed": elapsed,
+        "entities_per_second": len(pairs) / elapsed,
+        "latencies": latencies,
+        "categories": categories,
+        "limiter": limiter,
+        "retried": client.retried,
+        "recovered": client.recovered
+    }
+
+async def run_load_tests(
+    url: Optional[str],
+    model: str,
+    max_entities: int,
+    concurrency_levels: List[int],
+    group_sizes: List[int],
+    fake_args: argparse.Namespace,
+    adaptive: bool = False,
+    retries: int = 0
+) -> None:
+    """Run every concurrency / group size combination and print a report line for each"""
+    pairs = await load_test_pairs(max_entities)
+
+    runner = None
+    if url is None:
+        fake = fake_from_args(fake_args)
+        runner = await start_fake_ollama(fake, port=FAKE_PORT)
+        url = f"http://127.0.0.1:{FAKE_PORT}/api/generate"
+        print(f"Started fake Ollama on {url} (latency {fake_args.latency}s {fake_args.distribution}, "
+              f"server concurrency {fake_args.max_concurrency}, error rate {fake_args.error_rate}, "
+              f"malformed rate {fake_args.malformed_rate})")
+
+    print(f"Load testing {len(pairs)} entities against {url} (up to {retries} retries per request)\n")
+    try:
+        for group_size in group_sizes:
+            for concurrency in concurrency_levels:
+                result = await run_load(pairs, url, model, concurrency, group_size, adaptive, retries)
+                failed = result["categories"]["Error"] + result["categories"]["Unknown"]
+                line = (f"group {group_size:>2} | concurrency {concurrency:>3} | "
+                        f"{result['entities_per_second']:7.2f} entities/s | {len(result['latencies']):>4} requests | "
+                        f"{latency_report(result['latencies'])} | {result['retried']} retries, "
+                        f"{result['recovered']} recovered | {failed} Error/Unknown")
+                if adaptive:
+                    line += f" | ended at {result['limiter'].describe()}"
+                print(line)
+    finally:
+        if runner is not None:
+            await runner.cleanup()
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Load test the entity classifier against a (fake) Ollama server")
+    parser.add_argument("--url", type=str, default=None,
+                        help="Ollama generate URL; omit to start the fake server in-process")
+    parser.add_argument("--model", type=str, default=DEFAULT_MODEL, help="Ollama model to use")
+    parser.add_argument("--max", type=int, default=100, help="Entities to classify per run")
+    parser.add_argument("--concurrency", type=str, default="1,2,4,8",
+                        help="Comma-separated client concurrency levels")
+    parser.add_argument("--group-size", type=str, default="1",
+                        help="Comma-separated entities-per-request values")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Treat each concurrency level as the ceiling of the adaptive limiter")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="Retries per request after a transient failure (timeout, dropped connection, "
+                             "HTTP 429/5xx); 0 reports every failure as-is")
+    add_fake_arguments(parser)
+    args = parser.parse_args()
+
+    asyncio.run(run_load_tests(
+        args.url,
+        args.model,
+        args.max,
+        [int(n) for n in args.concurrency.split(",")],
+        [int(n) for n in args.group_size.split(",")],
+        args,
+        args.adaptive,
+        max(0, args.retries)
+    ))
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,17 @@
-import json
+#!/usr/bin/env python3
+"""
+Script to clean entity classifications
 
-# Load the classifications
-with open('data/enriched/deities/deity_classifications.json', 'r') as f:
-    data = json.load(f)
+Removes IRRELEVANT entries and standardizes Titan categories; see
+classification_maintenance.py for the rules.
+"""
 
-# Count before changes
-original_count = len(data)
+import sys
+from pathlib import Path
 
-# Remove IRRELEVANT entries
-data = [item for item in data if item['category'] != 'IRRELEVANT']
+# Allow running as a script from the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tools.classification_maintenance import main
 
-# Standardize Titan categories
-for item in data:
-    if item['category'] == 'Titan (pre-Olympian primordial deities)':
-        item['category'] = 'Titan'
-
-# Save the modified data
-with open('data/enriched/deities/deity_classifications.json', 'w') as f:
-    json.dump(data, f, indent=2)
-
-# Count after changes
-new_count = len(data)
-removed = original_count - new_count
-
-print(f"Successfully processed deity classifications:")
-print(f"- Removed {removed} IRRELEVANT entries")
-print(f"- Standardized Titan categories")
-print(f"- {new_count} entries saved to deity_classifications.json") 
\ No newline at end of file
+if __name__ == "__main__":
+    main(default_rules=["normalize-titan", "drop-irrelevant"], description="Clean entity classifications")
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Keyword-in-Context Concordance for Cleros Orphicae
+
+This script builds an inverted positional index over the linguistics output
+and answers word, lemma, phrase and prefix queries with KWIC (keyword in
+context) lines, without rescanning the corpus.
+
+Index layout (concordance_index.json):
+    {
+        "version": 2,
+        "has_lemmas": true,   # false when built from features without lemmas
+        "lines": [[hymn_id, line_num, text], ...],
+        "spans": [[start_0, end_0, start_1, end_1, ...], ...],  # token offsets per line
+        "terms": {"zeus": [line_id, position, line_id, position, ...], ...},
+        "lemmas": {"bear": [line_id, position, ...], ...}
+    }
+
+Query syntax:
+    zeus                  a single word
+    "son of kronos"       a phrase (consecutive tokens)
+    thunder*              a prefix; may also appear inside a phrase
+
+Lemma queries need features with real lemmas (linguistic_features.jsonl
+version 2). On older features the lemma table holds lowercased words, so a
+lemma query behaves like a word query; the query command warns about this.
+"""
+
+import argparse
+import bisect
+import string
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Allow running as a script from the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tools import corpus
+from tools.io_utils import write_json_atomic
+
+# Constants
+DATA_DIR = Path("data")
+LINGUISTICS_DIR = DATA_DIR / "enriched" / "linguistics"
+INDEX_PATH = LINGUISTICS_DIR / "concordance_index.json"
+INDEX_VERSION = 2
+
+Posting = Tuple[int, int]  # (line_id, token position)
+
+class ConcordanceHit:
+    """One occurrence of a query in the corpus"""
+    def __init__(self, hymn_id: str, line_num: int, start: int, end: int, line_text: str):
+        self.hymn_id = hymn_id
+        self.line_num = line_num
+        self.start = start
+        self.end = end
+        self.line_text = line_text
+
+    def kwic(self, width: int = 40) -> str:
+        """Format the hit as a fixed-width keyword-in-context line"""
+        left = self.line_text[max(0, self.start - width):self.start]
+        match = self.line_text[self.start:self.end]
+        right = self.line_text[self.end:self.end + width]
+        return f"{left:>{width}} [{match}] {right:<{width}}"
+
+    def __repr__(self):
+        return (f"ConcordanceHit(hymn_id='{self.hymn_id}', line_num={self.line_num}, "
+                f"start={self.start}, end={self.end})")
+
+# Punctuation stripped from the ends of query words (not the prefix marker)
+QUERY_PUNCTUATION = string.punctuation.replace("*", "") + "“”‘’«»—–"
+
+def _is_word(token: str) -> bool:
+    return any(c.isalnum() for c in token)
+
+def query_words(query: str) -> List[str]:
+    """Lowercased query words with surrounding punctuation removed ("kronos," -> "kronos")"""
+    words = [w.strip(QUERY_PUNCTUATION) for w in query.lower().split()]
+    return [w for w in words if _is_word(w.rstrip("*"))]
+
+class ConcordanceIndex:
+    """Inverted positional index of words and lemmas"""
+
+    def __init__(self):
+        self.lines: List[Tuple[str, int, str]] = []
+        self.spans: List[List[int]] = []
+        self.terms: Dict[str, List[Posting]] = {}
+        self.lemmas: Dict[str, List[Posting]] = {}
+        self.has_lemmas = True
+        self._sorted_keys: Dict[str, List[str]] = {}
+
+    @classmethod
+    def build(cls, features: Optional[Iterable[dict]] = None) -> "ConcordanceIndex":
+        """
+        Build the index from decoded hymn features.
+
+        Args:
+            features: Hymn features; defaults to streaming the linguistics output
+        """
+        index = cls()
+        if features is None:
+            features = corpus.hymn_features()
+
+        for hymn in features:
+            for line in hymn["per_line"]:
+                if line.get("lemmas_inferred"):
+                    index.has_lemmas = False
+                line_id = len(index.lines)
+                text = line["text"]
+                index.lines.append((hymn["hymn_id"], line["line_num"], text))
+
+                # Token offsets, found left to right in the line text
+                spans = []
+                pos = 0
+                for token in line["tokens"]:
+                    start = text.find(token, pos)
+                    if start < 0:
+                        start = pos
+                    end = start + len(token)
+                    spans.extend((start, end))
+                    pos = end
+                index.spans.append(spans)
+
+                for position, (token, lemma) in enumerate(zip(line["tokens"], line["lemmas"])):
+                    if not _is_word(token):
+                        continue
+                    index.terms.setdefault(token.lower(), []).append((line_id, position))
+                    index.lemmas.setdefault(lemma.lower(), []).append((line_id, position))
+
+        return index
+
+    def save(self, path: Path = INDEX_PATH) -> None:
+        """Write the index as compact JSON"""
+        def flatten(postings: Dict[str, List[Posting]]) -> Dict[str, List[int]]:
+            return {key: [n for posting in plist for n in posting] for key, plist in postings.items()}
+
+        write_json_atomic(path, {
+            "version": INDEX_VERSION,
+            "has_lemmas": self.has_lemmas,
+            "lines": [list(line) for line in self.lines],
+            "spans": self.spans,
+            "terms": flatten(self.terms),
+            "lemmas": flatten(self.lemmas)
+        }, indent=None)
+
+    @classmethod
+    def load(cls, path: Path = INDEX_PATH) -> "ConcordanceIndex":
+        """Load an index written by `save` (parsed once per process, see corpus.load_json)"""
+        data = corpus.load_json(path)
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"{path} has index version {data.get('version')}, expected {INDEX_VERSION}")
+
+        def unflatten(flat: Dict[str, List[int]]) -> Dict[str, List[Posting]]:
+            return {key: list(zip(values[::2], values[1::2])) for key, values in flat.items()}
+
+        index = cls()
+        index.lines = [tuple(line) for line in data["lines"]]
+        index.spans = data["spans"]
+        index.terms = unflatten(data["terms"])
+        index.lemmas = unflatten(data["lemmas"])
+        index.has_lemmas = data["has_lemmas"]
+        return index
+
+    def _table(self, lemma: bool) -> Dict[str, List[Posting]]:
+        return self.lemmas if lemma else self.terms
+
+    def _expand(self, word: str, lemma: bool) -> List[Posting]:
+        """Postings for one query word, expanding a trailing * as a prefix"""
+        table = self._table(lemma)
+        if not word.endswith("*"):
+            return table.get(word, [])
+
+        prefix = word[:-1]
+        name = "lemmas" if lemma else "terms"
+        if name not in self._sorted_keys:
+            self._sorted_keys[name] = sorted(table)
+        keys = self._sorted_keys[name]
+
+        postings: List[Posting] = []
+        i = bisect.bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix):
+            postings.extend(table[keys[i]])
+            i += 1
+        postings.sort()
+        return postings
+
+    def search(self, query: str, lemma: bool = False) -> List[ConcordanceHit]:
+        """
+        Find every occurrence of a word, prefix or phrase.
+
+        Args:
+            query: One or more words; a trailing * makes a word a prefix
+            lemma: Match lemmas instead of surface forms
+
+        Returns:
+            Hits in corpus order
+        """
+        words = query_words(query)
+        if not words:
+            return []
+
+        # Start from the first word and keep the phrase starts whose following
+        # positions match the remaining words
+        starts = self._expand(words[0], lemma)
+        for offset, word in enumerate(words[1:], 1):
+            if not starts:
+                break
+            following = set(self._expand(word, lemma))
+            starts = [(line_id, pos) for line_id, pos in starts if (line_id, pos + offset) in following]
+
+        hits = []
+        for line_id, pos in starts:
+            hymn_id, line_num, text = self.lines[line_id]
+            spans = self.spans[line_id]
+            start = spans[2 * pos]
+            end = spans[2 * (pos + len(words) - 1) + 1]
+            hits.append(ConcordanceHit(hymn_id, line_num, start, end, text))
+        return hits
+
+    def kwic(self, query: str, width: int = 40, lemma: bool = False, limit: Optional[int] = None) -> List[str]:
+        """KWIC lines for a query, each prefixed with its hymn and line reference"""
+        hits = self.search(query, lemma=lemma)
+        if limit is not None:
+            hits = hits[:limit]
+        return [f"Hymn {hit.hymn_id:>3}, Line {hit.line_num:>2}: {hit.kwic(width)}" for hit in hits]
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Build and query the keyword-in-context concordance")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    build_parser = subparsers.add_parser("build", help="Build the index from the linguistics output")
+    build_parser.add_argument("--output", type=str, default=str(INDEX_PATH), help="Index output file")
+
+    query_parser = subparsers.add_parser("query", help="Print KWIC lines for a word, prefix* or phrase")
+    query_parser.add_argument("query", type=str, help="Query, e.g. zeus, thunder* or \"son of kronos\"")
+    query_parser.add_argument("--lemma", action="store_true", help="Match lemmas instead of surface forms")
+    query_parser.add_argument("--width", type=int, default=40, help="Context characters on each side")
+    query_parser.add_argument("--limit", type=int, default=None, help="Maximum lines to print")
+    query_parser.add_argument("--index", type=str, default=str(INDEX_PATH), help="Index file")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start_time = time.perf_counter()
+        index = ConcordanceIndex.build()
+        index.save(Path(args.output))
+        print(f"Indexed {len(index.lines)} lines, {len(index.terms)} terms and {len(index.lemmas)} lemmas "
+              f"in {time.perf_counter() - start_time:.2f}s")
+        if not index.has_lemmas:
+            print("Warning: the features have no lemmas; lemma queries will match lowercased words")
+        print(f"Index saved to {args.output}")
+    elif args.command == "query":
+        start_time = time.perf_counter()
+        index = ConcordanceIndex.load(Path(args.index))
+        load_time = time.perf_counter() - start_time
+        if args.lemma and not index.has_lemmas:
+            print("Warning: the index was built from features without lemmas; "
+                  "--lemma matches lowercased words (re-run linguistics.py to add lemmas)", file=sys.stderr)
+
+        start_time = time.perf_counter()
+        lines = index.kwic(args.query, width=args.width, lemma=args.lemma, limit=args.limit)
+        query_time = time.perf_counter() - start_time
+
+        for line in lines:
+            print(line)
+        print(f"\n{len(lines)} lines (index loaded in {load_time * 1000:.1f} ms, "
+              f"query took {query_time * 1000:.2f} ms)")
+    else:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Corpus Access for Cleros Orphicae
+
+This module gives the tools one lazily loaded, memoized accessor per corpus
+artifact, so a pipeline that chains several tools in one process parses
+each file once, and defines the artifact paths the tools import:
+
+    hymns()                 web/public/data/hymns.json, the "hymns" list
+    classifications()       data/enriched/deities/deity_classifications.json
+    hymn_features()         decoded linguistic features, streamed (not cached)
+    text_metrics()          data/enriched/linguistics/text_metrics.json
+    linguistics_summary()   data/enriched/linguistics/linguistics_summary.json
+    base_hymns()            data/base/hymn_*.json, keyed by hymn ID
+    span_metadata(category) web/public/data/span_metadata_<category>.json
+    load_json(path)         any other JSON file
+
+A cached value is reused until the file's mtime or size changes (for
+base_hymns, any file of the set, or the set itself). Values are shared
+between callers and must be treated as read-only.
+
+The linguistic features are the largest artifact and are read in one pass by
+the index builders, so hymn_features() streams them one hymn at a time (see
+linguistics_format.iter_hymn_features) instead of holding them in memory;
+the derived indexes (entity_index, concordance, token_table, corpus_db) are
+the cached form. Tools that rewrite a file in place (classification
+maintenance) stream it directly.
+
+Every access is recorded per calling tool; set CLEROS_CORPUS_LOG=1 to print
+the access log when the process exits, or call print_access_log().
+"""
+
+import argparse
+import atexit
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Allow running as a script from the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tools.linguistics_format import FEATURES_PATH, LEGACY_FEATURES_PATH, iter_hymn_features
+
+# Constants
+DATA_DIR = Path("data")
+BASE_DIR = DATA_DIR / "base"
+LINGUISTICS_DIR = DATA_DIR / "enriched" / "linguistics"
+DEITIES_DIR = DATA_DIR / "enriched" / "deities"
+WEB_DATA_DIR = Path("web/public/data")
+HYMNS_PATH = WEB_DATA_DIR / "hymns.json"
+CLASSIFICATIONS_PATH = DEITIES_DIR / "deity_classifications.json"
+TEXT_METRICS_PATH = LINGUISTICS_DIR / "text_metrics.json"
+SUMMARY_PATH = LINGUISTICS_DIR / "linguistics_summary.json"
+
+Signature = Tuple[Tuple[str, int, int], ...]
+
+class Artifact:
+    """One cached corpus file (or set of files) and how to load it"""
+
+    def __init__(self, name: str, paths: Callable[[], List[Path]], loader: Callable[[List[Path]], Any]):
+        """
+        Args:
+            name: Name shown in the access log (the path, for single files)
+            paths: Returns the files the value is built from
+            loader: Builds the value from those files
+        """
+        self.name = name
+        self.paths = paths
+        self.loader = loader
+        self.value: Any = None
+        self.signature: Optional[Signature] = None
+        self.load_time = 0.0
+
+    def current_signature(self) -> Tuple[List[Path], Signature]:
+        """The files and their (path, mtime, size) triples; raises FileNotFoundError if one is missing"""
+        paths = self.paths()
+        signature = []
+        for path in paths:
+            stat = path.stat()
+            signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+        return paths, tuple(signature)
+
+    def get(self, tool: str) -> Any:
+        """The artifact's value, loaded on first use and reloaded after the files change"""
+        paths, signature = self.current_signature()
+        record = _access_record(tool, self.name)
+        if signature == self.signature:
+            record["hits"] += 1
+            return self.value
+
+        start_time = time.perf_counter()
+        self.value = self.loader(paths)
+        self.load_time = time.perf_counter() - start_time
+        self.signature = signature
+        record["loads"] += 1
+        return self.value
+
+    def clear(self) -> None:
+        self.value = None
+        self.signature = None
+
+    def __repr__(self):
+        state = "loaded" if self.signature is not None else "not loaded"
+        return f"Artifact(name='{self.name}', {state})"
+
+# Tool -> artifact name -> {"loads": n, "hits": n, "streams": n}
+ACCESS_LOG: Dict[str, Dict[str, Dict[str, int]]] = {}
+
+_ARTIFACTS: Dict[str, Artifact] = {}
+
+def _access_record(tool: str, name: str) -> Dict[str, int]:
+    return ACCESS_LOG.setdefault(tool, {}).setdefault(name, {"loads": 0, "hits": 0, "streams": 0})
+
+def _calling_tool() -> str:
+    """Module name of the code that called the accessor (script name for __main__)"""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_globals.get("__file__") == __file__:
+        frame = frame.f_back
+    if frame is None:
+        return Path(sys.argv[0]).stem or "unknown"
+    name = frame.f_globals.get("__name__", "unknown")
+    if name == "__main__":
+        return Path(frame.f_globals.get("__file__") or sys.argv[0] or "__main__").stem
+    return name.rpartition(".")[2]
+
+def _artifact(name: str, paths: Callable[[], List[Path]], loader: Callable[[List[Path]], Any]) -> Artifact:
+    if name not in _ARTIFACTS:
+        _ARTIFACTS[name] = Artifact(name, paths, loader)
+    return _ARTIFACTS[name]
+
+def _read_json(path: Path) -> Any:
+    with open(path, 'r', encoding="utf-8") as f:
+        return json.load(f)
+
+def load_json(path: Path) -> Any:
+    """Any JSON file, memoized under its path (shared with the named accessors below)"""
+    path = Path(path)
+    return _artifact(str(path), lambda: [path], lambda paths: _read_json(paths[0])).get(_calling_tool())
+
+def hymns() -> List[Dict[str, Any]]:
+    """Hymns of the web corpus, each with its "sentences" list"""
+    return load_json(HYMNS_PATH).get("hymns", [])
+
+def classifications() -> List[Dict[str, Any]]:
+    """Entity classification records"""
+    return load_json(CLASSIFICATIONS_PATH)
+
+def features_path() -> Path:
+    """The linguistic features file in use: the compact JSONL, else the legacy JSON"""
+    return FEATURES_PATH if FEATURES_PATH.exists() or not LEGACY_FEATURES_PATH.exists() else LEGACY_FEATURES_PATH
+
+def hymn_features() -> Iterator[Dict[str, Any]]:
+    """
+    Decoded linguistic features of every hymn, streamed one hymn at a time
+
+    Each call reads the file again (see linguistics_format.iter_hymn_features);
+    the access log counts the streams.
+
+    Raises:
+        FileNotFoundError: If neither features file exists
+    """
+    path = features_path()
+    if not path.exists():
+        raise FileNotFoundError(2, "No such file or directory", str(path))
+    _access_record(_calling_tool(), "hymn_features")["streams"] += 1
+    return iter_hymn_features(path)
+
+def text_metrics() -> List[Dict[str, Any]]:
+    """Per-hymn text metrics"""
+    return load_json(TEXT_METRICS_PATH)
+
+def linguistics_summary() -> Dict[str, Any]:
+    """Corpus-wide linguistics summary"""
+    return load_json(SUMMARY_PATH)
+
+def base_hymns() -> Dict[str, Dict[str, Any]]:
+    """Base dataset hymns keyed by hymn ID"""
+    def load(paths: List[Path]) -> Dict[str, Dict[str, Any]]:
+        loaded = (_read_json(path) for path in paths)
+        return {hymn["hymn_id"]: hymn for hymn in loaded}
+    return _artifact(
+        "base_hymns", lambda: sorted(BASE_DIR.glob("hymn_*.json")), load
+    ).get(_calling_tool())
+
+def span_metadata(category: str, span_dir: Path = WEB_DATA_DIR) -> Dict[str, Any]:
+    """Span metadata ({"spans", "contexts"}) of one category"""
+    return load_json(Path(span_dir) / f"span_metadata_{category}.json")
+
+def clear_cache() -> None:
+    """Drop every cached value (the access log is kept)"""
+    for artifact in _ARTIFACTS.values():
+        artifact.clear()
+
+def print_access_log(file=None) -> None:
+    """Print which artifacts each tool touched, with load and cache-hit counts"""
+    file = file if file is not None else sys.stdout
+    print("Corpus artifacts accessed:", file=file)
+    for tool, artifacts in ACCESS_LOG.items():
+        print(f"  {tool}:", file=file)
+        for name, record in artifacts.items():
+            if record["streams"]:
+                print(f"    {name}: {record['streams']} streamed", file=file)
+            else:
+                print(f"    {name}: {record['loads']} loaded, {record['hits']} cached", file=file)
+
+if os.environ.get("CLEROS_CORPUS_LOG"):
+    atexit.register(print_access_log, sys.stderr)
+
+ACCESSORS = {
+    "hymns": hymns,
+    "classifications": classifications,
+    "hymn_features": hymn_features,
+    "text_metrics": text_metrics,
+    "linguistics_summary": linguistics_summary,
+    "base_hymns": base_hymns
+}
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Load corpus artifacts and time cold versus cached access")
+    parser.add_argument("artifacts", type=str, nargs="*",
+                        help=f"Artifacts to load: {', '.join(ACCESSORS)} (default: all)")
+    args = parser.parse_args()
+    unknown = set(args.artifacts) - set(ACCESSORS)
+    if unknown:
+        parser.error(f"unknown artifact(s): {', '.join(sorted(unknown))}")
+
+    for name in args.artifacts or ACCESSORS:
+        try:
+            start_time = time.perf_counter()
+            value = ACCESSORS[name]()
+            if name == "hymn_features":
+                count = sum(1 for _ in value)
+                print(f"{name}: {count} entries, streamed in {(time.perf_counter() - start_time) * 1000:.1f} ms")
+                continue
+            cold = time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            ACCESSORS[name]()
+            cached = time.perf_counter() - start_time
+        except FileNotFoundError as e:
+            print(f"{name}: missing ({e.filename})")
+            continue
+        print(f"{name}: {len(value)} entries, loaded in {cold * 1000:.1f} ms, cached access {cached * 1e6:.0f} µs")
+    print()
+    print_access_log()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+SQLite Corpus Store for Cleros Orphicae
+
+This script exports the linguistic features, text metrics and deity
+classifications into one indexed SQLite database, so corpus-wide questions
+are a SQL query instead of a Python loop over the whole features file.
+
+Tables:
+    hymns            hymn_id, total_words, total_tokens, unique_words, avg_line_length
+    lines            line_id, hymn_id, line_num, text, word_count, token_count, char_length
+    tokens           line_id, position, text, lemma, pos, dep, head, start_char, end_char
+    entities         line_id, text, label, start_char, end_char
+    noun_chunks      line_id, text, root_text, root_pos, root_dep, root, start_char, end_char
+    words            hymn_id, word, count                      (text_metrics vocabulary)
+    classifications  entity, category, hymn_id, line_num, start_char, end_char
+    metadata         key, value                                (schema_version, has_lemmas)
+
+`head` is the head token's position within the line. Token offsets are found
+by aligning the token texts to the line text. `lemma` is NULL when the
+features store no lemmas (see data/README.md); metadata.has_lemmas is then
+"0" and lemma queries are refused.
+
+The database is rebuilt automatically when it is missing or older than any
+of its sources; run the `build` command to rebuild it explicitly.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Tuple
+
+# Allow running as a script from the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tools import corpus
+from tools.corpus import CLASSIFICATIONS_PATH, TEXT_METRICS_PATH
+from tools.linguistics_format import features_have_lemmas, token_offsets
+
+# Constants
+DATA_DIR = Path("data")
+LINGUISTICS_DIR = DATA_DIR / "enriched" / "linguistics"
+DB_PATH = LINGUISTICS_DIR / "corpus.sqlite"
+SCHEMA_VERSION = 2  # 2: metadata table, NULL lemmas for lemma-less features
+
+SCHEMA = """
+CREATE TABLE hymns (
+    hymn_id TEXT PRIMARY KEY,
+    total_words INTEGER,
+    total_tokens INTEGER,
+    unique_words INTEGER,
+    avg_line_length REAL
+);
+CREATE TABLE lines (
+    line_id INTEGER PRIMARY KEY,
+    hymn_id TEXT NOT NULL,
+    line_num INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    word_count INTEGER,
+    token_count INTEGER,
+    char_length INTEGER,
+    UNIQUE (hymn_id, line_num)
+);
+CREATE TABLE metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE tokens (
+    line_id INTEGER NOT NULL REFERENCES lines (line_id),
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    lemma TEXT,
+    pos TEXT,
+    dep TEXT,
+    head INTEGER,
+    start_char INTEGER,
+    end_char INTEGER,
+    PRIMARY KEY (line_id, position)
+) WITHOUT ROWID;
+CREATE TABLE entities (
+    entity_id INTEGER PRIMARY KEY,
+    line_id INTEGER NOT NULL REFERENCES lines (line_id),
+    text TEXT NOT NULL,
+    label TEXT,
+    start_char INTEGER,
+    end_char INTEGER
+);
+CREATE TABLE noun_chunks (
+    chunk_id INTEGER PRIMARY KEY,
+    line_id INTEGER NOT NULL REFERENCES lines (line_id),
+    text TEXT NOT NULL,
+    root_text TEXT,
+    root_pos TEXT,
+    root_dep TEXT,
+    root INTEGER,
+    start_char INTEGER,
+    end_char INTEGER
+);
+CREATE TABLE words (
+    hymn_id TEXT NOT NULL,
+    word TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (hymn_id, word)
+) WITHOUT ROWID;
+CREATE TABLE classifications (
+    entity TEXT NOT NULL,
+    category TEXT,
+    hymn_id TEXT,
+    line_num INTEGER,
+    start_char INTEGER,
+    end_char INTEGER
+);
+"""
+
+INDEXES = """
+CREATE INDEX tokens_text ON tokens (text COLLATE NOCASE);
+CREATE INDEX tokens_lemma ON tokens (lemma);
+CREATE INDEX tokens_pos ON tokens (pos);
+CREATE INDEX tokens_dep ON tokens (dep);
+CREATE INDEX entities_line ON entities (line_id, start_char);
+CREATE INDEX entities_text ON entities (text);
+CREATE INDEX entities_label ON entities (label);
+CREATE INDEX noun_chunks_line ON noun_chunks (line_id);
+CREATE INDEX noun_chunks_root ON noun_chunks (root_text);
+CREATE INDEX words_word ON words (word);
+CREATE INDEX classifications_entity ON classifications (entity);
+CREATE INDEX classifications_category ON classifications (category);
+CREATE INDEX classifications_line ON classifications (hymn_id, line_num);
+"""
+
+# Ready-made queries for the `query` command
+NAMED_QUERIES = {
+    "numeral-entities": (
+        "Entities containing a numeral token, or labeled as a number",
+        """
+        SELECT DISTINCT e.text, e.label, l.hymn_id, l.line_num
+        FROM entities e
+        JOIN lines l ON l.line_id = e.line_id
+        LEFT JOIN tokens t ON t.line_id = e.line_id
+            AND t.start_char >= e.start_char AND t.end_char <= e.end_char AND t.pos = 'NUM'
+        WHERE t.position IS NOT NULL OR e.label IN ('CARDINAL', 'ORDINAL', 'QUANTITY')
+        ORDER BY CAST(l.hymn_id AS INTEGER), l.line_num
+        """
+    ),
+    "pos-distribution": (
+        "Token count per POS tag",
+        "SELECT pos, COUNT(*) AS tokens FROM tokens GROUP BY pos ORDER BY tokens DESC"
+    ),
+    "top-entities": (
+        "Most frequent entity texts",
+        """
+        SELECT text, COUNT(*) AS occurrences, COUNT(DISTINCT line_id) AS lines
+        FROM entities GROUP BY text ORDER BY occurrences DESC LIMIT 25
+        """
+    ),
+    "top-nouns": (
+        "Most frequent noun lemmas (needs features with lemmas)",
+        "SELECT lemma, COUNT(*) AS tokens FROM tokens WHERE pos = 'NOUN' GROUP BY lemma ORDER BY tokens DESC LIMIT 25"
+    ),
+    "top-noun-words": (
+        "Most frequent noun word forms (lowercased)",
+        """
+        SELECT LOWER(text) AS word, COUNT(*) AS tokens FROM tokens WHERE pos = 'NOUN'
+        GROUP BY LOWER(text) ORDER BY tokens DESC LIMIT 25
+        """
+    ),
+    "categories": (
+        "Classified entity occurrences per category",
+        """
+        SELECT category, COUNT(*) AS occurrences, COUNT(DISTINCT entity) AS entities
+        FROM classifications GROUP BY category ORDER BY occurrences DESC
+        """
+    ),
+    "unclassified-entities": (
+        "Entity texts found by NER that have no classification",
+        """
+        SELECT e.text, e.label, COUNT(*) AS occurrences
+        FROM entities e LEFT JOIN classifications c ON c.entity = e.text
+        WHERE c.entity IS NULL
+        GROUP BY e.text, e.label ORDER BY occurrences DESC
+        """
+    )
+}
+
+# Named queries that read tokens.lemma
+LEMMA_QUERIES = {"top-nouns"}
+
+def build_database(path: Path = DB_PATH) -> dict:
+    """
+    Export all sources into a new SQLite database
+
+    The database is built next to `path` and moved into place when complete.
+
+    Returns:
+        Row counts per table
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript("PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF;")
+        conn.executescript(SCHEMA)
+
+        # Per-line metrics, keyed for the lines table
+        line_metrics = {}
+        if TEXT_METRICS_PATH.exists():
+            metrics = corpus.load_json(TEXT_METRICS_PATH)
+            conn.executemany(
+                "INSERT INTO hymns VALUES (?, ?, ?, ?, ?)",
+                [(str(m["hymn_id"]), m.get("total_words"), m.get("total_tokens"), m.get("unique_words"),
+                  m.get("avg_line_length")) for m in metrics]
+            )
+            conn.executemany(
+                "INSERT INTO words VALUES (?, ?, ?)",
+                [(str(m["hymn_id"]), word, count) for m in metrics for word, count in m.get("vocabulary", {}).items()]
+            )
+            for m in metrics:
+                for line in m.get("per_line", []):
+                    line_metrics[(str(m["hymn_id"]), line["line_num"])] = (
+                        line.get("word_count"), line.get("token_count"), line.get("char_length")
+                    )
+
+        # Linguistic features, streamed one hymn at a time. Lemmas inferred
+        # from surface forms are stored as NULL rather than passed off as lemmas
+        has_lemmas = features_have_lemmas(corpus.features_path())
+        line_id = 0
+        for hymn in corpus.hymn_features():
+            hymn_id = str(hymn["hymn_id"])
+            lines, tokens, entities, chunks = [], [], [], []
+            for line in hymn["per_line"]:
+                line_id += 1
+                text = line["text"]
+                lines.append((line_id, hymn_id, line["line_num"], text,
+                               *line_metrics.get((hymn_id, line["line_num"]), (None, None, None))))
+                starts = token_offsets(text, line["tokens"])
+                if has_lemmas and not line.get("lemmas_inferred"):
+                    lemmas = line["lemmas"]
+                else:
+                    has_lemmas = False
+                    lemmas = [None] * len(line["tokens"])
+                for position, (token, lemma, pos, dep, head, start) in enumerate(zip(
+                    line["tokens"], lemmas, line["pos"], line["dep"], line["heads"], starts
+                )):
+                    tokens.append((line_id, position, token, lemma, pos, dep, head, start, start + len(token)))
+                for entity in line["entities"]:
+                    entities.append((line_id, entity["text"], entity["label"], entity["start_char"], entity["end_char"]))
+                for chunk in line["noun_chunks"]:
+                    chunks.append((line_id, chunk["text"], chunk["root_text"], chunk["root_pos"], chunk["root_dep"],
+                                   chunk.get("root"), chunk.get("start_char"), chunk.get("end_char")))
+            conn.executemany("INSERT INTO lines VALUES (?, ?, ?, ?, ?, ?, ?)", lines)
+            conn.executemany("INSERT INTO tokens VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", tokens)
+            conn.executemany(
+                "INSERT INTO entities (line_id, text, label, start_char, end_char) VALUES (?, ?, ?, ?, ?)", entities
+            )
+            conn.executemany(
+                "INSERT INTO noun_chunks (line_id, text, root_text, root_pos, root_dep, root, start_char, end_char) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", chunks
+            )
+
+        if CLASSIFICATIONS_PATH.exists():
+            classifications = corpus.load_json(CLASSIFICATIONS_PATH)
+            conn.executemany(
+                "INSERT INTO classifications VALUES (?, ?, ?, ?, ?, ?)",
+                [(item.get("entity"), item.get("category"), str(item.get("hymn_id")), item.get("line_num"),
+                  item.get("start_char"), item.get("end_char")) for item in classifications]
+            )
+
+        if not has_lemmas:
+            conn.execute("UPDATE tokens SET lemma = NULL")
+        conn.executemany("INSERT INTO metadata VALUES (?, ?)", [
+            ("schema_version", str(SCHEMA_VERSION)),
+            ("has_lemmas", "1" if has_lemmas else "0")
+        ])
+
+        conn.executescript(INDEXES)
+        conn.execute("ANALYZE")
+        conn.commit()
+        counts = {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("hymns", "lines", "tokens", "entities", "noun_chunks", "words", "classifications")
+        }
+    except BaseException:
+        conn.close()
+        tmp_path.unlink(missing_ok=True)
+        raise
+    conn.close()
+    os.replace(tmp_path, path)
+    return counts
+
+def read_metadata(conn: sqlite3.Connection) -> dict:
+    """The metadata table as a dict (empty for databases built before it existed)"""
+    try:
+        return dict(conn.execute("SELECT key, value FROM metadata"))
+    except sqlite3.OperationalError:
+        return {}
+
+def has_lemmas(conn: sqlite3.Connection) -> bool:
+    """Whether tokens.lemma holds real lemmas"""
+    return read_metadata(conn).get("has_lemmas") == "1"
+
+def open_corpus_db(path: Path = DB_PATH) -> sqlite3.Connection:
+    """
+    Open the corpus database, building it first if it is missing, has an
+    older schema, or is older than the features, text metrics or
+    classifications it was built from.
+    """
+    path = Path(path)
+    sources = [p for p in (corpus.features_path(), TEXT_METRICS_PATH, CLASSIFICATIONS_PATH) if p.exists()]
+    stale = not path.exists() or any(path.stat().st_mtime < source.stat().st_mtime for source in sources)
+    if not stale:
+        conn = sqlite3.connect(path)
+        if read_metadata(conn).get("schema_version") == str(SCHEMA_VERSION):
+            return conn
+        conn.close()
+    print(f"Building corpus database {path}...")
+    build_database(path)
+    return sqlite3.connect(path)
+
+def run_query(conn: sqlite3.Connection, sql: str, params: Sequence[Any] = ()) -> Tuple[List[str], List[tuple], float]:
+    """
+    Run a query and time it
+
+    Returns:
+        (column names, rows, seconds)
+    """
+    start_time = time.perf_counter()
+    cursor = conn.execute(sql, params)
+    rows = cursor.fetchall()
+    elapsed = time.perf_counter() - start_time
+    columns = [description[0] for description in cursor.description or []]
+    return columns, rows, elapsed
+
+def print_rows(columns: List[str], rows: List[tuple], limit: Optional[int] = None) -> None:
+    """Print query results as an aligned text table"""
+    shown = rows if limit is None else rows[:limit]
+    cells = [[str(value) for value in row] for row in shown]
+    widths = [max([len(column)] + [len(row[i]) for row in cells]) for i, column in enumerate(columns)]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    print("  ".join("-" * width for width in widths))
+    for row in cells:
+        print("  ".join(value.ljust(width) for value, width in zip(row, widths)))
+    if len(shown) < len(rows):
+        print(f"... {len(rows) - len(shown)} more rows")
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Export the corpus to SQLite and query it")
+    parser.add_argument("--db", type=str, default=str(DB_PATH), help="Database file")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    subparsers.add_parser("build", help="Rebuild the database from the linguistics and classification outputs")
+
+    query_parser = subparsers.add_parser("query", help="Run a named query (see --list)")
+    query_parser.add_argument("name", type=str, nargs="?", help="Query name")
+    query_parser.add_argument("--list", action="store_true", help="List the named queries")
+    query_parser.add_argument("--limit", type=int, default=50, help="Rows to print")
+
+    sql_parser = subparsers.add_parser("sql", help="Run an SQL statement")
+    sql_parser.add_argument("statement", type=str, help="SQL, e.g. \"SELECT pos, COUNT(*) FROM tokens GROUP BY pos\"")
+    sql_parser.add_argument("--limit", type=int, default=50, help="Rows to print")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start_time = time.perf_counter()
+        counts = build_database(Path(args.db))
+        print(f"Built {args.db} in {time.perf_counter() - start_time:.2f}s")
+        for table, count in counts.items():
+            print(f"  {table}: {count}")
+    elif args.command == "query" and (args.list or not args.name):
+        for name, (description, _) in NAMED_QUERIES.items():
+            print(f"{name}: {description}")
+    elif args.command in ("query", "sql"):
+        if args.command == "query":
+            if args.name not in NAMED_QUERIES:
+                parser.error(f"unknown query '{args.name}'; expected one of {', '.join(NAMED_QUERIES)}")
+            sql = NAMED_QUERIES[args.name][1]
+        else:
+            sql = args.statement
+        conn = open_corpus_db(Path(args.db))
+        if args.command == "query" and args.name in LEMMA_QUERIES and not has_lemmas(conn):
+            conn.close()
+            parser.error(f"'{args.name}' needs lemmas, but {args.db} was built from features without them "
+                         "(see data/README.md); try 'top-noun-words'")
+        try:
+            columns, rows, elapsed = run_query(conn, sql)
+        except sqlite3.Error as e:
+            parser.error(f"SQL error: {e}")
+        finally:
+            conn.close()
+        print_rows(columns, rows, args.limit)
+        print(f"\n{len(rows)} rows in {elapsed * 1000:.2f} ms")
+    else:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
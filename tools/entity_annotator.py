@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Aho-Corasick Entity Annotator for Cleros Orphicae
+
+This script compiles every classified entity string (deity_classifications.json,
+plus the span metadata with --with-spans, see entity_ruler.load_entity_patterns)
+into a single Aho-Corasick automaton over characters. One left-to-right pass over a text
+finds every pattern occurrence; the non-overlapping, leftmost-longest matches
+are then emitted as offsets or as an annotated string built with one join.
+
+Matches respect the same token boundaries as entity_ruler.PhraseTagger:
+"Zeus" is not found inside "Zeusian" or "Zeus-born".
+
+The benchmark command measures throughput on the full text of hymns.json
+against per-pattern str.find scanning and the token-trie PhraseTagger.
+"""
+
+import argparse
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Allow running as a script from the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tools.entity_ruler import (
+    HYMNS_PATH, PhraseTagger, TaggedEntity, load_entity_patterns, load_hymn_sentences
+)
+
+# Characters that join word pieces into one token ("trim-ankled", "Zeus's")
+JOINERS = "-'’"
+
+def _is_word(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+def at_token_start(text: str, i: int) -> bool:
+    """Whether a token starts at text[i] (no word continues into it)"""
+    if i == 0 or not _is_word(text[i]):
+        return True
+    before = text[i - 1]
+    if _is_word(before):
+        return False
+    return not (before in JOINERS and i >= 2 and _is_word(text[i - 2]))
+
+def at_token_end(text: str, i: int) -> bool:
+    """Whether a token ends just before text[i]"""
+    if i >= len(text) or not _is_word(text[i - 1]):
+        return True
+    after = text[i]
+    if _is_word(after):
+        return False
+    return not (after in JOINERS and i + 1 < len(text) and _is_word(text[i + 1]))
+
+class AhoCorasickAnnotator:
+    """
+    Multi-pattern matcher over characters.
+
+    The automaton is a trie of all patterns with failure links; every state
+    carries the (length, category) of each pattern that ends there, including
+    those reached through failure links, so scanning a text is one pass with
+    no backtracking. Transitions that follow failure links are memoized per
+    state, so repeated text costs one dict lookup per character.
+    """
+
+    def __init__(self, patterns: Dict[str, str], ignore_case: bool = False):
+        """
+        Args:
+            patterns: Surface form -> category
+            ignore_case: Match patterns case-insensitively
+        """
+        self.ignore_case = ignore_case
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.outputs: List[List[Tuple[int, str]]] = [[]]
+        self.size = 0
+        for text, category in patterns.items():
+            self._add(text, category)
+        self._link()
+        self.delta: List[Dict[str, int]] = [dict(edges) for edges in self.goto]
+
+    def _fold(self, text: str) -> str:
+        """Case-fold text without changing character offsets"""
+        if not self.ignore_case:
+            return text
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            return lowered
+        return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+    def _add(self, text: str, category: str) -> None:
+        """Add one pattern to the trie"""
+        text = self._fold(" ".join(text.split()))
+        if not text:
+            return
+        state = 0
+        for char in text:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+            state = next_state
+        if not any(length == len(text) for length, _ in self.outputs[state]):
+            self.outputs[state].append((len(text), category))
+            self.size += 1
+
+    def _link(self) -> None:
+        """Compute failure links breadth-first and merge outputs along them"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail[next_state]]
+
+    def _transition(self, state: int, char: str) -> int:
+        """Follow failure links for a missing edge and memoize the result"""
+        target = state
+        while target and char not in self.goto[target]:
+            target = self.fail[target]
+        next_state = self.goto[target].get(char, 0)
+        self.delta[state][char] = next_state
+        return next_state
+
+    def find(self, text: str) -> List[TaggedEntity]:
+        """
+        Find all non-overlapping, leftmost-longest pattern matches in text
+
+        Returns:
+            TaggedEntity matches in text order
+        """
+        folded = self._fold(text)
+        delta, outputs = self.delta, self.outputs
+
+        # Longest match starting at each position, gathered in one pass
+        longest: Dict[int, Tuple[int, str]] = {}
+        state = 0
+        for end, char in enumerate(folded, 1):
+            next_state = delta[state].get(char)
+            state = self._transition(state, char) if next_state is None else next_state
+            if outputs[state] and at_token_end(folded, end):
+                for length, category in outputs[state]:
+                    start = end - length
+                    if (start not in longest or longest[start][0] < length) and at_token_start(folded, start):
+                        longest[start] = (length, category)
+
+        matches = []
+        covered = 0
+        for start in sorted(longest):
+            if start < covered:
+                continue
+            length, category = longest[start]
+            matches.append(TaggedEntity(text[start:start + length], category, start, start + length))
+            covered = start + length
+        return matches
+
+    def annotate(self, text: str, matches: Optional[List[TaggedEntity]] = None) -> str:
+        """
+        Mark matches as «entity[Category], like sentence_classifier.annotate_sentence
+
+        Args:
+            text: Text to annotate
+            matches: Non-overlapping matches in text order; found with `find` if omitted
+        """
+        if matches is None:
+            matches = self.find(text)
+        pieces = []
+        position = 0
+        for match in matches:
+            pieces.append(text[position:match.start])
+            pieces.append(f"«{text[match.start:match.end]}[{match.category}]")
+            position = match.end
+        pieces.append(text[position:])
+        return "".join(pieces)
+
+    def __repr__(self):
+        return f"AhoCorasickAnnotator(patterns={self.size}, states={len(self.goto)}, ignore_case={self.ignore_case})"
+
+def find_by_scanning(patterns: Dict[str, str], text: str) -> List[TaggedEntity]:
+    """Reference matcher: one str.find scan of the text per pattern"""
+    longest: Dict[int, Tuple[int, str]] = {}
+    for pattern, category in patterns.items():
+        pattern = " ".join(pattern.split())
+        start = text.find(pattern)
+        while start >= 0:
+            end = start + len(pattern)
+            if at_token_start(text, start) and at_token_end(text, end):
+                if start not in longest or longest[start][0] < len(pattern):
+                    longest[start] = (len(pattern), category)
+            start = text.find(pattern, start + 1)
+
+    matches = []
+    covered = 0
+    for start in sorted(longest):
+        if start >= covered:
+            length, category = longest[start]
+            matches.append(TaggedEntity(text[start:start + length], category, start, start + length))
+            covered = start + length
+    return matches
+
+def run_benchmark(patterns: Dict[str, str], repeat: int = 5, scan_sentences: int = 50) -> None:
+    """
+    Measure annotation throughput on the full hymns.json text
+
+    Args:
+        patterns: Surface form -> category
+        repeat: Timed passes over the corpus
+        scan_sentences: Sentences timed with the per-pattern scan (it is slow)
+    """
+    start_time = time.perf_counter()
+    annotator = AhoCorasickAnnotator(patterns)
+    build_time = time.perf_counter() - start_time
+    sentences = load_hymn_sentences()
+    total_chars = sum(len(s) for s in sentences)
+    print(f"Compiled {annotator.size} patterns into {len(annotator.goto)} states in {build_time * 1000:.1f} ms")
+    print(f"Benchmark corpus: {len(sentences)} sentences, {total_chars} characters from {HYMNS_PATH}\n")
+
+    def report(name: str, elapsed: float, count: int, found: int) -> None:
+        print(f"{name:<28} {count / elapsed:>10,.0f} sentences/s {total_chars * count / len(sentences) / elapsed / 1e6:>7.2f} MB/s "
+              f"({found} matches)")
+
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        annotated = [annotator.annotate(sentence) for sentence in sentences]
+    elapsed = (time.perf_counter() - start_time) / repeat
+    ac_matches = [annotator.find(sentence) for sentence in sentences]
+    report("Aho-Corasick annotate", elapsed, len(sentences), sum(len(m) for m in ac_matches))
+
+    # Whole corpus as one text, to show the pass is linear in text length
+    corpus = "\n".join(sentences)
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        found = len(annotator.find(corpus))
+    elapsed = (time.perf_counter() - start_time) / repeat
+    report("Aho-Corasick (one text)", elapsed, len(sentences), found)
+
+    tagger = PhraseTagger(patterns)
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        tagged = [tagger.tag(sentence) for sentence in sentences]
+    elapsed = (time.perf_counter() - start_time) / repeat
+    report("PhraseTagger tag", elapsed, len(sentences), sum(len(t) for t in tagged))
+
+    sample = sentences[:scan_sentences]
+    start_time = time.perf_counter()
+    scanned = [find_by_scanning(patterns, sentence) for sentence in sample]
+    elapsed = time.perf_counter() - start_time
+    report(f"str.find per pattern ({len(sample)})", elapsed, len(sample), sum(len(s) for s in scanned))
+
+    same = sum(
+        [(m.start, m.end) for m in a] == [(m.start, m.end) for m in b]
+        for a, b in zip(scanned, ac_matches)
+    )
+    agree = sum(
+        [(m.start, m.end) for m in a] == [(m.start, m.end) for m in b]
+        for a, b in zip(tagged, ac_matches)
+    )
+    print(f"\nSame matches as the per-pattern scan: {same}/{len(sample)} sentences")
+    print(f"Same matches as PhraseTagger: {agree}/{len(sentences)} sentences")
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Annotate entities with an Aho-Corasick automaton")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    annotate_parser = subparsers.add_parser("annotate", help="Annotate a sentence")
+    annotate_parser.add_argument("--sentence", type=str, required=True, help="Sentence to annotate")
+    annotate_parser.add_argument("--ignore-case", action="store_true", help="Match patterns case-insensitively")
+    annotate_parser.add_argument("--with-spans", action="store_true",
+                                 help="Also match span metadata texts (labeled SPAN:<category>)")
+
+    bench_parser = subparsers.add_parser("benchmark", help="Measure throughput on the full hymns.json text")
+    bench_parser.add_argument("--repeat", type=int, default=5, help="Timed passes over the corpus")
+    bench_parser.add_argument("--scan-sentences", type=int, default=50,
+                              help="Sentences to time with the per-pattern str.find baseline")
+    bench_parser.add_argument("--with-spans", action="store_true",
+                              help="Also compile span metadata texts (about 10x more patterns)")
+
+    args = parser.parse_args()
+
+    if args.command == "annotate":
+        annotator = AhoCorasickAnnotator(load_entity_patterns(include_spans=args.with_spans),
+                                         ignore_case=args.ignore_case)
+        matches = annotator.find(args.sentence)
+        print(f"Sentence: {args.sentence}")
+        print(f"Found {len(matches)} entities:")
+        for match in matches:
+            print(f"  - {match.text} ({match.category}) at positions {match.start}-{match.end}")
+        print("\nAnnotated sentence:")
+        print(annotator.annotate(args.sentence, matches))
+    elif args.command == "benchmark":
+        run_benchmark(load_entity_patterns(include_spans=args.with_spans), repeat=args.repeat,
+                      scan_sentences=args.scan_sentences)
+    else:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
@@ -7,19 +7,39 @@ into different types of deities (e.g., Olympian, Chthonic, Titan, Nature, etc.).
 """
 
 import json
-import httpx
 import argparse
+import statistics
+import sys
 from pathlib import Path
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 import asyncio
-from pydantic import BaseModel
+import time
+from pydantic import BaseModel, ValidationError
+
+# Allow running as a script from the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tools.classification_cache import CACHE_PATH, ClassificationCache
+from tools.entity_index import load_entity_index
+from tools.entity_normalizer import load_normalizer
+from tools.ollama_client import DEFAULT_MODEL_KEEP_ALIVE, DEFAULT_TIMEOUT, OLLAMA_URL, OllamaClient
+from tools.rate_control import AdaptiveLimiter
 
 # Constants
 DATA_DIR = Path("data")
 LINGUISTICS_DIR = DATA_DIR / "enriched" / "linguistics"
-OLLAMA_URL = "http://localhost:11434/api/generate"  # Default Ollama server URL
 DEFAULT_MODEL = "gemma3:27b"  # Updated to use gemma3:27b
 
+# Category descriptions shared by the single and multi-entity prompts
+CATEGORY_DESCRIPTIONS = """    - Olympian (major gods residing on Mount Olympus)
+    - Chthonic (underworld or earth deities)
+    - Titan (pre-Olympian primordial deities)
+    - Nature (deities representing natural forces)
+    - Abstract (deities representing concepts)
+    - Hero/Mortal (deified humans or heroes)
+    - Other (specify if none of the above but still a mythological figure)
+    - IRRELEVANT (not a deity, mythological figure, or relevant entity - e.g., common nouns, places, or other misidentified entities)"""
+VALID_CATEGORIES = {"Olympian", "Chthonic", "Titan", "Nature", "Abstract", "Hero/Mortal", "Other", "IRRELEVANT"}
+
 class DeityClassification(BaseModel):
     """Model for deity classification results"""
     entity: str
@@ -32,102 +52,36 @@ class DeityClassification(BaseModel):
 
 async def load_entity_contexts() -> List[Tuple[str, str, int, int, str, int]]:
     """
-    Load entities with their line contexts from linguistic_features.json
+    Load entities with their line contexts from the entity occurrence index
+    
+    Numeric entities are removed when the index is built (see tools/entity_index.py).
     
     Returns:
         List of (entity, context, start_char, end_char, hymn_id, line_num) tuples
     """
-    # Define numeric words to filter out
-    numeric_words = {
-        "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
-        "first", "second", "third", "fourth", "fifth", "sixth", "seventh", "eighth", "ninth", "tenth",
-        "thrice", "twice", "once", "hundred", "thousand", "million"
-    }
-    
-    # Counters for filtered entities
-    total_entities = 0
-    filtered_by_label = 0
-    filtered_by_digit = 0
-    filtered_by_pos = 0
-    filtered_by_word = 0
-    
     try:
-        # Load the full linguistic features file
-        features_path = LINGUISTICS_DIR / "linguistic_features.json"
-        with open(features_path, 'r') as f:
-            features_data = json.load(f)
-        
-        # Extract entities with their contexts
-        entity_contexts = []
+        index = load_entity_index()
         
-        # Process each hymn
-        for hymn in features_data:
-            hymn_id = hymn.get("hymn_id", "unknown")
-            
-            # Process each line in the hymn
-            for line_data in hymn.get("per_line", []):
-                line_num = line_data.get("line_num", 0)
-                pos_tags = line_data.get("pos_tags", [])
-                
-                # Create a map of tokens to their POS tags for quick lookup
-                token_pos_map = {}
-                for pos_tag in pos_tags:
-                    if isinstance(pos_tag, list) and len(pos_tag) >= 2:
-                        token, pos = pos_tag[0], pos_tag[1]
-                        token_pos_map[token] = pos
-                
-                # Get line entities
-                for entity in line_data.get("entities", []):
-                    total_entities += 1
-                    entity_text = entity.get("text", "")
-                    entity_label = entity.get("label", "")
-                    start_char = entity.get("start_char", -1)
-                    end_char = entity.get("end_char", -1)
-                    
-                    # Filter out entities that are not likely deities
-                    
-                    # 1. Skip if entity is labeled as a number by Spacy
-                    if entity_label in ["CARDINAL", "ORDINAL", "QUANTITY"]:
-                        filtered_by_label += 1
-                        continue
-                    
-                    # 2. Skip if entity text is a pure number
-                    if entity_text.isdigit():
-                        filtered_by_digit += 1
-                        continue
-                    
-                    # 3. Skip if POS tag is NUM
-                    if token_pos_map.get(entity_text) == "NUM":
-                        filtered_by_pos += 1
-                        continue
-                    
-                    # 4. Skip if the entity text is a common numeric word
-                    if entity_text.lower() in numeric_words:
-                        filtered_by_word += 1
-                        continue
-                    
-                    # Get the full context by extracting the text from pos_tags
-                    line_text = " ".join([tag[0] for tag in pos_tags if isinstance(tag, list) and tag])
-                    
-                    # Create a context with hymn ID and line number
-                    context = f"Hymn {hymn_id}, Line {line_num}: {line_text}"
-                    
-                    entity_contexts.append((
-                        entity_text, 
-                        context, 
-                        start_char, 
-                        end_char, 
-                        hymn_id, 
-                        line_num
-                    ))
+        entity_contexts = [
+            (
+                occurrence.entity,
+                occurrence.context,
+                occurrence.start_char,
+                occurrence.end_char,
+                occurrence.hymn_id,
+                occurrence.line_num
+            )
+            for occurrence in index
+        ]
         
         # Print filtering statistics
+        filtered = index.filtered
         print(f"Entity filtering statistics:")
-        print(f"  Total entities found: {total_entities}")
-        print(f"  Filtered by entity label (CARDINAL/ORDINAL/QUANTITY): {filtered_by_label}")
-        print(f"  Filtered by digit check: {filtered_by_digit}")
-        print(f"  Filtered by POS tag (NUM): {filtered_by_pos}")
-        print(f"  Filtered by numeric word list: {filtered_by_word}")
+        print(f"  Total entities found: {filtered['total']}")
+        print(f"  Filtered by entity label (CARDINAL/ORDINAL/QUANTITY): {filtered['label']}")
+        print(f"  Filtered by digit check: {filtered['digit']}")
+        print(f"  Filtered by POS tag (NUM): {filtered['pos']}")
+        print(f"  Filtered by numeric word list: {filtered['word']}")
         print(f"  Remaining entities after filtering: {len(entity_contexts)}")
         
         return entity_contexts
@@ -167,7 +121,8 @@ async def classify_entity(
     hymn_id: str = "",
     line_num: int = -1,
     model: str = DEFAULT_MODEL, 
-    ollama_url: str = OLLAMA_URL
+    ollama_url: str = OLLAMA_URL,
+    client: Optional[OllamaClient] = None
 ) -> DeityClassification:
     """
     Classify an entity using the Ollama LLM.
@@ -180,7 +135,8 @@ async def classify_entity(
         hymn_id: Hymn ID
         line_num: Line number
         model: The Ollama model to use
-        ollama_url: The URL of the Ollama API
+        ollama_url: The URL of the Ollama API (used when no client is given)
+        client: Shared Ollama client; a one-off client is created if omitted
         
     Returns:
         DeityClassification with category
@@ -192,14 +148,7 @@ async def classify_entity(
     CONTEXT: {context}
     
     Classify '{entity}' into one of these categories:
-    - Olympian (major gods residing on Mount Olympus)
-    - Chthonic (underworld or earth deities)
-    - Titan (pre-Olympian primordial deities)
-    - Nature (deities representing natural forces)
-    - Abstract (deities representing concepts)
-    - Hero/Mortal (deified humans or heroes)
-    - Other (specify if none of the above but still a mythological figure)
-    - IRRELEVANT (not a deity, mythological figure, or relevant entity - e.g., common nouns, places, or other misidentified entities)
+{CATEGORY_DESCRIPTIONS}
     
     Provide your answer strictly in the following JSON format:
     {{
@@ -209,51 +158,45 @@ async def classify_entity(
     Return ONLY the JSON with no additional text, explanations, or formatting.
     """
     
-    # Prepare the request to Ollama
-    payload = {
-        "model": model,
-        "prompt": prompt,
-        "stream": False,
-        "format": "json"
-    }
-    
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(ollama_url, json=payload)
-            response.raise_for_status()
-            result = response.json()
+        if client is not None:
+            result = await client.generate(model, prompt)
+        else:
+            # One-off client for callers that don't hold a shared one
+            async with OllamaClient(ollama_url, max_connections=1) as one_off:
+                result = await one_off.generate(model, prompt)
+        
+        # Extract the response text
+        response_text = result.get("response", "")
+        
+        # Parse the JSON response
+        try:
+            # Try to parse the JSON directly
+            classification_data = json.loads(response_text)
             
-            # Extract the response text
-            response_text = result.get("response", "")
+            # Create DeityClassification object
+            classification = DeityClassification(
+                entity=entity,
+                category=classification_data.get("category", "Unknown"),
+                context=context,  # Store the context with the classification
+                start_char=start_char,
+                end_char=end_char,
+                hymn_id=hymn_id,
+                line_num=line_num
+            )
+            return classification
             
-            # Parse the JSON response
-            try:
-                # Try to parse the JSON directly
-                classification_data = json.loads(response_text)
-                
-                # Create DeityClassification object
-                classification = DeityClassification(
-                    entity=entity,
-                    category=classification_data.get("category", "Unknown"),
-                    context=context,  # Store the context with the classification
-                    start_char=start_char,
-                    end_char=end_char,
-                    hymn_id=hymn_id,
-                    line_num=line_num
-                )
-                return classification
-                
-            except json.JSONDecodeError:
-                # Fallback for malformed JSON
-                return DeityClassification(
-                    entity=entity,
-                    category="Unknown",
-                    context=context,
-                    start_char=start_char,
-                    end_char=end_char,
-                    hymn_id=hymn_id,
-                    line_num=line_num
-                )
+        except json.JSONDecodeError:
+            # Fallback for malformed JSON
+            return DeityClassification(
+                entity=entity,
+                category="Unknown",
+                context=context,
+                start_char=start_char,
+                end_char=end_char,
+                hymn_id=hymn_id,
+                line_num=line_num
+            )
                 
     except Exception as e:
         print(f"Error classifying entity {entity}: {e}")
@@ -267,18 +210,206 @@ async def classify_entity(
             line_num=line_num
         )
 
+def build_group_prompt(group: List[Tuple[str, str]]) -> str:
+    """
+    Build one prompt that asks for the categories of several entities.
+    
+    Args:
+        group: (entity, context) pairs
+        
+    Returns:
+        Prompt text requesting a JSON array with one classification per entity
+    """
+    entity_lines = "\n".join(
+        f"    {number}. ENTITY: {entity}\n       CONTEXT: {context}"
+        for number, (entity, context) in enumerate(group, 1)
+    )
+    return f"""
+    As an expert in Greek mythology and the Orphic tradition, your task is to analyze and classify each of the following deities or entities based on the line in which it appears:
+    
+{entity_lines}
+    
+    Classify each entity into one of these categories:
+{CATEGORY_DESCRIPTIONS}
+    
+    Provide your answer strictly in the following JSON format, with one object per entity in the order given:
+    {{
+      "classifications": [
+        {{"entity": "THE_ENTITY", "category": "THE_CATEGORY"}}
+      ]
+    }}
+    
+    Return ONLY the JSON with no additional text, explanations, or formatting.
+    """
+
+def parse_group_response(response_text: str, group: List[Tuple[str, str]]) -> List[Optional[DeityClassification]]:
+    """
+    Validate a multi-entity response against the requested entities.
+    
+    Each array element must validate as a DeityClassification, name one of
+    the requested entities and use one of the known categories.
+    
+    Args:
+        response_text: Raw model output
+        group: The (entity, context) pairs that were asked about
+        
+    Returns:
+        One classification per requested entity, or None where the response
+        has no valid answer for it
+    """
+    try:
+        data = json.loads(response_text)
+    except json.JSONDecodeError:
+        return [None] * len(group)
+    
+    # Accept both the requested wrapper object and a bare array
+    items = data.get("classifications") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return [None] * len(group)
+    
+    categories: Dict[str, str] = {}
+    for item in items:
+        try:
+            answer = DeityClassification.model_validate(item)
+        except ValidationError:
+            continue
+        if answer.category in VALID_CATEGORIES:
+            categories.setdefault(answer.entity.casefold(), answer.category)
+    
+    results: List[Optional[DeityClassification]] = []
+    for entity, context in group:
+        category = categories.get(entity.casefold())
+        results.append(
+            DeityClassification(entity=entity, category=category, context=context) if category else None
+        )
+    return results
+
+async def request_group(
+    group: List[Tuple[str, str]],
+    model: str = DEFAULT_MODEL,
+    client: Optional[OllamaClient] = None
+) -> List[Optional[DeityClassification]]:
+    """
+    Send one multi-entity request, without falling back.
+    
+    Returns:
+        One classification per entity, or None where the response had no
+        valid answer (all None if the request failed)
+    """
+    prompt = build_group_prompt(group)
+    try:
+        if client is not None:
+            result = await client.generate(model, prompt)
+        else:
+            async with OllamaClient(max_connections=1) as one_off:
+                result = await one_off.generate(model, prompt)
+    except Exception as e:
+        print(f"Error classifying group of {len(group)} entities: {e}")
+        return [None] * len(group)
+    return parse_group_response(result.get("response", ""), group)
+
+async def classify_entity_group(
+    group: List[Tuple[str, str]],
+    model: str = DEFAULT_MODEL,
+    client: Optional[OllamaClient] = None
+) -> List[DeityClassification]:
+    """
+    Classify several entities with one Ollama request.
+    
+    Entities without a valid answer in the response (or all of them, if the
+    request fails) fall back to single-entity `classify_entity` calls.
+    
+    Args:
+        group: (entity, context) pairs
+        model: The Ollama model to use
+        client: Shared Ollama client; a one-off client is created if omitted
+        
+    Returns:
+        One DeityClassification per entity, in the order given
+    """
+    if len(group) == 1:
+        entity, context = group[0]
+        return [await classify_entity(entity, context, model=model, client=client)]
+    
+    results = await request_group(group, model=model, client=client)
+    for i, (entity, context) in enumerate(group):
+        if results[i] is None:
+            results[i] = await classify_entity(entity, context, model=model, client=client)
+    return results
+
+class ProgressReporter:
+    """Print per-entity progress with throughput, estimated time remaining and rate control state"""
+    
+    def __init__(self, total: int, limiter: Optional[AdaptiveLimiter] = None):
+        self.total = total
+        self.done = 0
+        self.start_time = time.monotonic()
+        self.limiter = limiter
+    
+    def update(self, entity: str, category: str, instances: int) -> None:
+        """Record one finished entity and print a progress line"""
+        self.done += 1
+        elapsed = time.monotonic() - self.start_time
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - self.done) / rate if rate > 0 else 0.0
+        line = (f"[{self.done}/{self.total}] {entity} ({instances} instances): {category} | "
+                f"{rate:.2f} entities/s, elapsed {elapsed:.0f}s, ETA {eta:.0f}s")
+        if self.limiter is not None:
+            line += f" | {self.limiter.describe()}"
+        print(line)
+
 async def classify_all_entities_with_context(
     model: str = DEFAULT_MODEL, 
     output_file: str = "deity_classifications.json",
-    max_entities: int = 500
+    max_entities: int = 500,
+    concurrency: int = 4,
+    adaptive: bool = True,
+    timeout: float = DEFAULT_TIMEOUT,
+    model_keep_alive: Optional[str] = DEFAULT_MODEL_KEEP_ALIVE,
+    cache_path: Optional[str] = str(CACHE_PATH),
+    group_size: int = 1,
+    preclassify: bool = False,
+    normalize: bool = True,
+    lemma: bool = False
 ) -> None:
     """
     Classify entities with their line contexts from the linguistics data.
     
+    Unique entities are put on a queue and classified by a pool of workers.
+    All requests share one keep-alive HTTP client, whose limiter bounds the
+    number of requests in flight at the Ollama server. In adaptive mode the
+    limit starts at 1 and follows the server: it grows while latency stays
+    near its baseline, and is cut (with a pause) on rising latency, timeouts
+    and 5xx responses. Results are assembled in the original (most frequent
+    first) order.
+    
+    Each result is appended to the classification cache as soon as it
+    arrives; entities already cached for this model and context are not
+    sent to the LLM again, so an interrupted run can simply be restarted.
+    
+    With group_size > 1, each request asks about several entities at once
+    (see `classify_entity_group`). With preclassify, entities that the
+    embedding pre-classifier (tools/preclassifier.py) labels confidently
+    from the existing classifications are not sent to the LLM at all.
+    
+    With normalize, surface forms are first grouped under a canonical name
+    (case, articles, possessives and the alias table; see
+    tools/entity_normalizer.py), so variants share one classification that
+    is written back to every original occurrence.
+    
     Args:
         model: The Ollama model to use
         output_file: Path to save the results
         max_entities: Maximum number of entities to process
+        concurrency: Maximum number of concurrent Ollama requests
+        adaptive: Adapt concurrency to the server; otherwise keep it at `concurrency`
+        timeout: Per-request timeout in seconds
+        model_keep_alive: How long Ollama keeps the model loaded between requests
+        cache_path: Classification cache file, or None to disable caching
+        group_size: Entities per Ollama request
+        preclassify: Skip the LLM for confidently pre-classified entities
+        normalize: Group surface-form variants before classification
+        lemma: Also lemmatize surface forms with spaCy when normalizing
     """
     print("Starting entity context loading...")
     entity_contexts = await load_entity_contexts()
@@ -288,14 +419,23 @@ async def classify_all_entities_with_context(
         print("No entity contexts found to classify.")
         return
     
-    # Group entity instances by name
+    # Map surface forms to canonical names
+    if normalize:
+        canonical = load_normalizer(lemma).group(entity for entity, *_ in entity_contexts)
+    else:
+        canonical = {entity: entity for entity, *_ in entity_contexts}
+    
+    # Group entity instances by canonical name
     entity_groups = {}
     for entity, context, start_char, end_char, hymn_id, line_num in entity_contexts:
-        if entity not in entity_groups:
-            entity_groups[entity] = []
-        entity_groups[entity].append((context, start_char, end_char, hymn_id, line_num))
+        name = canonical[entity]
+        if name not in entity_groups:
+            entity_groups[name] = []
+        entity_groups[name].append((context, start_char, end_char, hymn_id, line_num, entity))
     
     print(f"Found {len(entity_contexts)} entity instances across {len(entity_groups)} unique entities")
+    if normalize:
+        print(f"Normalization grouped {len(canonical)} surface forms into {len(entity_groups)} entities")
     
     # Take the top entities based on frequency
     sorted_entities = sorted(entity_groups.keys(), 
@@ -304,54 +444,109 @@ async def classify_all_entities_with_context(
     
     # Limit to max_entities unique entities
     entities_to_process = sorted_entities[:max_entities]
-    print(f"Processing top {len(entities_to_process)} unique entities...")
+    concurrency = max(1, concurrency)
+    print(f"Processing top {len(entities_to_process)} unique entities with up to {concurrency} concurrent requests...")
     
-    # Classify each unique entity once
-    classifications = []
+    results: List[Any] = [None] * len(entities_to_process)
+    cache = ClassificationCache(Path(cache_path)) if cache_path else None
     
-    for i, entity in enumerate(entities_to_process):
-        # Get all instances of this entity
-        instances = entity_groups[entity]
-        
+    # Collect every uncached entity with its position, so results can be put back in order
+    pending = []
+    for position, entity in enumerate(entities_to_process):
         # Use the first instance for classification
-        first_instance = instances[0]
-        context, _, _, _, _ = first_instance
-        
-        print(f"Processing {i+1}/{len(entities_to_process)}: {entity} ({len(instances)} instances)")
-        print(f"Using context for classification: {context}")
+        context = entity_groups[entity][0][0]
+        category = cache.get(model, entity, context) if cache is not None else None
+        if category is not None:
+            results[position] = DeityClassification(entity=entity, category=category, context=context)
+        else:
+            pending.append((position, entity, context))
+    
+    if cache is not None:
+        print(f"Classification cache {cache.path}: {cache.hits} entities cached, "
+              f"{len(pending)} to classify")
+    
+    if preclassify and pending:
+        # NumPy is only needed for this stage
+        from tools.preclassifier import load_preclassifier
         
-        try:
-            # Classify the entity
-            print(f"Calling Ollama API for {entity}...")
-            classification = await classify_entity(
-                entity, 
-                context,
-                model=model
-            )
-            print(f"Received classification: {classification.category}")
-            
-            # Create entry for each instance with its specific offsets
-            for instance_context, start_char, end_char, hymn_id, line_num in instances:
-                compact_classification = {
-                    "entity": entity,
-                    "category": classification.category,
-                    "start_char": start_char,
-                    "end_char": end_char,
-                    "hymn_id": hymn_id,
-                    "line_num": line_num
-                }
-                classifications.append(compact_classification)
+        predictions = load_preclassifier().predict_many([(entity, context) for _, entity, context in pending])
+        still_pending = []
+        for item, prediction in zip(pending, predictions):
+            position, entity, context = item
+            if prediction.confident:
+                results[position] = DeityClassification(entity=entity, category=prediction.category, context=context)
+            else:
+                still_pending.append(item)
+        print(f"Pre-classification avoided {len(pending) - len(still_pending)}/{len(pending)} LLM calls")
+        pending = still_pending
+    
+    # Queue groups of up to group_size entities, one request each
+    group_size = max(1, group_size)
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(0, len(pending), group_size):
+        queue.put_nowait(pending[i:i + group_size])
+    
+    limiter = AdaptiveLimiter(max_concurrency=concurrency) if adaptive else AdaptiveLimiter.fixed(concurrency)
+    progress = ProgressReporter(len(pending), limiter)
+    
+    async def worker() -> None:
+        while True:
+            try:
+                group = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
             
-        except Exception as e:
-            print(f"Error classifying {entity}: {e}")
-            print(f"Skipping {entity} and continuing...")
+            try:
+                classifications = await classify_entity_group(
+                    [(entity, context) for _, entity, context in group],
+                    model=model,
+                    client=client
+                )
+                for (position, entity, context), classification in zip(group, classifications):
+                    results[position] = classification
+                    if cache is not None:
+                        cache.put(model, entity, context, classification.category)
+                    progress.update(entity, classification.category, len(entity_groups[entity]))
+            except Exception as e:
+                entities = ", ".join(entity for _, entity, _ in group)
+                print(f"Error classifying {entities}: {e}")
+                print(f"Skipping {entities} and continuing...")
+            finally:
+                queue.task_done()
+    
+    async with OllamaClient(
+        max_connections=concurrency,
+        timeout=timeout,
+        model_keep_alive=model_keep_alive,
+        limiter=limiter
+    ) as client:
+        try:
+            await asyncio.gather(*(worker() for _ in range(min(concurrency, queue.qsize()))))
+        finally:
+            if cache is not None:
+                cache.close()
+    
+    # Create entry for each instance with its specific offsets, in entity order
+    classifications = []
+    for entity, classification in zip(entities_to_process, results):
+        if classification is None:
             continue
-            
-        # Small delay to prevent overloading Ollama
-        await asyncio.sleep(0.5)
+        for instance_context, start_char, end_char, hymn_id, line_num, surface in entity_groups[entity]:
+            compact_classification = {
+                "entity": surface,
+                "canonical": entity,
+                "category": classification.category,
+                "start_char": start_char,
+                "end_char": end_char,
+                "hymn_id": hymn_id,
+                "line_num": line_num
+            }
+            classifications.append(compact_classification)
     
     # Save results
-    print(f"Processing complete. Saving {len(classifications)} entity instances...")
+    print(f"Rate control: {limiter.describe()}, {dict(limiter.stats)}")
+    print(f"Processing complete in {time.monotonic() - progress.start_time:.1f}s. "
+          f"Saving {len(classifications)} entity instances...")
     output_path = Path(output_file)
     with open(output_path, 'w') as f:
         json.dump(classifications, f, indent=2)
@@ -363,8 +558,15 @@ async def classify_entity_interactive(model: str = DEFAULT_MODEL) -> None:
     """Interactive mode for classifying individual entities"""
     # Load entity contexts for lookup
     entity_contexts = await load_entity_contexts()
-    entity_context_map = {entity: context for entity, context in entity_contexts}
+    entity_context_map = {}
+    for entity, context, *_ in entity_contexts:
+        entity_context_map.setdefault(entity, context)
     
+    async with OllamaClient(max_connections=1) as client:
+        await _interactive_loop(entity_context_map, model, client)
+
+async def _interactive_loop(entity_context_map: Dict[str, str], model: str, client: OllamaClient) -> None:
+    """Prompt for entities until the user quits, reusing one client"""
     while True:
         entity = input("\nEnter entity to classify (or 'quit' to exit): ")
         if entity.lower() in ('quit', 'exit', 'q'):
@@ -384,13 +586,114 @@ async def classify_entity_interactive(model: str = DEFAULT_MODEL) -> None:
             context = input("Enter custom context: ")
         
         print(f"\nClassifying '{entity}'...")
-        classification = await classify_entity(entity, context, model)
+        classification = await classify_entity(entity, context, model=model, client=client)
         
         print("\nClassification Result:")
         print(f"Entity:      {classification.entity}")
         print(f"Context:     {classification.context}")
         print(f"Category:    {classification.category}")
 
+def _latency_summary(latencies: List[float]) -> str:
+    """Mean, median and p95 of request latencies in milliseconds"""
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return (f"mean {statistics.mean(ordered) * 1000:.1f} ms, "
+            f"p50 {statistics.median(ordered) * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms")
+
+async def benchmark_client(
+    model: str = DEFAULT_MODEL,
+    requests: int = 20,
+    entity: str = "Zeus",
+    context: str = "Hymn 0, Line 2: Kind Zeus and Earth, heavenly and pure flames of the sun."
+) -> None:
+    """
+    Compare request latency of a new client per call against one shared client.
+    
+    Requests are sent one at a time so that only connection handling differs.
+    """
+    print(f"Sending {requests} sequential requests per mode to {OLLAMA_URL} (model {model})")
+    
+    # Warm up the model so neither mode pays the load time
+    async with OllamaClient(max_connections=1) as client:
+        await classify_entity(entity, context, model=model, client=client)
+    
+    per_call = []
+    for _ in range(requests):
+        start_time = time.perf_counter()
+        await classify_entity(entity, context, model=model)
+        per_call.append(time.perf_counter() - start_time)
+    
+    shared = []
+    async with OllamaClient(max_connections=1) as client:
+        for _ in range(requests):
+            start_time = time.perf_counter()
+            await classify_entity(entity, context, model=model, client=client)
+            shared.append(time.perf_counter() - start_time)
+    
+    print(f"New client per call: {_latency_summary(per_call)}")
+    print(f"Shared client:       {_latency_summary(shared)}")
+    print(f"Mean saving per request: {(statistics.mean(per_call) - statistics.mean(shared)) * 1000:.1f} ms")
+
+async def benchmark_grouping(
+    model: str = DEFAULT_MODEL,
+    max_entities: int = 40,
+    group_size: int = 8,
+    concurrency: int = 1
+) -> None:
+    """
+    Compare one-entity-per-request classification against multi-entity prompts.
+    
+    Both modes classify the same most frequent entities; the one-at-a-time
+    categories serve as the reference for agreement.
+    """
+    entity_contexts = await load_entity_contexts()
+    contexts: Dict[str, str] = {}
+    counts: Dict[str, int] = {}
+    for entity, context, *_ in entity_contexts:
+        contexts.setdefault(entity, context)
+        counts[entity] = counts.get(entity, 0) + 1
+    entities = sorted(contexts, key=lambda e: counts[e], reverse=True)[:max_entities]
+    pairs = [(entity, contexts[entity]) for entity in entities]
+    groups = [pairs[i:i + group_size] for i in range(0, len(pairs), group_size)]
+    
+    print(f"Classifying {len(pairs)} entities with {OLLAMA_URL} (model {model}, concurrency {concurrency})")
+    in_flight = asyncio.Semaphore(max(1, concurrency))
+    
+    async with OllamaClient(max_connections=max(1, concurrency)) as client:
+        # Warm up the model so neither mode pays the load time
+        await classify_entity(*pairs[0], model=model, client=client)
+        
+        async def single(entity: str, context: str) -> DeityClassification:
+            async with in_flight:
+                return await classify_entity(entity, context, model=model, client=client)
+        
+        start_time = time.perf_counter()
+        single_results = await asyncio.gather(*(single(entity, context) for entity, context in pairs))
+        single_time = time.perf_counter() - start_time
+        
+        async def grouped(group: List[Tuple[str, str]]) -> List[Optional[DeityClassification]]:
+            async with in_flight:
+                return await request_group(group, model=model, client=client)
+        
+        start_time = time.perf_counter()
+        answers = [a for group_answers in await asyncio.gather(*(grouped(g) for g in groups)) for a in group_answers]
+        failed = [pair for pair, answer in zip(pairs, answers) if answer is None]
+        fallbacks = await asyncio.gather(*(single(entity, context) for entity, context in failed))
+        group_time = time.perf_counter() - start_time
+    
+    fallback_iter = iter(fallbacks)
+    group_results = [answer if answer is not None else next(fallback_iter) for answer in answers]
+    agree = sum(1 for a, b in zip(single_results, group_results) if a.category == b.category)
+    
+    print(f"One entity per request: {len(pairs)} requests, {single_time:.2f}s, "
+          f"{len(pairs) / single_time:.2f} entities/s")
+    print(f"{group_size} entities per request: {len(groups) + len(failed)} requests "
+          f"({len(failed)} single-entity fallbacks), {group_time:.2f}s, {len(pairs) / group_time:.2f} entities/s")
+    print(f"Agreement with one-at-a-time categories: {agree}/{len(pairs)} ({agree / len(pairs):.1%})")
+    for (entity, _), a, b in zip(pairs, single_results, group_results):
+        if a.category != b.category:
+            print(f"  {entity}: {a.category} (single) vs {b.category} (grouped)")
+
 def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(description="Classify entities as deity types using Ollama")
@@ -404,6 +707,41 @@ def main():
     batch_parser.add_argument("--output", type=str, default="data/enriched/deities/deity_classifications.json", 
                              help="Output file path")
     batch_parser.add_argument("--max", type=int, default=500, help="Maximum entities to process")
+    batch_parser.add_argument("--concurrency", type=int, default=4,
+                             help="Maximum number of concurrent Ollama requests")
+    batch_parser.add_argument("--fixed-concurrency", action="store_true",
+                             help="Keep --concurrency requests in flight instead of adapting to the server")
+    batch_parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                             help="Per-request timeout in seconds")
+    batch_parser.add_argument("--keep-alive", type=str, default=DEFAULT_MODEL_KEEP_ALIVE,
+                             help="How long Ollama keeps the model loaded between requests (e.g. 30m)")
+    batch_parser.add_argument("--cache", type=str, default=str(CACHE_PATH),
+                             help="Classification cache file; cached entities are not sent to the LLM")
+    batch_parser.add_argument("--no-cache", action="store_true",
+                             help="Classify every entity and do not record results in the cache")
+    batch_parser.add_argument("--group-size", type=int, default=1,
+                             help="Entities per Ollama request (multi-entity prompts when > 1)")
+    batch_parser.add_argument("--preclassify", action="store_true",
+                             help="Label entities close to existing classifications without the LLM")
+    batch_parser.add_argument("--no-normalize", action="store_true",
+                             help="Classify every exact surface form separately")
+    batch_parser.add_argument("--lemma", action="store_true",
+                             help="Also group surface forms by spaCy lemma")
+    
+    # Client latency comparison command
+    bench_parser = subparsers.add_parser("bench-client",
+                                         help="Compare per-call and shared HTTP client latency")
+    bench_parser.add_argument("--model", type=str, default=DEFAULT_MODEL, help="Ollama model to use")
+    bench_parser.add_argument("--requests", type=int, default=20, help="Requests per mode")
+    
+    # Multi-entity prompt comparison command
+    group_bench_parser = subparsers.add_parser("bench-group",
+                                               help="Compare one-entity and multi-entity prompts")
+    group_bench_parser.add_argument("--model", type=str, default=DEFAULT_MODEL, help="Ollama model to use")
+    group_bench_parser.add_argument("--max", type=int, default=40, help="Entities to classify per mode")
+    group_bench_parser.add_argument("--group-size", type=int, default=8, help="Entities per grouped request")
+    group_bench_parser.add_argument("--concurrency", type=int, default=1,
+                                    help="Maximum number of concurrent Ollama requests")
     
     # Interactive classification command
     interactive_parser = subparsers.add_parser("interactive", help="Interactively classify entities")
@@ -419,7 +757,15 @@ def main():
     
     # Run the appropriate command
     if args.command == "batch":
-        asyncio.run(classify_all_entities_with_context(args.model, args.output, args.max))
+        asyncio.run(classify_all_entities_with_context(
+            args.model, args.output, args.max, args.concurrency, not args.fixed_concurrency,
+            args.timeout, args.keep_alive, None if args.no_cache else args.cache,
+            args.group_size, args.preclassify, not args.no_normalize, args.lemma
+        ))
+    elif args.command == "bench-client":
+        asyncio.run(benchmark_client(args.model, args.requests))
+    elif args.command == "bench-group":
+        asyncio.run(benchmark_grouping(args.model, args.max, args.group_size, args.concurrency))
     elif args.command == "interactive":
         asyncio.run(classify_entity_interactive(args.model))
     else:
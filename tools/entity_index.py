@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Entity Occurrence Index for Cleros Orphicae
+
+This script builds a compact index of every named-entity occurrence in the
+linguistics output, so the classifier tools can look entities up without
+loading and walking the full linguistic features.
+
+Numeric entities (spaCy CARDINAL/ORDINAL/QUANTITY labels, digits, NUM tokens
+and number words) are removed when the index is built; they are kept in a
+separate list, with the reason, for inspection.
+
+Index layout (entity_index.json):
+    {
+        "version": 1,
+        "source": "data/enriched/linguistics/linguistic_features.jsonl",
+        "lines": [[hymn_id, line_num, text], ...],
+        "entities": ["Zeus", ...],                           # first-occurrence order
+        "occurrences": [entity_id, line_id, start_char, end_char, ...],  # corpus order
+        "numeric": [[text, label, reason, line_id, start_char, end_char], ...],
+        "filtered": {"total": n, "label": n, "digit": n, "pos": n, "word": n}
+    }
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Allow running as a script from the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tools import corpus
+from tools.io_utils import write_json_atomic
+
+# Constants
+DATA_DIR = Path("data")
+LINGUISTICS_DIR = DATA_DIR / "enriched" / "linguistics"
+INDEX_PATH = LINGUISTICS_DIR / "entity_index.json"
+INDEX_VERSION = 1
+
+NUMERIC_LABELS = {"CARDINAL", "ORDINAL", "QUANTITY"}
+NUMERIC_WORDS = {
+    "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+    "first", "second", "third", "fourth", "fifth", "sixth", "seventh", "eighth", "ninth", "tenth",
+    "thrice", "twice", "once", "hundred", "thousand", "million"
+}
+
+class EntityOccurrence:
+    """One occurrence of an entity in a hymn line"""
+    def __init__(self, entity: str, hymn_id: str, line_num: int, start_char: int, end_char: int, line_text: str):
+        self.entity = entity
+        self.hymn_id = hymn_id
+        self.line_num = line_num
+        self.start_char = start_char
+        self.end_char = end_char
+        self.line_text = line_text
+
+    @property
+    def context(self) -> str:
+        """The line context sent to the classifier"""
+        return f"Hymn {self.hymn_id}, Line {self.line_num}: {self.line_text}"
+
+    def __repr__(self):
+        return (f"EntityOccurrence(entity='{self.entity}', hymn_id='{self.hymn_id}', line_num={self.line_num}, "
+                f"start_char={self.start_char}, end_char={self.end_char})")
+
+def numeric_reason(text: str, label: str, token_pos: Dict[str, str]) -> Optional[str]:
+    """
+    Why an entity counts as numeric, or None if it does not.
+
+    Args:
+        text: Entity text
+        label: spaCy entity label
+        token_pos: Token -> POS tag for the entity's line
+    """
+    if label in NUMERIC_LABELS:
+        return "label"
+    if text.isdigit():
+        return "digit"
+    if token_pos.get(text) == "NUM":
+        return "pos"
+    if text.lower() in NUMERIC_WORDS:
+        return "word"
+    return None
+
+class EntityIndex:
+    """Entity occurrences with their lines, numeric entities removed"""
+
+    def __init__(self):
+        self.source = ""
+        self.lines: List[Tuple[str, int, str]] = []
+        self.entities: List[str] = []
+        self.occurrences: List[Tuple[int, int, int, int]] = []  # (entity_id, line_id, start, end)
+        self.numeric: List[Tuple[str, str, str, int, int, int]] = []
+        self.filtered: Dict[str, int] = {"total": 0, "label": 0, "digit": 0, "pos": 0, "word": 0}
+        self._by_entity: Optional[Dict[str, List[int]]] = None
+        self._by_line: Optional[Dict[Tuple[str, int], List[int]]] = None
+
+    @classmethod
+    def build(cls, features: Optional[Iterable[dict]] = None) -> "EntityIndex":
+        """
+        Build the index from decoded hymn features.
+
+        Args:
+            features: Hymn features; defaults to streaming the linguistics output
+        """
+        index = cls()
+        if features is None:
+            index.source = str(corpus.features_path())
+            features = corpus.hymn_features()
+
+        entity_ids: Dict[str, int] = {}
+        for hymn in features:
+            hymn_id = hymn["hymn_id"]
+            for line in hymn["per_line"]:
+                if not line["entities"]:
+                    continue
+                line_id = len(index.lines)
+                index.lines.append((hymn_id, line["line_num"], line["text"]))
+                token_pos = dict(zip(line["tokens"], line["pos"]))
+
+                for entity in line["entities"]:
+                    index.filtered["total"] += 1
+                    text, start, end = entity["text"], entity["start_char"], entity["end_char"]
+                    reason = numeric_reason(text, entity["label"], token_pos)
+                    if reason:
+                        index.filtered[reason] += 1
+                        index.numeric.append((text, entity["label"], reason, line_id, start, end))
+                        continue
+                    if text not in entity_ids:
+                        entity_ids[text] = len(index.entities)
+                        index.entities.append(text)
+                    index.occurrences.append((entity_ids[text], line_id, start, end))
+
+        return index
+
+    def save(self, path: Path = INDEX_PATH) -> None:
+        """Write the index as compact JSON"""
+        write_json_atomic(path, {
+            "version": INDEX_VERSION,
+            "source": self.source,
+            "lines": [list(line) for line in self.lines],
+            "entities": self.entities,
+            "occurrences": [n for occurrence in self.occurrences for n in occurrence],
+            "numeric": [list(item) for item in self.numeric],
+            "filtered": self.filtered
+        }, indent=None)
+
+    @classmethod
+    def load(cls, path: Path = INDEX_PATH) -> "EntityIndex":
+        """Load an index written by `save` (parsed once per process, see corpus.load_json)"""
+        data = corpus.load_json(path)
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"{path} has index version {data.get('version')}, expected {INDEX_VERSION}")
+
+        index = cls()
+        index.source = data["source"]
+        index.lines = [tuple(line) for line in data["lines"]]
+        index.entities = data["entities"]
+        flat = data["occurrences"]
+        index.occurrences = list(zip(flat[0::4], flat[1::4], flat[2::4], flat[3::4]))
+        index.numeric = [tuple(item) for item in data["numeric"]]
+        index.filtered = data["filtered"]
+        return index
+
+    def _occurrence(self, entity_id: int, line_id: int, start: int, end: int) -> EntityOccurrence:
+        hymn_id, line_num, text = self.lines[line_id]
+        return EntityOccurrence(self.entities[entity_id], hymn_id, line_num, start, end, text)
+
+    def __iter__(self):
+        """All occurrences in corpus order"""
+        for occurrence in self.occurrences:
+            yield self._occurrence(*occurrence)
+
+    def __len__(self) -> int:
+        return len(self.occurrences)
+
+    def occurrences_of(self, entity: str) -> List[EntityOccurrence]:
+        """Every occurrence of an entity, in corpus order"""
+        if self._by_entity is None:
+            self._by_entity = {}
+            for i, (entity_id, *_) in enumerate(self.occurrences):
+                self._by_entity.setdefault(self.entities[entity_id], []).append(i)
+        return [self._occurrence(*self.occurrences[i]) for i in self._by_entity.get(entity, [])]
+
+    def line_occurrences(self, hymn_id: str, line_num: int) -> List[EntityOccurrence]:
+        """Every entity occurrence in one line"""
+        if self._by_line is None:
+            self._by_line = {}
+            for i, (_, line_id, _, _) in enumerate(self.occurrences):
+                hymn, num, _ = self.lines[line_id]
+                self._by_line.setdefault((hymn, num), []).append(i)
+        return [self._occurrence(*self.occurrences[i]) for i in self._by_line.get((str(hymn_id), line_num), [])]
+
+    def numeric_entities(self) -> List[Tuple[EntityOccurrence, str, str]]:
+        """Removed numeric entities as (occurrence, label, reason)"""
+        results = []
+        for text, label, reason, line_id, start, end in self.numeric:
+            hymn_id, line_num, line_text = self.lines[line_id]
+            results.append((EntityOccurrence(text, hymn_id, line_num, start, end, line_text), label, reason))
+        return results
+
+def load_entity_index(path: Path = INDEX_PATH) -> EntityIndex:
+    """
+    Load the entity index, building and saving it first if it is missing or
+    older than the linguistics output it was built from.
+    """
+    source = corpus.features_path()
+    if path.exists() and (not source.exists() or path.stat().st_mtime >= source.stat().st_mtime):
+        return EntityIndex.load(path)
+
+    print(f"Building entity index from {source}...")
+    index = EntityIndex.build()
+    index.save(path)
+    return index
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Build and query the entity occurrence index")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    build_parser = subparsers.add_parser("build", help="Build the index from the linguistics output")
+    build_parser.add_argument("--output", type=str, default=str(INDEX_PATH), help="Index output file")
+
+    lookup_parser = subparsers.add_parser("lookup", help="List the occurrences of an entity")
+    lookup_parser.add_argument("entity", type=str, help="Entity text, e.g. Zeus")
+    lookup_parser.add_argument("--index", type=str, default=str(INDEX_PATH), help="Index file")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start_time = time.perf_counter()
+        index = EntityIndex.build()
+        index.save(Path(args.output))
+        print(f"Indexed {len(index)} occurrences of {len(index.entities)} entities on {len(index.lines)} lines "
+              f"({len(index.numeric)} numeric entities removed) in {time.perf_counter() - start_time:.2f}s")
+        print(f"Index saved to {args.output}")
+    elif args.command == "lookup":
+        start_time = time.perf_counter()
+        index = load_entity_index(Path(args.index))
+        load_time = time.perf_counter() - start_time
+
+        occurrences = index.occurrences_of(args.entity)
+        for occurrence in occurrences:
+            print(f"Hymn {occurrence.hymn_id:>3}, Line {occurrence.line_num:>2} "
+                  f"[{occurrence.start_char}:{occurrence.end_char}]: {occurrence.line_text}")
+        print(f"\n{len(occurrences)} occurrences (index loaded in {load_time * 1000:.1f} ms)")
+    else:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Entity Surface-Form Normalizer for Cleros Orphicae
+
+This script collapses variant surface forms of an entity ("Night", "night",
+"the night", "Night's") into one canonical key before classification, so
+each entity costs one LLM call however it is written. The classification
+is then fanned back out to every original occurrence.
+
+Normalization steps:
+    1. whitespace collapsing and case folding
+    2. leading article stripping (the, a, an)
+    3. possessive stripping ('s, s')
+    4. optional lemmatization with spaCy (e.g. "Nymphs" -> "nymph")
+    5. alias table lookup (entity_aliases.json), e.g. "Deo" -> "Demeter"
+"""
+
+import argparse
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Allow running as a script from the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tools import corpus
+from tools.corpus import DEITIES_DIR
+from tools.entity_index import load_entity_index
+
+# Constants
+ALIASES_PATH = DEITIES_DIR / "entity_aliases.json"
+LEMMA_MODEL = "en_core_web_trf"  # Model used by the linguistics enrichment
+
+ARTICLE_PATTERN = re.compile(r"^(the|a|an)\s+", re.IGNORECASE)
+POSSESSIVE_PATTERN = re.compile(r"(['’]s|(?<=s)['’])$", re.IGNORECASE)
+
+def strip_surface(text: str) -> str:
+    """Remove a leading article and a trailing possessive, keeping case"""
+    text = " ".join(text.split())
+    text = ARTICLE_PATTERN.sub("", text)
+    return POSSESSIVE_PATTERN.sub("", text).strip()
+
+def load_aliases(path: Path = ALIASES_PATH) -> Dict[str, str]:
+    """
+    Load the alias table.
+
+    The file maps each canonical name to its aliases:
+        {"aliases": {"Dionysos": ["Bacchos", "Bromios"], ...}}
+
+    Returns:
+        Normalized alias -> canonical name (canonical names map to themselves)
+    """
+    if not path.exists():
+        return {}
+    data = corpus.load_json(path)
+
+    table = {}
+    for canonical, aliases in data.get("aliases", {}).items():
+        table[strip_surface(canonical).casefold()] = canonical
+        for alias in aliases:
+            table[strip_surface(alias).casefold()] = canonical
+    return table
+
+def spacy_lemmatizer(model: str = LEMMA_MODEL) -> Callable[[List[str]], List[str]]:
+    """Batch lemmatizer over spaCy's lemmas; requires the model to be installed"""
+    import spacy
+
+    nlp = spacy.load(model, disable=["ner", "parser"])
+    return lambda texts: [" ".join(token.lemma_ for token in doc) for doc in nlp.pipe(texts)]
+
+class EntityNormalizer:
+    """Map entity surface forms to canonical keys and display names"""
+
+    def __init__(
+        self,
+        aliases: Optional[Dict[str, str]] = None,
+        lemmatizer: Optional[Callable[[List[str]], List[str]]] = None
+    ):
+        """
+        Args:
+            aliases: Normalized alias -> canonical name (see `load_aliases`)
+            lemmatizer: Optional batch lemmatizer applied after case folding
+        """
+        self.aliases = aliases or {}
+        self.lemmatizer = lemmatizer
+        self._lemmas: Dict[str, str] = {}
+
+    def _prepare(self, surfaces: Iterable[str]) -> None:
+        """Lemmatize every not yet seen form in one batch"""
+        if self.lemmatizer is None:
+            return
+        forms = sorted({strip_surface(s).casefold() for s in surfaces} - self._lemmas.keys())
+        if forms:
+            self._lemmas.update(zip(forms, (lemma.casefold() for lemma in self.lemmatizer(forms))))
+
+    def key(self, surface: str) -> str:
+        """Canonical grouping key of a surface form"""
+        form = strip_surface(surface).casefold()
+        if form in self.aliases:
+            return self.aliases[form].casefold()
+        if self.lemmatizer is not None:
+            self._prepare([surface])
+            lemma = self._lemmas[form]
+            return self.aliases.get(lemma, lemma).casefold()
+        return form
+
+    def group(self, surfaces: Iterable[str]) -> Dict[str, str]:
+        """
+        Assign every surface form its canonical display name.
+
+        The display name is the alias table's canonical name if there is one,
+        otherwise the group's most frequent stripped form, preferring a
+        capitalized (proper noun) form on ties.
+
+        Args:
+            surfaces: Surface forms, one per occurrence (repeats give frequency)
+
+        Returns:
+            Surface form -> canonical name
+        """
+        counts = Counter(surfaces)
+        self._prepare(counts)
+
+        groups: Dict[str, Counter] = {}
+        for surface, count in counts.items():
+            groups.setdefault(self.key(surface), Counter())[strip_surface(surface)] += count
+
+        names = {}
+        for key, forms in groups.items():
+            alias_target = next((c for c in self.aliases.values() if c.casefold() == key), None)
+            names[key] = alias_target or max(forms, key=lambda f: (forms[f], f[:1].isupper()))
+        return {surface: names[self.key(surface)] for surface in counts}
+
+def load_normalizer(lemma: bool = False, aliases_path: Path = ALIASES_PATH) -> EntityNormalizer:
+    """A normalizer with the alias table and, optionally, spaCy lemmas"""
+    return EntityNormalizer(load_aliases(aliases_path), spacy_lemmatizer() if lemma else None)
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Show how entity surface forms are grouped before classification")
+    parser.add_argument("--lemma", action="store_true", help=f"Also lemmatize with spaCy ({LEMMA_MODEL})")
+    parser.add_argument("--aliases", type=str, default=str(ALIASES_PATH), help="Alias table")
+    args = parser.parse_args()
+
+    normalizer = load_normalizer(args.lemma, Path(args.aliases))
+    surfaces = [occurrence.entity for occurrence in load_entity_index()]
+    canonical = normalizer.group(surfaces)
+
+    groups: Dict[str, List[str]] = {}
+    for surface, name in canonical.items():
+        groups.setdefault(name, []).append(surface)
+    merged = {name: forms for name, forms in groups.items() if len(forms) > 1}
+
+    for name in sorted(merged, key=str.casefold):
+        print(f"{name}: {', '.join(sorted(merged[name]))}")
+    print(f"\n{len(canonical)} surface forms -> {len(groups)} canonical entities "
+          f"({len(canonical) - len(groups)} fewer LLM calls)")
+
+if __name__ == "__main__":
+    main()
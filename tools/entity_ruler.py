@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Rule-Based Entity Tagger for Cleros Orphicae
+
+This script compiles the existing deity classifications (and, optionally, the
+span metadata of the web corpus) into phrase patterns, so that deity and
+entity mentions in new text can be tagged without running transformer NER or
+asking Ollama.
+
+Span metadata categories ("deity", "epithet", ...) are a different label set
+from the classification categories ("Olympian", "Abstract", ...), and span
+texts are often longer phrases ("great Zeus") that would shadow the
+classified names. Span patterns are therefore left out unless asked for,
+and then carry their own labels, prefixed with "SPAN:" ("SPAN:deity").
+
+Patterns can be used in two ways:
+- `PhraseTagger`, a standalone token trie matcher with no dependencies
+- `build_spacy_ruler`, a blank spaCy pipeline with an EntityRuler, for use
+  alongside other spaCy components
+
+The benchmark command compares throughput and recall of the tagger with the
+stored output of the en_core_web_trf NER + LLM classification path.
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Allow running as a script from the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tools import corpus
+from tools.corpus import CLASSIFICATIONS_PATH, DEITIES_DIR, HYMNS_PATH, WEB_DATA_DIR
+from tools.io_utils import atomic_write
+
+# Constants
+PATTERNS_PATH = DEITIES_DIR / "entity_patterns.jsonl"
+
+# Span categories that name entities (as opposed to clauses like "action")
+SPAN_CATEGORIES = ["deity", "epithet", "hero", "mortal", "other_divinity", "place"]
+SPAN_LABEL_PREFIX = "SPAN:"  # Keeps span labels apart from classification categories
+
+# Classification results that are not real categories
+EXCLUDED_CATEGORIES = {"IRRELEVANT", "Unknown", "Error"}
+
+TOKEN_PATTERN = re.compile(r"\w+(?:[-'’]\w+)*|[^\w\s]")
+
+class TaggedEntity:
+    """Entity match and its category"""
+    def __init__(self, text: str, category: str, start: int, end: int):
+        self.text = text
+        self.category = category
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"TaggedEntity(text='{self.text}', category='{self.category}', start={self.start}, end={self.end})"
+
+def tokenize(text: str) -> List[Tuple[str, int, int]]:
+    """Split text into (token, start_char, end_char) triples"""
+    return [(m.group(), m.start(), m.end()) for m in TOKEN_PATTERN.finditer(text)]
+
+def load_entity_patterns(
+    classifications_path: Path = CLASSIFICATIONS_PATH,
+    include_spans: bool = False,
+    span_dir: Path = WEB_DATA_DIR,
+    span_categories: Iterable[str] = SPAN_CATEGORIES
+) -> Dict[str, str]:
+    """
+    Build the surface form -> category map used by the taggers.
+
+    Deity classifications take precedence over span metadata. When a surface
+    form has been given several categories, the most frequent one wins.
+
+    Args:
+        classifications_path: deity_classifications.json
+        include_spans: Also compile span metadata texts, labeled "SPAN:<category>"
+        span_dir: Directory with span_metadata_{category}.json files
+        span_categories: Span categories to include
+
+    Returns:
+        Dictionary mapping entity text to category
+    """
+    patterns: Dict[str, str] = {}
+
+    if include_spans:
+        span_votes: Dict[str, Counter] = defaultdict(Counter)
+        for category in span_categories:
+            metadata_path = Path(span_dir) / f"span_metadata_{category}.json"
+            if not metadata_path.exists():
+                continue
+            metadata = corpus.load_json(metadata_path)
+            for span in metadata.get("spans", {}).values():
+                text = span.get("text", "").strip()
+                if text:
+                    span_votes[text][category] += 1
+
+        for text, votes in span_votes.items():
+            patterns[text] = SPAN_LABEL_PREFIX + votes.most_common(1)[0][0]
+
+    classifications = corpus.load_json(classifications_path)
+
+    class_votes: Dict[str, Counter] = defaultdict(Counter)
+    for item in classifications:
+        entity = item.get("entity", "").strip()
+        category = item.get("category")
+        if entity and category and category not in EXCLUDED_CATEGORIES:
+            class_votes[entity][category] += 1
+
+    for entity, votes in class_votes.items():
+        patterns[entity] = votes.most_common(1)[0][0]
+
+    return patterns
+
+def save_patterns(patterns: Dict[str, str], output_file: Path = PATTERNS_PATH) -> None:
+    """Save patterns in spaCy EntityRuler JSONL format, atomically"""
+    with atomic_write(output_file) as f:
+        for text, category in sorted(patterns.items()):
+            f.write(json.dumps({"label": category, "pattern": text}, ensure_ascii=False))
+            f.write("\n")
+
+def load_patterns(input_file: Path = PATTERNS_PATH) -> Dict[str, str]:
+    """Load patterns from a spaCy EntityRuler JSONL file"""
+    patterns = {}
+    with open(input_file, 'r', encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                patterns[entry["pattern"]] = entry["label"]
+    return patterns
+
+class PhraseTagger:
+    """
+    Standalone phrase matcher over tokens.
+
+    Patterns are stored in a token trie; tagging is a single left-to-right
+    pass that takes the longest pattern starting at each token and skips
+    past it, so matches never overlap.
+    """
+
+    def __init__(self, patterns: Dict[str, str], ignore_case: bool = False):
+        self.ignore_case = ignore_case
+        self.trie: Dict[str, Any] = {}
+        self.size = 0
+        for text, category in patterns.items():
+            self.add(text, category)
+
+    def _key(self, token: str) -> str:
+        return token.lower() if self.ignore_case else token
+
+    def add(self, text: str, category: str) -> None:
+        """Add one phrase pattern"""
+        tokens = [token for token, _, _ in tokenize(text)]
+        if not tokens:
+            return
+        node = self.trie
+        for token in tokens:
+            node = node.setdefault(self._key(token), {})
+        node[None] = category
+        self.size += 1
+
+    def tag(self, text: str) -> List[TaggedEntity]:
+        """Find all non-overlapping, longest pattern matches in text"""
+        tokens = tokenize(text)
+        keys = [self._key(token) for token, _, _ in tokens]
+        matches = []
+
+        i = 0
+        while i < len(tokens):
+            node = self.trie
+            best_end = -1
+            best_category = None
+            j = i
+            while j < len(tokens) and keys[j] in node:
+                node = node[keys[j]]
+                j += 1
+                if None in node:
+                    best_end = j
+                    best_category = node[None]
+
+            if best_end < 0:
+                i += 1
+                continue
+
+            start = tokens[i][1]
+            end = tokens[best_end - 1][2]
+            matches.append(TaggedEntity(text[start:end], best_category, start, end))
+            i = best_end
+
+        return matches
+
+def build_spacy_ruler(patterns: Dict[str, str], ignore_case: bool = False):
+    """
+    Build a blank English spaCy pipeline whose only component is an EntityRuler.
+
+    Requires spaCy; no statistical model is loaded.
+    """
+    import spacy
+
+    nlp = spacy.blank("en")
+    ruler = nlp.add_pipe(
+        "entity_ruler",
+        config={"phrase_matcher_attr": "LOWER" if ignore_case else "ORTH"}
+    )
+    ruler.add_patterns([{"label": category, "pattern": text} for text, category in patterns.items()])
+    return nlp
+
+def load_gold_mentions() -> Tuple[Dict[Tuple[str, int], str], List[Tuple[str, int, int, int, str]]]:
+    """
+    Load the lines of the base corpus and the mentions found by the trf NER + LLM path.
+
+    Returns:
+        (lines keyed by (hymn_id, line_num), list of
+        (hymn_id, line_num, start_char, end_char, category) mentions)
+    """
+    lines = {}
+    for hymn in corpus.hymn_features():
+        for line in hymn["per_line"]:
+            lines[(hymn["hymn_id"], line["line_num"])] = line["text"]
+
+    classifications = corpus.load_json(CLASSIFICATIONS_PATH)
+
+    mentions = [
+        (item["hymn_id"], item["line_num"], item["start_char"], item["end_char"], item["category"])
+        for item in classifications
+        if item.get("category") not in EXCLUDED_CATEGORIES
+    ]
+    return lines, mentions
+
+def load_hymn_sentences(hymns_path: Path = HYMNS_PATH) -> List[str]:
+    """Load every sentence text of the web corpus"""
+    hymn_data = corpus.load_json(hymns_path)
+    return [
+        sentence["text"]
+        for hymn in hymn_data.get("hymns", [])
+        for sentence in hymn.get("sentences", [])
+        if sentence.get("text")
+    ]
+
+def evaluate_recall(
+    tagger: PhraseTagger,
+    lines: Dict[Tuple[str, int], str],
+    mentions: List[Tuple[str, int, int, int, str]]
+) -> Dict[str, int]:
+    """
+    Count how many reference mentions the tagger recovers.
+
+    Returns:
+        Counts of exact span matches, exact matches with the same category,
+        mentions covered by a (possibly longer) tagged span, and all matches
+    """
+    tagged = {key: tagger.tag(text) for key, text in lines.items()}
+    counts = {"exact": 0, "category": 0, "covered": 0, "matches": sum(len(e) for e in tagged.values())}
+
+    for hymn_id, line_num, start, end, category in mentions:
+        entities = tagged.get((hymn_id, line_num), [])
+        for entity in entities:
+            if entity.start == start and entity.end == end:
+                counts["exact"] += 1
+                counts["category"] += entity.category == category
+            if entity.start <= start and end <= entity.end:
+                counts["covered"] += 1
+                break
+
+    return counts
+
+def run_benchmark(patterns: Dict[str, str], with_trf: bool = False, repeat: int = 5) -> None:
+    """Compare the rule-based tagger against the trf NER + LLM path"""
+    tagger = PhraseTagger(patterns)
+    sentences = load_hymn_sentences()
+    total_chars = sum(len(s) for s in sentences)
+    print(f"Compiled {tagger.size} patterns")
+    print(f"Benchmark corpus: {len(sentences)} sentences, {total_chars} characters from {HYMNS_PATH}")
+
+    # Throughput of the standalone tagger
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        found = sum(len(tagger.tag(sentence)) for sentence in sentences)
+    elapsed = (time.perf_counter() - start_time) / repeat
+    print(f"\nPhraseTagger: {len(sentences) / elapsed:,.0f} sentences/s "
+          f"({elapsed * 1000:.1f} ms per pass, {found} matches)")
+
+    # Throughput of the spaCy EntityRuler, if spaCy is installed
+    try:
+        nlp = build_spacy_ruler(patterns)
+    except ImportError:
+        nlp = None
+        print("spaCy EntityRuler: skipped (spaCy not installed)")
+    if nlp is not None:
+        start_time = time.perf_counter()
+        found = sum(len(doc.ents) for doc in nlp.pipe(sentences))
+        elapsed = time.perf_counter() - start_time
+        print(f"spaCy EntityRuler: {len(sentences) / elapsed:,.0f} sentences/s "
+              f"({elapsed * 1000:.1f} ms per pass, {found} matches)")
+
+    # Recall against the mentions produced by trf NER + LLM classification.
+    # Span patterns are longer than most classified names ("great Zeus") and
+    # carry SPAN: labels, so the set with them is reported for comparison.
+    lines, mentions = load_gold_mentions()
+    total = len(mentions)
+    print(f"\nRecall against trf NER + LLM mentions ({total} mentions in {len(lines)} base lines):")
+
+    with_spans = load_entity_patterns(include_spans=True)
+    for name, pattern_set in (("default patterns", patterns), ("with span patterns", with_spans)):
+        counts = evaluate_recall(PhraseTagger(pattern_set), lines, mentions)
+        print(f"  {name} ({len(pattern_set)} patterns, {counts['matches']} matches):")
+        print(f"    Exact span recall:   {counts['exact'] / max(1, total):.1%} ({counts['exact']}/{total})")
+        print(f"    Same category:       {counts['category'] / max(1, total):.1%} ({counts['category']}/{total})")
+        print(f"    Covered by a match:  {counts['covered'] / max(1, total):.1%} ({counts['covered']}/{total})")
+
+    # Throughput of the transformer NER stage, if the model is installed
+    if with_trf:
+        try:
+            import spacy
+            trf = spacy.load("en_core_web_trf")
+        except (ImportError, OSError) as e:
+            print(f"\nen_core_web_trf: skipped ({e})")
+            return
+        texts = list(lines.values())
+        start_time = time.perf_counter()
+        for _ in trf.pipe(texts):
+            pass
+        elapsed = time.perf_counter() - start_time
+        print(f"\nen_core_web_trf NER: {len(texts) / elapsed:,.1f} lines/s "
+              f"({elapsed:.1f} s for {len(texts)} lines, before any LLM calls)")
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Compile and run a rule-based entity tagger")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    compile_parser = subparsers.add_parser("compile", help="Compile patterns from classifications (and span metadata)")
+    compile_parser.add_argument("--output", type=str, default=str(PATTERNS_PATH), help="Pattern JSONL output file")
+    compile_parser.add_argument("--with-spans", action="store_true",
+                                help=f"Also compile span metadata texts, labeled {SPAN_LABEL_PREFIX}<category>")
+    compile_parser.add_argument("--span-categories", type=str, nargs="*", default=SPAN_CATEGORIES,
+                                help="Span metadata categories to include with --with-spans")
+
+    tag_parser = subparsers.add_parser("tag", help="Tag entities in a sentence")
+    tag_parser.add_argument("--sentence", type=str, required=True, help="Sentence to tag")
+    tag_parser.add_argument("--patterns", type=str, default=str(PATTERNS_PATH), help="Pattern JSONL file")
+    tag_parser.add_argument("--ignore-case", action="store_true", help="Match patterns case-insensitively")
+
+    bench_parser = subparsers.add_parser("benchmark", help="Compare throughput and recall with the trf + LLM path")
+    bench_parser.add_argument("--with-trf", action="store_true", help="Also time en_core_web_trf NER")
+    bench_parser.add_argument("--repeat", type=int, default=5, help="Timed passes over the corpus")
+
+    args = parser.parse_args()
+
+    if args.command == "compile":
+        patterns = load_entity_patterns(include_spans=args.with_spans, span_categories=args.span_categories)
+        save_patterns(patterns, Path(args.output))
+        counts = Counter(patterns.values())
+        print(f"Compiled {len(patterns)} patterns to {args.output}")
+        for category, count in counts.most_common():
+            print(f"  {category}: {count}")
+    elif args.command == "tag":
+        patterns_path = Path(args.patterns)
+        patterns = load_patterns(patterns_path) if patterns_path.exists() else load_entity_patterns()
+        tagger = PhraseTagger(patterns, ignore_case=args.ignore_case)
+        entities = tagger.tag(args.sentence)
+        print(f"Sentence: {args.sentence}")
+        print(f"Found {len(entities)} entities:")
+        for entity in entities:
+            print(f"  - {entity.text} ({entity.category}) at positions {entity.start}-{entity.end}")
+    elif args.command == "benchmark":
+        run_benchmark(load_entity_patterns(), with_trf=args.with_trf, repeat=args.repeat)
+    else:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Fake Ollama Server for Cleros Orphicae
+
+This script serves a stand-in for Ollama's /api/generate and /api/tags
+endpoints, so the entity classifier can be benchmarked and load-tested
+reproducibly without a GPU or a real model.
+
+Answers are deterministic: an entity gets its category from the existing
+deity_classifications.json when it is listed there, otherwise a category
+derived from a hash of its name. Single-entity prompts get
+{"category": ...}; multi-entity prompts (see entity_classifier's
+--group-size) get {"classifications": [...]}.
+
+Configurable behaviour:
+    - latency distribution (fixed, uniform or lognormal) plus a per-entity cost
+    - concurrency limit (requests generated in parallel, like OLLAMA_NUM_PARALLEL)
+      and queue limit (503 when exceeded, like OLLAMA_MAX_QUEUE)
+    - error rate (HTTP 500) and malformed-JSON rate
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+# Allow running as a script from the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tools import corpus
+from tools.corpus import CLASSIFICATIONS_PATH
+
+# Constants
+DEFAULT_PORT = 11434
+FALLBACK_CATEGORIES = ["Olympian", "Chthonic", "Titan", "Nature", "Abstract", "Hero/Mortal", "Other", "IRRELEVANT"]
+
+# Patterns matching the prompts built by entity_classifier
+SINGLE_ENTITY_PATTERN = re.compile(r"classify the deity or entity '(.*?)' based on")
+GROUP_ENTITY_PATTERN = re.compile(r"^\s*\d+\. ENTITY: (.*)$", re.MULTILINE)
+
+def load_known_categories(path: Path = CLASSIFICATIONS_PATH) -> Dict[str, str]:
+    """Most frequent category per entity in an existing classification file"""
+    if not path.exists():
+        return {}
+    classifications = corpus.load_json(path)
+
+    counts: Dict[str, Counter] = {}
+    for item in classifications:
+        counts.setdefault(item["entity"], Counter())[item["category"]] += 1
+    return {entity: counter.most_common(1)[0][0] for entity, counter in counts.items()}
+
+class FakeOllama:
+    """Request handler state for the fake server"""
+
+    def __init__(
+        self,
+        latency: float = 0.2,
+        distribution: str = "lognormal",
+        sigma: float = 0.5,
+        per_entity: float = 0.05,
+        max_concurrency: int = 1,
+        max_queue: int = 512,
+        error_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        model: str = "gemma3:27b",
+        seed: Optional[int] = None,
+        known_categories: Optional[Dict[str, str]] = None
+    ):
+        """
+        Args:
+            latency: Median generation time in seconds
+            distribution: "fixed", "uniform" (0 to 2x latency) or "lognormal"
+            sigma: Shape of the lognormal distribution
+            per_entity: Extra generation time per entity in a multi-entity prompt
+            max_concurrency: Requests generated in parallel; the rest wait in a queue
+            max_queue: Waiting requests beyond which the server answers 503
+            error_rate: Fraction of requests answered with HTTP 500
+            malformed_rate: Fraction of responses whose text is not valid JSON
+            model: Model name reported by /api/tags
+            seed: Random seed for reproducible runs
+            known_categories: Entity -> category answers (default: deity_classifications.json)
+        """
+        self.latency = latency
+        self.distribution = distribution
+        self.sigma = sigma
+        self.per_entity = per_entity
+        self.max_queue = max_queue
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.model = model
+        self.random = random.Random(seed)
+        self.known_categories = load_known_categories() if known_categories is None else known_categories
+        self.slots = asyncio.Semaphore(max(1, max_concurrency))
+        self.waiting = 0
+        self.stats: Counter = Counter()
+
+    def category(self, entity: str) -> str:
+        """Deterministic category for an entity"""
+        if entity in self.known_categories:
+            return self.known_categories[entity]
+        digest = hashlib.sha256(entity.encode("utf-8")).digest()
+        return FALLBACK_CATEGORIES[digest[0] % len(FALLBACK_CATEGORIES)]
+
+    def generation_time(self, entities: int) -> float:
+        """Sample how long a generation takes"""
+        if self.distribution == "fixed":
+            base = self.latency
+        elif self.distribution == "uniform":
+            base = self.random.uniform(0, 2 * self.latency)
+        else:
+            base = self.random.lognormvariate(0, self.sigma) * self.latency
+        return base + self.per_entity * max(0, entities - 1)
+
+    def response_text(self, prompt: str) -> str:
+        """Model output for a classification prompt"""
+        group: List[str] = GROUP_ENTITY_PATTERN.findall(prompt)
+        if group:
+            return json.dumps({"classifications": [
+                {"entity": entity, "category": self.category(entity)} for entity in group
+            ]})
+
+        match = SINGLE_ENTITY_PATTERN.search(prompt)
+        entity = match.group(1) if match else ""
+        return json.dumps({"category": self.category(entity)})
+
+    async def generate(self, request: web.Request) -> web.Response:
+        """POST /api/generate"""
+        body = await request.json()
+        prompt = body.get("prompt", "")
+        self.stats["requests"] += 1
+
+        if self.waiting >= self.max_queue:
+            self.stats["rejected"] += 1
+            return web.json_response({"error": "server busy, please try again. maximum pending requests exceeded"},
+                                     status=503)
+
+        self.waiting += 1
+        queued = True
+        try:
+            async with self.slots:
+                self.waiting -= 1
+                queued = False
+                entities = max(1, len(GROUP_ENTITY_PATTERN.findall(prompt)))
+                await asyncio.sleep(self.generation_time(entities))
+        finally:
+            if queued:
+                self.waiting -= 1
+
+        if self.random.random() < self.error_rate:
+            self.stats["errors"] += 1
+            return web.json_response({"error": "model runner has unexpectedly stopped"}, status=500)
+
+        if self.random.random() < self.malformed_rate:
+            self.stats["malformed"] += 1
+            text = '{"category": "Olympian"'
+        else:
+            text = self.response_text(prompt)
+
+        self.stats["completed"] += 1
+        return web.json_response({
+            "model": body.get("model", self.model),
+            "response": text,
+            "done": True
+        })
+
+    async def tags(self, request: web.Request) -> web.Response:
+        """GET /api/tags"""
+        return web.json_response({"models": [{"name": self.model, "model": self.model}]})
+
+    def app(self) -> web.Application:
+        """aiohttp application serving the fake endpoints"""
+        app = web.Application()
+        app.router.add_post("/api/generate", self.generate)
+        app.router.add_get("/api/tags", self.tags)
+        return app
+
+async def start_fake_ollama(fake: FakeOllama, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> web.AppRunner:
+    """
+    Start the fake server in the running event loop.
+
+    Returns:
+        The runner; call `await runner.cleanup()` to stop the server
+    """
+    runner = web.AppRunner(fake.app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+def add_fake_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the fake server's behaviour options to a parser"""
+    parser.add_argument("--latency", type=float, default=0.2, help="Median generation time in seconds")
+    parser.add_argument("--distribution", choices=["fixed", "uniform", "lognormal"], default="lognormal",
+                        help="Generation time distribution")
+    parser.add_argument("--sigma", type=float, default=0.5, help="Shape of the lognormal distribution")
+    parser.add_argument("--per-entity", type=float, default=0.05,
+                        help="Extra seconds per entity in a multi-entity prompt")
+    parser.add_argument("--max-concurrency", type=int, default=1,
+                        help="Requests generated in parallel (like OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--max-queue", type=int, default=512,
+                        help="Waiting requests beyond which the server answers 503 (like OLLAMA_MAX_QUEUE)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--malformed-rate", type=float, default=0.0,
+                        help="Fraction of responses that are not valid JSON")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+
+def fake_from_args(args: argparse.Namespace) -> FakeOllama:
+    """Build a FakeOllama from parsed `add_fake_arguments` options"""
+    return FakeOllama(
+        latency=args.latency,
+        distribution=args.distribution,
+        sigma=args.sigma,
+        per_entity=args.per_entity,
+        max_concurrency=args.max_concurrency,
+        max_queue=args.max_queue,
+        error_rate=args.error_rate,
+        malformed_rate=args.malformed_rate,
+        seed=args.seed
+    )
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Serve a fake Ollama API for load testing the classifier")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on")
+    add_fake_arguments(parser)
+    args = parser.parse_args()
+
+    fake = fake_from_args(args)
+    print(f"Fake Ollama listening on http://{args.host}:{args.port} "
+          f"({len(fake.known_categories)} known entities, latency {args.latency}s {args.distribution}, "
+          f"concurrency {args.max_concurrency})")
+    try:
+        web.run_app(fake.app(), host=args.host, port=args.port, print=None, access_log=None)
+    finally:
+        print(f"Served: {dict(fake.stats)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Small file helpers shared by the Cleros data tools.
+
+Writers in this module never leave a half-written artifact behind: output goes
+to a temporary file next to the target and is moved into place only once the
+write has completed.
+"""
+
+import json
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, IO, Iterator, Optional, Union
+
+PathLike = Union[str, Path]
+
+@contextmanager
+def atomic_write(path: PathLike, mode: str = "w", encoding: str = "utf-8") -> Iterator[IO]:
+    """
+    Open a temporary sibling of `path` for writing and replace `path` on success.
+
+    Args:
+        path: Final destination of the file
+        mode: File mode, either "w" or "wb"
+        encoding: Text encoding (ignored for binary mode)
+
+    Yields:
+        Writable file object
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        # mkstemp creates the file as 0600; keep the permissions a plain open() would give
+        if path.exists():
+            os.chmod(tmp_name, path.stat().st_mode & 0o777)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp_name, 0o666 & ~umask)
+        if "b" in mode:
+            f = os.fdopen(fd, mode)
+        else:
+            f = os.fdopen(fd, mode, encoding=encoding)
+        with f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+def write_json_atomic(path: PathLike, data: Any, indent: Optional[int] = 2) -> None:
+    """Serialize `data` to `path` as JSON, atomically"""
+    with atomic_write(path) as f:
+        json.dump(data, f, indent=indent)
+
+class JsonArrayWriter:
+    """
+    Write a JSON array one element at a time.
+
+    Elements are serialized compactly, one per line, so the array never has
+    to be held in memory. With `indent`, the output is instead identical to
+    json.dump(items, f, indent=indent), for files kept in that layout. Use as
+    a context manager around `atomic_write`.
+    """
+
+    def __init__(self, f: IO, indent: Optional[int] = None):
+        self.f = f
+        self.indent = indent
+        self.count = 0
+
+    def __enter__(self) -> "JsonArrayWriter":
+        self.f.write("[" if self.indent is not None else "[\n")
+        return self
+
+    def write(self, item: Any) -> None:
+        """Append one element to the array"""
+        if self.indent is None:
+            if self.count:
+                self.f.write(",\n")
+            self.f.write(json.dumps(item, separators=(",", ":")))
+        else:
+            prefix = " " * self.indent
+            text = json.dumps(item, indent=self.indent).replace("\n", "\n" + prefix)
+            self.f.write(("," if self.count else "") + "\n" + prefix + text)
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.indent is None:
+            self.f.write("\n]\n")
+        else:
+            self.f.write("\n]" if self.count else "]")
+
+class _ChunkedJsonReader:
+    """
+    Incremental reader over a JSON text file.
+
+    The file is read in chunks and decoded one value at a time, so memory
+    stays bounded by the largest value decoded rather than the whole document.
+    """
+
+    WHITESPACE = re.compile(r"\s*")
+    NUMBER_TAIL = re.compile(r"[0-9.eE+\-]*")
+
+    def __init__(self, f: IO, name: str, chunk_size: int = 1 << 16):
+        self.f = f
+        self.name = name
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+
+    def _refill(self) -> None:
+        """Drop the consumed part of the buffer and append the next chunk"""
+        self.buffer = self.buffer[self.position:]
+        self.position = 0
+        chunk = self.f.read(self.chunk_size)
+        self.eof = not chunk
+        self.buffer += chunk
+
+    def peek(self) -> str:
+        """Advance past whitespace, refilling as needed; return the next character ("" at the end)"""
+        while True:
+            self.position = self.WHITESPACE.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer) or self.eof:
+                return self.buffer[self.position:self.position + 1]
+            self._refill()
+
+    def decode(self) -> Any:
+        """Decode the value at the current position, refilling until it is complete"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+                # A number at the end of the buffer may continue in the next chunk
+                is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+                if self.eof or not (is_number and self.NUMBER_TAIL.match(self.buffer, end).end() == len(self.buffer)):
+                    self.position = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._refill()
+
+    def expect(self, char: str) -> None:
+        """Consume `char` (after whitespace), or raise ValueError"""
+        if self.peek() != char:
+            raise ValueError(f"{self.name}: expected '{char}' at character {self.position}")
+        self.position += 1
+
+    def iter_array(self) -> Iterator[Any]:
+        """Decode the elements of the array starting at the current position"""
+        self.expect("[")
+        if self.peek() == "]":
+            self.position += 1
+            return
+        while True:
+            yield self.decode()
+            if self.peek() == "]":
+                self.position += 1
+                return
+            self.expect(",")
+
+def iter_json_array(path: PathLike, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Iterate over the elements of a JSON array file.
+
+    Any layout is streamed (one element per line as written by
+    `JsonArrayWriter`, pretty-printed with indent=2, or a single line): memory
+    stays bounded by the largest element rather than the whole document.
+
+    Args:
+        path: JSON file whose top level is an array
+        chunk_size: Characters read per refill
+    """
+    with open(path, 'r', encoding="utf-8") as f:
+        yield from _ChunkedJsonReader(f, str(path), chunk_size).iter_array()
+
+def iter_json_object_array(path: PathLike, key: str, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Iterate over the array stored under a top-level key of a JSON object.
+
+    The file is read in chunks and decoded one element at a time, so memory
+    stays bounded by the largest element (e.g. one hymn of hymns.json)
+    rather than the whole document. Other top-level values are skipped.
+
+    Args:
+        path: JSON file whose top level is an object
+        key: Key of the array to iterate
+        chunk_size: Characters read per refill
+    """
+    with open(path, 'r', encoding="utf-8") as f:
+        reader = _ChunkedJsonReader(f, str(path), chunk_size)
+        reader.expect("{")
+        if reader.peek() == "}":
+            return
+        while True:
+            name = reader.decode()
+            reader.expect(":")
+            if name == key:
+                yield from reader.iter_array()
+                return
+            reader.decode()
+            if reader.peek() == "}":
+                return
+            reader.expect(",")
@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+Compact, streamable storage for the linguistic features of the hymns.
+
+`linguistic_features.jsonl` holds one JSON record per line:
+
+1. A header: {"format": "cleros-linguistic-features", "version": 2, "lemmas": true}
+   "lemmas" says whether hymn lines carry real lemma ids ("l"); it is
+   missing (false) in version 1 files.
+2. Vocabulary records: {"vocab": {"pos": [...], "dep": [...], "ent": [...], "lemma": [...]}}
+   Each one appends labels to the interned vocabularies; a label's id is its
+   position in the accumulated list. A vocabulary record is written just
+   before the first hymn that uses a new label.
+3. Hymn records, one per hymn, with columnar per-line features:
+   {"hymn_id": "0", "lines": [{
+       "n": 1,                      # line number
+       "text": "...",               # line text
+       "t": ["Learn", "now", ...],  # token texts
+       "l": [0, 1, ...],            # lemma ids (version 2)
+       "p": [3, 7, ...],            # POS ids
+       "d": [0, 4, ...],            # dependency label ids
+       "h": [0, 0, ...],            # head token index within the line
+       "e": [[11, 19, 0]],          # entities: start_char, end_char, label id
+       "c": [[20, 49, 10]]          # noun chunks: start_char, end_char, root token
+   }]}
+
+Readers stream hymn records back as plain dicts in the same shape that
+`LinguisticsExtractor.extract_linguistic_features` produces:
+
+    {"hymn_id": "0", "per_line": [{
+        "line_num": 1, "text": "...",
+        "tokens": [...], "lemmas": [...], "pos": [...], "dep": [...], "heads": [...],
+        "entities": [{"text", "label", "start_char", "end_char"}],
+        "noun_chunks": [{"text", "root_text", "root_pos", "root_dep"}]
+    }]}
+
+Files without lemmas (version 1, converted legacy files, or the legacy JSON
+file) decode with the lowercased token text standing in for the lemma, and
+such lines are marked with "lemmas_inferred": True. Use `features_have_lemmas`
+to check a file before relying on lemmas. The writer never serializes
+stand-in lemmas.
+
+The legacy pretty-printed `linguistic_features.json` can still be read (and
+converted) so that tools keep working until the linguistics stage is re-run.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Allow running as a script from the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tools.io_utils import atomic_write
+
+# Constants
+DATA_DIR = Path("data")
+BASE_DIR = DATA_DIR / "base"
+LINGUISTICS_DIR = DATA_DIR / "enriched" / "linguistics"
+FEATURES_PATH = LINGUISTICS_DIR / "linguistic_features.jsonl"
+LEGACY_FEATURES_PATH = LINGUISTICS_DIR / "linguistic_features.json"
+
+FORMAT_NAME = "cleros-linguistic-features"
+FORMAT_VERSION = 2
+VOCABULARIES = ("pos", "dep", "ent", "lemma")
+
+class FeaturesWriter:
+    """
+    Stream hymn features to a compact JSONL file, one hymn at a time.
+
+    The file is written to a temporary location and only replaces the
+    existing output when the writer is closed without an error.
+    """
+
+    def __init__(self, path: Path = FEATURES_PATH, lemmas: bool = True):
+        """
+        Args:
+            path: Output file
+            lemmas: Whether hymns carry real lemmas; every line must then have
+                them, and stand-in lemmas decoded from a file without lemmas
+                are rejected
+        """
+        self.path = Path(path)
+        self.lemmas = lemmas
+        self.vocab: Dict[str, Dict[str, int]] = {name: {} for name in VOCABULARIES}
+        self.hymns_written = 0
+        self._ctx = None
+        self._f = None
+
+    def __enter__(self) -> "FeaturesWriter":
+        self._ctx = atomic_write(self.path)
+        self._f = self._ctx.__enter__()
+        self._emit({"format": FORMAT_NAME, "version": FORMAT_VERSION, "lemmas": self.lemmas})
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._ctx.__exit__(exc_type, exc, tb)
+
+    def _emit(self, record: Dict[str, Any]) -> None:
+        self._f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+        self._f.write("\n")
+
+    def _intern(self, name: str, label: str, new_labels: Dict[str, Dict[str, int]]) -> int:
+        """Id of a label; labels not yet in the vocabulary are collected in new_labels"""
+        table = self.vocab[name]
+        if label in table:
+            return table[label]
+        pending = new_labels.setdefault(name, {})
+        if label not in pending:
+            pending[label] = len(table) + len(pending)
+        return pending[label]
+
+    def write(self, features: Dict[str, Any]) -> None:
+        """
+        Encode and append the features of one hymn
+
+        New labels join the vocabulary only once the hymn has been written, so
+        a hymn that fails to encode leaves no unreferenced vocabulary ids.
+        """
+        new_labels: Dict[str, Dict[str, int]] = {}
+        lines = []
+
+        for line in features["per_line"]:
+            chunks = []
+            for chunk in line["noun_chunks"]:
+                chunks.append([chunk["start_char"], chunk["end_char"], chunk["root"]])
+
+            record = {
+                "n": line["line_num"],
+                "text": line["text"],
+                "t": line["tokens"],
+                "p": [self._intern("pos", tag, new_labels) for tag in line["pos"]],
+                "d": [self._intern("dep", dep, new_labels) for dep in line["dep"]],
+                "h": line["heads"],
+                "e": [
+                    [ent["start_char"], ent["end_char"], self._intern("ent", ent["label"], new_labels)]
+                    for ent in line["entities"]
+                ],
+                "c": chunks
+            }
+            if self.lemmas:
+                if "lemmas" not in line or line.get("lemmas_inferred"):
+                    raise ValueError(
+                        f"Hymn {features['hymn_id']}, line {line['line_num']} has no real lemmas; "
+                        f"reprocess it (linguistics.py --full) or write with lemmas=False"
+                    )
+                record["l"] = [self._intern("lemma", lemma, new_labels) for lemma in line["lemmas"]]
+            lines.append(record)
+
+        if new_labels:
+            self._emit({"vocab": {name: list(labels) for name, labels in new_labels.items()}})
+        self._emit({"hymn_id": features["hymn_id"], "lines": lines})
+        for name, labels in new_labels.items():
+            self.vocab[name].update(labels)
+        self.hymns_written += 1
+
+def token_offsets(text: str, tokens: List[str]) -> List[int]:
+    """Find the character offset of each token in `text`, scanning left to right"""
+    offsets = []
+    pos = 0
+    for token in tokens:
+        found = text.find(token, pos)
+        if found < 0:
+            offsets.append(pos)
+        else:
+            offsets.append(found)
+            pos = found + len(token)
+    return offsets
+
+def _decode_line(line: Dict[str, Any], vocab: Dict[str, List[str]]) -> Dict[str, Any]:
+    """Expand one compact line record"""
+    text = line["text"]
+    tokens = line["t"]
+    pos = [vocab["pos"][i] for i in line["p"]]
+    dep = [vocab["dep"][i] for i in line["d"]]
+
+    entities = [
+        {"text": text[start:end], "label": vocab["ent"][label], "start_char": start, "end_char": end}
+        for start, end, label in line["e"]
+    ]
+    noun_chunks = [
+        {
+            "text": text[start:end],
+            "root_text": tokens[root],
+            "root_pos": pos[root],
+            "root_dep": dep[root],
+            "start_char": start,
+            "end_char": end,
+            "root": root
+        }
+        for start, end, root in line["c"]
+    ]
+
+    inferred = "l" not in line
+    if inferred:
+        lemmas = [token.lower() for token in tokens]
+    else:
+        lemmas = [vocab["lemma"][i] for i in line["l"]]
+
+    decoded = {
+        "line_num": line["n"],
+        "text": text,
+        "tokens": tokens,
+        "lemmas": lemmas,
+        "pos": pos,
+        "dep": dep,
+        "heads": line["h"],
+        "entities": entities,
+        "noun_chunks": noun_chunks
+    }
+    if inferred:
+        decoded["lemmas_inferred"] = True
+    return decoded
+
+def read_header(path: Path = FEATURES_PATH) -> Dict[str, Any]:
+    """Header record of a compact features file"""
+    with open(path, 'r', encoding="utf-8") as f:
+        return json.loads(f.readline() or "{}")
+
+def features_have_lemmas(path: Optional[Path] = None) -> bool:
+    """
+    Whether a features file stores real lemmas
+
+    Args:
+        path: Features file; defaults to the file iter_hymn_features reads
+    """
+    if path is None:
+        path = FEATURES_PATH if FEATURES_PATH.exists() else LEGACY_FEATURES_PATH
+    path = Path(path)
+    if path.suffix != ".jsonl" or not path.exists():
+        return False
+    header = read_header(path)
+    return header.get("format") == FORMAT_NAME and header.get("version", 0) >= 2 and bool(header.get("lemmas"))
+
+def iter_compact_features(path: Path = FEATURES_PATH) -> Iterator[Dict[str, Any]]:
+    """
+    Stream decoded hymn features from a compact JSONL file.
+
+    Only one hymn record is held in memory at a time.
+    """
+    vocab: Dict[str, List[str]] = {name: [] for name in VOCABULARIES}
+
+    with open(path, 'r', encoding="utf-8") as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("format") != FORMAT_NAME:
+            raise ValueError(f"{path} is not a {FORMAT_NAME} file")
+        if header.get("version", 0) > FORMAT_VERSION:
+            raise ValueError(f"{path} uses format version {header['version']}, "
+                             f"this reader supports up to {FORMAT_VERSION}")
+
+        for raw in f:
+            if not raw.strip():
+                continue
+            record = json.loads(raw)
+            if "vocab" in record:
+                for name, labels in record["vocab"].items():
+                    vocab[name].extend(labels)
+                continue
+
+            yield {
+                "hymn_id": record["hymn_id"],
+                "per_line": [_decode_line(line, vocab) for line in record["lines"]]
+            }
+
+def _resolve_heads(tokens: List[str], dependencies: List[List[str]]) -> List[int]:
+    """
+    Recover head token indices from legacy (text, dep, head_text) triples.
+
+    The legacy format only kept the head's text, so when a word repeats in a
+    line the nearest occurrence is taken as the head.
+    """
+    heads = []
+    for i, dependency in enumerate(dependencies):
+        dep, head_text = dependency[1], dependency[2]
+        if dep == "ROOT":
+            heads.append(i)
+            continue
+        candidates = [j for j, token in enumerate(tokens) if token == head_text and j != i]
+        heads.append(min(candidates, key=lambda j: abs(j - i)) if candidates else i)
+    return heads
+
+def _load_base_lines(base_dir: Path) -> Dict[str, List[str]]:
+    """Map hymn IDs to their normalized lines from the base dataset"""
+    base_lines = {}
+    for hymn_file in base_dir.glob("hymn_*.json"):
+        with open(hymn_file, 'r', encoding="utf-8") as f:
+            hymn_data = json.load(f)
+        base_lines[hymn_data["hymn_id"]] = hymn_data["lines"]
+    return base_lines
+
+def _upgrade_legacy_hymn(hymn: Dict[str, Any], lines: List[str]) -> Dict[str, Any]:
+    """Convert one legacy hymn entry into the decoded features shape"""
+    per_line = []
+    for line_data in hymn.get("per_line", []):
+        line_num = line_data.get("line_num", 0)
+        pos_tags = [tag for tag in line_data.get("pos_tags", []) if tag]
+        tokens = [tag[0] for tag in pos_tags]
+
+        if 0 < line_num <= len(lines):
+            text = lines[line_num - 1]
+        else:
+            text = " ".join(tokens)
+        offsets = token_offsets(text, tokens)
+
+        dependencies = line_data.get("dependencies", [])
+        dep = [d[1] for d in dependencies]
+        heads = _resolve_heads(tokens, dependencies)
+
+        # Noun chunks appear in line order and start on a token boundary
+        token_starts = set(offsets)
+        noun_chunks = []
+        search_from = 0
+        for chunk in line_data.get("noun_chunks", []):
+            start = text.find(chunk["text"], search_from)
+            while start >= 0 and start not in token_starts:
+                start = text.find(chunk["text"], start + 1)
+            if start < 0:
+                start = max(text.find(chunk["text"]), 0)
+            end = start + len(chunk["text"])
+            search_from = end
+            root = next(
+                (i for i, token in enumerate(tokens)
+                 if token == chunk["root_text"] and start <= offsets[i] < end),
+                0
+            )
+            noun_chunks.append({
+                "text": chunk["text"],
+                "root_text": chunk["root_text"],
+                "root_pos": chunk["root_pos"],
+                "root_dep": chunk["root_dep"],
+                "start_char": start,
+                "end_char": end,
+                "root": root
+            })
+
+        per_line.append({
+            "line_num": line_num,
+            "text": text,
+            "tokens": tokens,
+            "lemmas": [token.lower() for token in tokens],
+            "lemmas_inferred": True,
+            "pos": [tag[1] for tag in pos_tags],
+            "dep": dep,
+            "heads": heads,
+            "entities": [
+                {key: entity[key] for key in ("text", "label", "start_char", "end_char")}
+                for entity in line_data.get("entities", [])
+            ],
+            "noun_chunks": noun_chunks
+        })
+
+    return {"hymn_id": hymn.get("hymn_id", "unknown"), "per_line": per_line}
+
+def iter_legacy_features(
+    path: Path = LEGACY_FEATURES_PATH,
+    base_dir: Path = BASE_DIR
+) -> Iterator[Dict[str, Any]]:
+    """
+    Read the legacy `linguistic_features.json` and yield decoded hymn features.
+
+    Line text is taken from the base dataset, since the legacy file did not
+    store it. The whole legacy file has to be parsed up front.
+    """
+    with open(path, 'r', encoding="utf-8") as f:
+        features_data = json.load(f)
+
+    base_lines = _load_base_lines(base_dir)
+    for hymn in features_data:
+        yield _upgrade_legacy_hymn(hymn, base_lines.get(hymn.get("hymn_id"), []))
+
+def iter_hymn_features(path: Optional[Path] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream decoded hymn features from the linguistics output.
+
+    Args:
+        path: Features file to read. Defaults to the compact JSONL file, or
+            the legacy JSON file when the compact one has not been generated.
+
+    Yields:
+        One decoded hymn feature dict at a time
+    """
+    if path is None:
+        path = FEATURES_PATH if FEATURES_PATH.exists() else LEGACY_FEATURES_PATH
+    path = Path(path)
+
+    if path.suffix == ".jsonl":
+        return iter_compact_features(path)
+    return iter_legacy_features(path)
+
+def pos_tags(line: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """(text, POS) pairs for a decoded line"""
+    return list(zip(line["tokens"], line["pos"]))
+
+def dependencies(line: Dict[str, Any]) -> List[Tuple[str, str, str]]:
+    """(text, dep, head_text) triples for a decoded line"""
+    tokens = line["tokens"]
+    return [(tokens[i], dep, tokens[head]) for i, (dep, head) in enumerate(zip(line["dep"], line["heads"]))]
+
+def convert_legacy(
+    input_file: Path = LEGACY_FEATURES_PATH,
+    output_file: Path = FEATURES_PATH
+) -> int:
+    """
+    Convert the legacy JSON features file into the compact JSONL format.
+
+    Returns:
+        Number of hymns written
+    """
+    # The legacy file has no lemmas; the writer drops the lowercased stand-ins
+    with FeaturesWriter(output_file, lemmas=False) as writer:
+        for features in iter_legacy_features(input_file):
+            writer.write(features)
+    return writer.hymns_written
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Convert and inspect compact linguistic features")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    convert_parser = subparsers.add_parser("convert", help="Convert the legacy JSON file to JSONL")
+    convert_parser.add_argument("--input", type=str, default=str(LEGACY_FEATURES_PATH),
+                                help="Legacy linguistic_features.json")
+    convert_parser.add_argument("--output", type=str, default=str(FEATURES_PATH),
+                                help="Compact JSONL output file")
+
+    stats_parser = subparsers.add_parser("stats", help="Time a full streaming read of a features file")
+    stats_parser.add_argument("--input", type=str, default=None, help="Features file to read")
+
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        start_time = time.time()
+        count = convert_legacy(Path(args.input), Path(args.output))
+        input_size = Path(args.input).stat().st_size
+        output_size = Path(args.output).stat().st_size
+        print(f"Converted {count} hymns in {time.time() - start_time:.2f}s")
+        print(f"Size: {input_size / 1e6:.2f} MB -> {output_size / 1e6:.2f} MB")
+    elif args.command == "stats":
+        start_time = time.time()
+        hymns = lines = tokens = 0
+        for features in iter_hymn_features(Path(args.input) if args.input else None):
+            hymns += 1
+            lines += len(features["per_line"])
+            tokens += sum(len(line["tokens"]) for line in features["per_line"])
+        print(f"Read {hymns} hymns, {lines} lines, {tokens} tokens in {time.time() - start_time:.3f}s")
+    else:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Long-lived HTTP client for the Ollama generate API.
+
+One `OllamaClient` holds one `httpx.AsyncClient`, so every request reuses a
+pooled keep-alive connection instead of paying connection setup per call.
+Requests also pass Ollama's `keep_alive` option so the model stays loaded on
+the server between requests. An optional `AdaptiveLimiter` paces requests
+from their latency and failures, and transient failures (timeouts, dropped
+connections, HTTP 429/5xx) can be retried a bounded number of times.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import httpx
+
+# Allow running as a script from the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tools.rate_control import FAILED, OK, OVERLOAD, AdaptiveLimiter
+
+# Constants
+OLLAMA_URL = "http://localhost:11434/api/generate"  # Default Ollama server URL
+DEFAULT_TIMEOUT = 60.0  # Seconds allowed for a generation
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_MODEL_KEEP_ALIVE = "30m"  # How long Ollama keeps the model loaded after a request
+DEFAULT_RETRY_BACKOFF = 0.5  # Seconds before the first retry, doubled for each further one
+
+def is_transient(error: Exception) -> bool:
+    """Whether a failed request is worth retrying"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    return isinstance(error, httpx.TransportError)
+
+class OllamaClient:
+    """
+    Pooled, keep-alive client for Ollama's /api/generate endpoint.
+
+    Use as an async context manager, or call `aclose()` when done.
+    """
+
+    def __init__(
+        self,
+        url: str = OLLAMA_URL,
+        max_connections: int = 8,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: float = 60.0,
+        timeout: float = DEFAULT_TIMEOUT,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        model_keep_alive: Optional[str] = DEFAULT_MODEL_KEEP_ALIVE,
+        limiter: Optional[AdaptiveLimiter] = None,
+        retries: int = 0,
+        retry_backoff: float = DEFAULT_RETRY_BACKOFF
+    ):
+        """
+        Args:
+            url: URL of the Ollama generate endpoint
+            max_connections: Size of the connection pool
+            max_keepalive_connections: Idle connections kept open (default: pool size)
+            keepalive_expiry: Seconds an idle connection is kept open
+            timeout: Default per-request timeout in seconds
+            connect_timeout: Timeout for establishing a connection
+            model_keep_alive: Ollama keep_alive value, or None for the server default
+            limiter: Adaptive concurrency limiter every request goes through
+            retries: Extra attempts after a transient failure (0 disables retrying)
+            retry_backoff: Seconds before the first retry, doubled for each further one
+        """
+        self.url = url
+        self.limiter = limiter
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.model_keep_alive = model_keep_alive
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.retried = 0  # Retry attempts made
+        self.recovered = 0  # Requests that succeeded after at least one retry
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=(
+                    max_connections if max_keepalive_connections is None else max_keepalive_connections
+                ),
+                keepalive_expiry=keepalive_expiry
+            )
+        )
+
+    async def __aenter__(self) -> "OllamaClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close all pooled connections"""
+        await self._client.aclose()
+
+    async def generate(
+        self,
+        model: str,
+        prompt: str,
+        format: Optional[str] = "json",
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Run a non-streaming generation.
+
+        Args:
+            model: The Ollama model to use
+            prompt: Prompt text
+            format: Ollama output format ("json"), or None for free text
+            timeout: Per-request timeout override in seconds
+
+        Returns:
+            The decoded Ollama response object
+
+        Raises:
+            httpx.HTTPStatusError: On a non-2xx response (after any retries)
+            httpx.TimeoutException: When the request times out (after any retries)
+        """
+        payload: Dict[str, Any] = {
+            "model": model,
+            "prompt": prompt,
+            "stream": False
+        }
+        if format:
+            payload["format"] = format
+        if self.model_keep_alive is not None:
+            payload["keep_alive"] = self.model_keep_alive
+
+        request_timeout = (
+            httpx.Timeout(timeout, connect=self.connect_timeout) if timeout is not None else httpx.USE_CLIENT_DEFAULT
+        )
+        for attempt in range(self.retries + 1):
+            try:
+                result = await self._attempt(payload, request_timeout)
+            except (httpx.HTTPStatusError, httpx.TransportError) as e:
+                if attempt == self.retries or not is_transient(e):
+                    raise
+                self.retried += 1
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+                continue
+            if attempt:
+                self.recovered += 1
+            return result
+
+    async def _attempt(self, payload: Dict[str, Any], request_timeout: Any) -> Dict[str, Any]:
+        """One request, paced and scored by the limiter if there is one"""
+        if self.limiter is None:
+            return await self._post(payload, request_timeout)
+
+        await self.limiter.acquire()
+        start_time = time.perf_counter()
+        outcome = FAILED
+        try:
+            result = await self._post(payload, request_timeout)
+            outcome = OK
+            return result
+        except httpx.TimeoutException:
+            outcome = OVERLOAD
+            raise
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code >= 500 or e.response.status_code == 429:
+                outcome = OVERLOAD
+            raise
+        finally:
+            self.limiter.release(time.perf_counter() - start_time, outcome)
+
+    async def _post(self, payload: Dict[str, Any], timeout: Any) -> Dict[str, Any]:
+        response = await self._client.post(self.url, json=payload, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Embedding Pre-Classifier for Cleros Orphicae
+
+This script assigns deity categories without the LLM by comparing an
+embedding of entity + context against the entities already labeled in
+deity_classifications.json, by k-nearest neighbours or nearest centroid.
+Only entities whose best category wins by a low margin, or that are unlike
+anything labeled so far, need to be sent to the Ollama model.
+
+The default encoder hashes character n-grams of the entity and words of its
+context (NumPy only, no model download), which is enough to recognise
+repeats under slightly different surface forms. The Universal Sentence
+Encoder used by search_index.py can be used instead with --encoder use.
+"""
+
+import argparse
+import hashlib
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Allow running as a script from the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tools import corpus
+from tools.corpus import CLASSIFICATIONS_PATH
+from tools.entity_index import load_entity_index
+
+# Constants
+EXCLUDED_CATEGORIES = {"IRRELEVANT", "Unknown", "Error"}
+DEFAULT_MIN_MARGIN = {"knn": 0.5, "centroid": 0.05}  # Vote share difference / cosine difference
+
+Example = Tuple[str, str, str]  # (entity, context, category)
+Encoder = Callable[[List[Tuple[str, str]]], np.ndarray]
+
+class HashingEncoder:
+    """
+    Hashed bag of entity character n-grams and context words.
+
+    The entity and context parts are normalized separately and weighted, so
+    the entity's surface form dominates and the context breaks ties.
+    """
+
+    def __init__(self, dim: int = 4096, ngram_range: Tuple[int, int] = (2, 4), context_weight: float = 0.35):
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.context_weight = context_weight
+
+    def _bucket(self, feature: str) -> int:
+        return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=4).digest(), "little") % self.dim
+
+    def _entity_vector(self, entity: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        text = f" {entity.casefold()} "
+        low, high = self.ngram_range
+        for n in range(low, high + 1):
+            for i in range(len(text) - n + 1):
+                vector[self._bucket("c:" + text[i:i + n])] += 1.0
+        return vector
+
+    def _context_vector(self, context: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        # Drop the "Hymn N, Line M:" prefix, which says nothing about the entity
+        text = context.split(": ", 1)[-1]
+        for word in re.findall(r"\w+", text.casefold()):
+            if len(word) > 3:
+                vector[self._bucket("w:" + word)] += 1.0
+        return vector
+
+    def __call__(self, pairs: List[Tuple[str, str]]) -> np.ndarray:
+        """Encode (entity, context) pairs as L2-normalized rows"""
+        rows = []
+        for entity, context in pairs:
+            entity_vector = _normalize(self._entity_vector(entity))
+            context_vector = _normalize(self._context_vector(context)) * self.context_weight
+            rows.append(_normalize(np.concatenate([entity_vector, context_vector])))
+        return np.vstack(rows) if rows else np.zeros((0, 2 * self.dim), dtype=np.float32)
+
+def use_pair_encoder() -> Encoder:
+    """Encode "entity: context" strings with the Universal Sentence Encoder"""
+    from tools.search_index import load_use_encoder
+
+    encode = load_use_encoder()
+    return lambda pairs: np.vstack([_normalize(row) for row in np.asarray(
+        encode([f"{entity}: {context}" for entity, context in pairs]), dtype=np.float32
+    )])
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+class Prediction:
+    """A pre-classification with its confidence"""
+    def __init__(self, category: str, margin: float, similarity: float, confident: bool):
+        self.category = category
+        self.margin = margin
+        self.similarity = similarity
+        self.confident = confident
+
+    def __repr__(self):
+        return (f"Prediction(category='{self.category}', margin={self.margin:.2f}, "
+                f"similarity={self.similarity:.2f}, confident={self.confident})")
+
+class Preclassifier:
+    """k-nearest-neighbour or nearest-centroid classifier over labeled entity embeddings"""
+
+    def __init__(
+        self,
+        encoder: Optional[Encoder] = None,
+        method: str = "knn",
+        k: int = 3,
+        min_margin: Optional[float] = None,
+        min_similarity: float = 0.7,
+        sharpness: float = 8.0
+    ):
+        """
+        Args:
+            encoder: Maps (entity, context) pairs to L2-normalized rows (default: HashingEncoder)
+            method: "knn" (similarity-weighted vote) or "centroid"
+            k: Neighbours consulted by knn
+            min_margin: Lowest winning margin accepted without the LLM: the vote share
+                difference for knn, the cosine similarity difference for centroid
+                (default: DEFAULT_MIN_MARGIN for the method)
+            min_similarity: Lowest best similarity accepted; below it an entity is novel
+            sharpness: Exponent on neighbour similarities in the knn vote, so a near
+                exact match outweighs several loose ones
+        """
+        if method not in ("knn", "centroid"):
+            raise ValueError(f"Unknown method {method!r}, expected 'knn' or 'centroid'")
+        self.encoder = encoder or HashingEncoder()
+        self.method = method
+        self.k = k
+        self.min_margin = DEFAULT_MIN_MARGIN[method] if min_margin is None else min_margin
+        self.min_similarity = min_similarity
+        self.sharpness = sharpness
+        self.categories: List[str] = []
+        self.vectors: Optional[np.ndarray] = None
+        self.labels: Optional[np.ndarray] = None
+        self.centroids: Optional[np.ndarray] = None
+
+    def fit(self, examples: List[Example]) -> "Preclassifier":
+        """Embed labeled examples (and their category centroids)"""
+        examples = [e for e in examples if e[2] not in EXCLUDED_CATEGORIES]
+        self.categories = sorted({category for _, _, category in examples})
+        category_ids = {category: i for i, category in enumerate(self.categories)}
+        self.vectors = self.encoder([(entity, context) for entity, context, _ in examples])
+        self.labels = np.array([category_ids[category] for _, _, category in examples], dtype=np.int32)
+        self.centroids = np.vstack([
+            _normalize(self.vectors[self.labels == i].mean(axis=0)) for i in range(len(self.categories))
+        ])
+        return self
+
+    def predict_many(self, pairs: List[Tuple[str, str]]) -> List[Prediction]:
+        """Pre-classify (entity, context) pairs"""
+        if not pairs:
+            return []
+        queries = self.encoder(pairs)
+        if self.method == "centroid":
+            scores = queries @ self.centroids.T
+            similarity = scores.max(axis=1)
+            ranked = np.sort(scores, axis=1)
+            margins = ranked[:, -1] - (ranked[:, -2] if ranked.shape[1] > 1 else 0.0)
+            winners = scores.argmax(axis=1)
+        else:
+            similarities = queries @ self.vectors.T
+            k = min(self.k, similarities.shape[1])
+            neighbours = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+            neighbour_sims = np.take_along_axis(similarities, neighbours, axis=1)
+            similarity = neighbour_sims.max(axis=1)
+
+            # Similarity-weighted vote; the margin is the winner's share minus the runner-up's
+            votes = np.zeros((len(pairs), len(self.categories)), dtype=np.float32)
+            weights = np.clip(neighbour_sims, 0, None) ** self.sharpness
+            np.add.at(votes, (np.arange(len(pairs))[:, None], self.labels[neighbours]), weights)
+            totals = votes.sum(axis=1)
+            shares = votes / np.where(totals > 0, totals, 1)[:, None]
+            ranked = np.sort(shares, axis=1)
+            margins = ranked[:, -1] - (ranked[:, -2] if ranked.shape[1] > 1 else 0.0)
+            winners = votes.argmax(axis=1)
+
+        return [
+            Prediction(
+                self.categories[winner],
+                float(margin),
+                float(sim),
+                bool(margin >= self.min_margin and sim >= self.min_similarity)
+            )
+            for winner, margin, sim in zip(winners, margins, similarity)
+        ]
+
+    def predict(self, entity: str, context: str = "") -> Prediction:
+        """Pre-classify one entity"""
+        return self.predict_many([(entity, context)])[0]
+
+def load_labeled_examples(path: Path = CLASSIFICATIONS_PATH) -> List[Example]:
+    """
+    Labeled (entity, context, category) examples, one per classified instance.
+
+    Contexts come from the entity occurrence index, in the form the
+    classifier sends to the LLM.
+    """
+    classifications = corpus.load_json(path)
+
+    index = load_entity_index()
+    contexts: Dict[Tuple[str, int], str] = {}
+    for occurrence in index:
+        contexts.setdefault((occurrence.hymn_id, occurrence.line_num), occurrence.context)
+
+    examples = []
+    for item in classifications:
+        context = contexts.get((str(item.get("hymn_id", "")), item.get("line_num", -1)), "")
+        examples.append((item["entity"], context, item["category"]))
+    return examples
+
+def split_examples(examples: List[Example], holdout: float = 0.2, by: str = "entity") -> Tuple[List[Example], List[Example]]:
+    """
+    Deterministic train / held-out split.
+
+    Args:
+        examples: Labeled examples
+        holdout: Fraction held out
+        by: "entity" keeps every instance of an entity on one side, so held-out
+            entities are unseen; "instance" holds out single occurrences, so
+            held-out entities are usually known but appear in new contexts
+    """
+    train, test = [], []
+    for entity, context, category in examples:
+        key = entity if by == "entity" else f"{entity}\n{context}"
+        digest = hashlib.sha256(key.encode("utf-8")).digest()
+        (test if digest[0] / 256 < holdout else train).append((entity, context, category))
+    return train, test
+
+def evaluate(
+    preclassifier: Preclassifier,
+    examples: List[Example],
+    holdout: float = 0.2,
+    by: str = "entity"
+) -> Dict[str, float]:
+    """
+    Fit on the training examples and score the held-out ones. With
+    by="entity" each held-out entity is predicted once from its first
+    context, as in batch mode.
+
+    Returns:
+        Held-out count, LLM calls avoided and agreement figures
+    """
+    train, test = split_examples(examples, holdout, by)
+    preclassifier.fit(train)
+
+    if by == "entity":
+        first: Dict[str, Example] = {}
+        for example in test:
+            first.setdefault(example[0], example)
+        test = list(first.values())
+
+    predictions = preclassifier.predict_many([(entity, context) for entity, context, _ in test])
+    confident = [(p, e) for p, e in zip(predictions, test) if p.confident]
+    return {
+        "held_out": len(test),
+        "avoided": len(confident),
+        "avoided_rate": len(confident) / max(1, len(test)),
+        "agreement_confident": sum(p.category == e[2] for p, e in confident) / max(1, len(confident)),
+        "agreement_all": sum(p.category == e[2] for p, e in zip(predictions, test)) / max(1, len(test))
+    }
+
+def load_preclassifier(
+    method: str = "knn",
+    k: int = 3,
+    min_margin: Optional[float] = None,
+    min_similarity: float = 0.7,
+    encoder_name: str = "hashing",
+    path: Path = CLASSIFICATIONS_PATH
+) -> Preclassifier:
+    """A pre-classifier fitted on every labeled classification"""
+    encoder = use_pair_encoder() if encoder_name == "use" else HashingEncoder()
+    return Preclassifier(encoder, method, k, min_margin, min_similarity).fit(load_labeled_examples(path))
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Pre-classify entities by embedding similarity to labeled ones")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    def add_model_arguments(sub: argparse.ArgumentParser) -> None:
+        sub.add_argument("--method", choices=["knn", "centroid"], default="knn", help="Classification method")
+        sub.add_argument("--k", type=int, default=3, help="Neighbours for knn")
+        sub.add_argument("--min-margin", type=float, default=None,
+                         help="Lowest margin accepted without the LLM (default: 0.5 for knn, 0.05 for centroid)")
+        sub.add_argument("--min-similarity", type=float, default=0.7,
+                         help="Lowest similarity accepted; below it an entity is novel")
+        sub.add_argument("--encoder", choices=["hashing", "use"], default="hashing",
+                         help="Embedding: hashed n-grams, or the Universal Sentence Encoder")
+
+    evaluate_parser = subparsers.add_parser("evaluate", help="Report avoided LLM calls and held-out agreement")
+    add_model_arguments(evaluate_parser)
+    evaluate_parser.add_argument("--holdout", type=float, default=0.2, help="Fraction of entities held out")
+
+    predict_parser = subparsers.add_parser("predict", help="Pre-classify one entity")
+    add_model_arguments(predict_parser)
+    predict_parser.add_argument("entity", type=str, help="Entity text")
+    predict_parser.add_argument("--context", type=str, default="", help="Line context")
+
+    args = parser.parse_args()
+
+    if args.command == "evaluate":
+        encoder = use_pair_encoder() if args.encoder == "use" else HashingEncoder()
+        examples = load_labeled_examples()
+        print(f"{len(examples)} labeled instances of {len({e[0] for e in examples})} entities "
+              f"({args.method}, {args.encoder} encoder, {args.holdout:.0%} held out)")
+        for by, title in (("entity", "Unseen entities"), ("instance", "Known entities in new contexts")):
+            preclassifier = Preclassifier(encoder, args.method, args.k, args.min_margin, args.min_similarity)
+            start_time = time.perf_counter()
+            result = evaluate(preclassifier, examples, args.holdout, by)
+            elapsed = time.perf_counter() - start_time
+
+            print(f"\n{title} ({result['held_out']} held out, {elapsed * 1000:.0f} ms):")
+            print(f"  LLM calls avoided: {result['avoided']}/{result['held_out']} ({result['avoided_rate']:.1%})")
+            print(f"  Agreement on avoided calls: {result['agreement_confident']:.1%}")
+            print(f"  Agreement if every held-out entity were pre-classified: {result['agreement_all']:.1%}")
+    elif args.command == "predict":
+        preclassifier = load_preclassifier(args.method, args.k, args.min_margin, args.min_similarity, args.encoder)
+        print(preclassifier.predict(args.entity, args.context))
+    else:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Adaptive (AIMD) concurrency control for requests to the Ollama server.
+
+`AdaptiveLimiter` bounds the number of requests in flight and adjusts that
+bound from what the server tells us:
+
+    - every successful request adds 1/limit (about +1 per round of requests)
+    - a timeout, 5xx or 429 halves the limit and pauses new requests, with
+      the pause doubling while overload signals continue
+    - the short-term average latency rising above `latency_tolerance` times
+      the baseline (a slowly rising low-latency average) halves the limit as
+      well, since it means requests are queueing on the server
+
+Decreases (and pause increases) happen at most once per smoothed latency
+or current pause, so one burst of failures or slow responses counts as a
+single congestion signal.
+"""
+
+import asyncio
+import time
+from collections import Counter, deque
+from typing import Deque, Optional
+
+# Request outcomes reported to the limiter
+OK = "ok"
+OVERLOAD = "overload"  # Timeout, 5xx or 429: back off
+FAILED = "failed"  # Any other failure: no congestion signal
+
+class AdaptiveLimiter:
+    """Additive-increase / multiplicative-decrease limit on in-flight requests"""
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        initial_concurrency: int = 1,
+        latency_tolerance: float = 2.0,
+        backoff: float = 0.5,
+        min_pause: float = 0.5,
+        max_pause: float = 30.0,
+        smoothing: float = 0.2,
+        baseline_smoothing: float = 0.005
+    ):
+        """
+        Args:
+            max_concurrency: Upper bound on requests in flight
+            min_concurrency: Lower bound on requests in flight
+            initial_concurrency: Starting limit
+            latency_tolerance: Short-term latency / baseline ratio treated as congestion
+            backoff: Factor applied to the limit on congestion
+            min_pause: First pause after an overload signal, in seconds
+            max_pause: Longest pause, in seconds
+            smoothing: Weight of a new sample in the short-term latency average
+            baseline_smoothing: Weight of a slower sample in the baseline
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.limit = float(min(max(initial_concurrency, self.min_concurrency), self.max_concurrency))
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+        self.min_pause = min_pause
+        self.max_pause = max_pause
+        self.smoothing = smoothing
+        self.baseline_smoothing = baseline_smoothing
+
+        self.in_flight = 0
+        self.latency: Optional[float] = None  # Short-term average latency in seconds
+        self.baseline: Optional[float] = None  # Uncongested latency estimate in seconds
+        self.pause = 0.0
+        self.stats: Counter = Counter()
+        self._resume_at = 0.0
+        self._last_decrease = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @classmethod
+    def fixed(cls, concurrency: int) -> "AdaptiveLimiter":
+        """A limiter that keeps a constant limit but still pauses on overload"""
+        return cls(max_concurrency=concurrency, min_concurrency=concurrency, initial_concurrency=concurrency)
+
+    @property
+    def concurrency(self) -> int:
+        """Current number of requests allowed in flight"""
+        return int(self.limit)
+
+    def describe(self) -> str:
+        """Short state summary for progress output"""
+        latency = f"{self.latency * 1000:.0f} ms" if self.latency is not None else "-"
+        text = f"concurrency {self.concurrency}/{self.max_concurrency}, latency {latency}"
+        if self.pause > 0:
+            text += f", backoff {self.pause:.1f}s"
+        return text
+
+    async def acquire(self) -> None:
+        """Wait (first come, first served) for a free slot and for any backoff pause to end"""
+        if self.in_flight < self.concurrency and not self._waiters:
+            self.in_flight += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                # `_wake` hands the slot over, so there is nothing to retake
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self.in_flight -= 1
+                    self._wake()
+                elif waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                raise
+
+        wait = self._resume_at - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def release(self, latency: float, outcome: str) -> None:
+        """
+        Free a slot and adjust the limit.
+
+        Args:
+            latency: Seconds the request took
+            outcome: OK, OVERLOAD or FAILED
+        """
+        self.in_flight -= 1
+        self.stats[outcome] += 1
+        now = time.monotonic()
+
+        if outcome == OK:
+            self._observe(latency)
+            if self.latency > self.latency_tolerance * self.baseline:
+                self._decrease(now, "latency")
+            else:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+                self.pause = self.pause / 2 if self.pause > self.min_pause / 4 else 0.0
+        elif outcome == OVERLOAD and self._decrease(now, "overload"):
+            self.pause = min(self.max_pause, max(self.min_pause, self.pause * 2))
+            self._resume_at = now + self.pause
+
+        self._wake()
+
+    def _wake(self) -> None:
+        """Hand free slots to waiters in arrival order"""
+        while self._waiters and self.in_flight < self.concurrency:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _observe(self, latency: float) -> None:
+        """Update the short and long-term latency averages"""
+        if self.latency is None:
+            self.latency = self.baseline = latency
+            return
+        self.latency += self.smoothing * (latency - self.latency)
+        # The baseline is the lowest smoothed latency seen, drifting up slowly,
+        # so it tracks the uncongested latency rather than a queueing server's
+        if self.latency < self.baseline:
+            self.baseline = self.latency
+        else:
+            self.baseline += self.baseline_smoothing * (self.latency - self.baseline)
+
+    def _decrease(self, now: float, reason: str) -> bool:
+        """Multiplicative decrease, at most once per smoothed latency (or pause)"""
+        if now - self._last_decrease < max(self.latency or 0.0, self.pause):
+            return False
+        self._last_decrease = now
+        self.limit = max(self.min_concurrency, self.limit * self.backoff)
+        self.stats[f"decrease_{reason}"] += 1
+        return True
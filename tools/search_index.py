@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Lexical and Hybrid Sentence Search for Cleros Orphicae
+
+This script builds a BM25 inverted index over the sentences of the web corpus
+(web/public/data/hymns.json) and ranks sentences for a query by:
+
+- BM25 alone (no model needed; sub-millisecond for typical queries), or
+- a hybrid score that fuses normalized BM25 with the semantic score the web
+  application uses: 0.7 * sentence similarity + 0.3 * best span similarity,
+  computed from the existing sentence and span embeddings. Sentences without
+  a stored sentence embedding (all of them, while sentence_embeddings.json
+  has not been generated) are scored by their best span similarity. The
+  query vector comes from the Universal Sentence Encoder (--hybrid) or from a
+  stored sentence or span embedding (--like ID, no model needed).
+
+Exact epithets and rare names ("Dracanum", "Insewn") are found by the lexical
+side even when they rank poorly by embedding similarity.
+
+Index layout (search_index.json):
+    {
+        "version": 1, "k1": 1.5, "b": 0.75,
+        "ids": ["homeric-0-s0", ...],          # sentence IDs, as in sentence_metadata.json
+        "lengths": [37, ...],                  # tokens per sentence
+        "postings": {"zeus": [doc, tf, doc, tf, ...], ...}
+    }
+"""
+
+import argparse
+import glob
+import json
+import math
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Allow running as a script from the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tools import corpus
+from tools.corpus import DATA_DIR, HYMNS_PATH, WEB_DATA_DIR
+from tools.io_utils import write_json_atomic
+
+# Constants
+SENTENCE_EMBEDDINGS_PATH = WEB_DATA_DIR / "sentence_embeddings.json"
+INDEX_PATH = DATA_DIR / "enriched" / "search" / "search_index.json"
+INDEX_VERSION = 1
+USE_MODEL_URL = "https://tfhub.dev/google/universal-sentence-encoder/4"
+
+# Weights of the web application's combined score
+SENTENCE_WEIGHT = 0.7
+SPAN_WEIGHT = 0.3
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens; hyphenated compounds are split into their parts"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+def sentence_id(hymn_id: str, sentence_index: int) -> str:
+    """Sentence ID in the format used by the embedding and metadata files"""
+    return f"{hymn_id}-s{sentence_index}"
+
+def load_sentences(hymns_path: Path = HYMNS_PATH) -> List[Tuple[str, str]]:
+    """Load (sentence_id, text) pairs from hymns.json"""
+    hymn_data = corpus.load_json(hymns_path)
+
+    sentences = []
+    for hymn in hymn_data.get("hymns", []):
+        for position, sentence in enumerate(hymn.get("sentences", [])):
+            text = sentence.get("text")
+            if text:
+                sentences.append((sentence_id(hymn["id"], sentence.get("index", position)), text))
+    return sentences
+
+class BM25Index:
+    """Okapi BM25 over sentences"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.ids: List[str] = []
+        self.lengths: List[int] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._prepare()
+
+    def _prepare(self) -> None:
+        """Precompute the per-document length normalization and IDF table"""
+        n = len(self.ids)
+        avg_length = sum(self.lengths) / n if n else 0.0
+        self._norm = [
+            self.k1 * (1 - self.b + self.b * length / avg_length) if avg_length else self.k1
+            for length in self.lengths
+        ]
+        self._idf = {
+            term: math.log(1 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+            for term, plist in self.postings.items()
+        }
+
+    @classmethod
+    def build(cls, sentences: Sequence[Tuple[str, str]], k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        """Index (sentence_id, text) pairs"""
+        index = cls(k1, b)
+        for doc, (sid, text) in enumerate(sentences):
+            tokens = tokenize(text)
+            index.ids.append(sid)
+            index.lengths.append(len(tokens))
+
+            counts: Dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for term, tf in counts.items():
+                index.postings.setdefault(term, []).append((doc, tf))
+
+        index._prepare()
+        return index
+
+    def save(self, path: Path = INDEX_PATH) -> None:
+        """Write the index as compact JSON"""
+        write_json_atomic(path, {
+            "version": INDEX_VERSION,
+            "k1": self.k1,
+            "b": self.b,
+            "ids": self.ids,
+            "lengths": self.lengths,
+            "postings": {
+                term: [n for posting in plist for n in posting]
+                for term, plist in self.postings.items()
+            }
+        }, indent=None)
+
+    @classmethod
+    def load(cls, path: Path = INDEX_PATH) -> "BM25Index":
+        """Load an index written by `save`"""
+        with open(path, 'r', encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"{path} has index version {data.get('version')}, expected {INDEX_VERSION}")
+
+        index = cls(data["k1"], data["b"])
+        index.ids = data["ids"]
+        index.lengths = data["lengths"]
+        index.postings = {
+            term: list(zip(values[::2], values[1::2]))
+            for term, values in data["postings"].items()
+        }
+        index._prepare()
+        return index
+
+    def scores(self, query: str) -> Dict[int, float]:
+        """BM25 score of every document that contains at least one query term"""
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            plist = self.postings.get(term)
+            if not plist:
+                continue
+            idf = self._idf[term]
+            for doc, tf in plist:
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (self.k1 + 1) / (tf + self._norm[doc])
+        return scores
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """Top (sentence_id, score) pairs for a query"""
+        scores = self.scores(query)
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return [(self.ids[doc], score) for doc, score in best]
+
+def load_embedding_file(path: Path) -> Dict[str, List[float]]:
+    """Load the {"m", "d", "e"} embedding format used by the web application"""
+    with open(path, 'r', encoding="utf-8") as f:
+        return json.load(f).get("e", {})
+
+def load_use_encoder(model_url: str = USE_MODEL_URL) -> Callable[[List[str]], "object"]:
+    """
+    Load the Universal Sentence Encoder used to build the stored embeddings.
+
+    Requires tensorflow and tensorflow_hub.
+    """
+    import tensorflow_hub as hub
+
+    model = hub.load(model_url)
+    return lambda texts: model(texts).numpy()
+
+class HybridRanker:
+    """
+    Fuse BM25 with sentence and span embedding similarity.
+
+    The query vector comes from the encoder, or is passed to `search` directly
+    (for example a stored embedding, see `stored_vector`). Sentences without a
+    stored sentence embedding are scored by their best span similarity alone.
+    Without embeddings the ranker is lexical-only and never touches NumPy or a
+    model.
+    """
+
+    def __init__(
+        self,
+        bm25: BM25Index,
+        encoder: Optional[Callable[[List[str]], "object"]] = None,
+        sentence_embeddings_path: Path = SENTENCE_EMBEDDINGS_PATH,
+        span_dir: Path = WEB_DATA_DIR,
+        lexical_weight: float = 0.5,
+        load_embeddings: Optional[bool] = None
+    ):
+        """
+        Args:
+            bm25: Lexical index; its document order is the ranking order
+            encoder: Maps query texts to vectors in the embedding space
+            sentence_embeddings_path: Stored sentence embeddings (optional file)
+            span_dir: Directory holding span_embeddings_*.json
+            lexical_weight: Weight of the normalized BM25 score (0-1)
+            load_embeddings: Load stored embeddings (default: when an encoder is given)
+        """
+        self.bm25 = bm25
+        self.encoder = encoder
+        self.lexical_weight = lexical_weight
+        self.sentence_matrix = None
+        self.has_sentence = None
+        self.span_matrix = None
+        self.span_owner = None
+        self.span_rows: Dict[str, int] = {}
+
+        if load_embeddings is None:
+            load_embeddings = encoder is not None
+        if load_embeddings:
+            self._load_embeddings(Path(sentence_embeddings_path), Path(span_dir))
+
+    @property
+    def semantic(self) -> bool:
+        """Whether stored embeddings are loaded"""
+        return self.sentence_matrix is not None or self.span_matrix is not None
+
+    def _load_embeddings(self, sentence_path: Path, span_dir: Path) -> None:
+        """Align stored sentence and span embeddings with the BM25 document order"""
+        import numpy as np
+
+        if sentence_path.exists():
+            sentence_embeddings = load_embedding_file(sentence_path)
+            dimension = len(next(iter(sentence_embeddings.values())))
+            matrix = np.zeros((len(self.bm25.ids), dimension), dtype=np.float32)
+            has_sentence = np.zeros(len(self.bm25.ids), dtype=bool)
+            for doc, sid in enumerate(self.bm25.ids):
+                if sid in sentence_embeddings:
+                    matrix[doc] = sentence_embeddings[sid]
+                    has_sentence[doc] = True
+            self.sentence_matrix = matrix
+            self.has_sentence = has_sentence
+        else:
+            print(f"Sentence embeddings not found at {sentence_path}; scoring with span embeddings only")
+
+        # Span IDs are "{sentence_id}-{start_char}"
+        doc_of = {sid: doc for doc, sid in enumerate(self.bm25.ids)}
+        vectors = []
+        owners = []
+        for path in sorted(glob.glob(str(span_dir / "span_embeddings_*.json"))):
+            for span_id, vector in load_embedding_file(Path(path)).items():
+                doc = doc_of.get(span_id.rsplit("-", 1)[0])
+                if doc is not None:
+                    self.span_rows[span_id] = len(vectors)
+                    vectors.append(vector)
+                    owners.append(doc)
+        if vectors:
+            self.span_matrix = np.asarray(vectors, dtype=np.float32)
+            self.span_owner = np.asarray(owners, dtype=np.int64)
+
+        if not self.semantic:
+            print("No stored embeddings found; ranking lexically")
+
+    def stored_vector(self, item_id: str):
+        """
+        Stored embedding of a sentence or span, for query-by-example.
+
+        A sentence without a stored sentence embedding is represented by the
+        normalized mean of its span embeddings.
+
+        Returns:
+            The vector, or None if nothing is stored for the ID
+        """
+        import numpy as np
+
+        if item_id in self.span_rows:
+            return self.span_matrix[self.span_rows[item_id]]
+        if item_id not in self.bm25.ids:
+            return None
+        doc = self.bm25.ids.index(item_id)
+        if self.has_sentence is not None and self.has_sentence[doc]:
+            return self.sentence_matrix[doc]
+        if self.span_matrix is None or not (self.span_owner == doc).any():
+            return None
+        mean = self.span_matrix[self.span_owner == doc].mean(axis=0)
+        return mean / np.linalg.norm(mean)
+
+    def _semantic_scores(self, query_vector):
+        """
+        0.7 * sentence similarity + 0.3 * best span similarity for every sentence.
+
+        Sentences without a stored sentence embedding get their best span
+        similarity; sentences with no vectors at all get the lowest score.
+        """
+        import numpy as np
+
+        count = len(self.bm25.ids)
+        span_best = np.zeros(count, dtype=np.float32)
+        has_span = np.zeros(count, dtype=bool)
+        if self.span_matrix is not None:
+            span_sim = self.span_matrix @ query_vector
+            best = np.full(count, -np.inf, dtype=np.float32)
+            np.maximum.at(best, self.span_owner, span_sim)
+            has_span = np.isfinite(best)
+            span_best = np.where(has_span, best, 0.0)
+
+        if self.sentence_matrix is None:
+            scores = span_best
+            covered = has_span
+        else:
+            sentence_sim = self.sentence_matrix @ query_vector
+            scores = np.where(
+                self.has_sentence,
+                SENTENCE_WEIGHT * sentence_sim + SPAN_WEIGHT * span_best,
+                span_best
+            )
+            covered = self.has_sentence | has_span
+
+        if covered.any():
+            scores = np.where(covered, scores, scores[covered].min())
+        return scores
+
+    def search(self, query: str, top_k: int = 10, query_vector=None) -> List[Tuple[str, float]]:
+        """
+        Top (sentence_id, score) pairs, fused when embeddings are available.
+
+        Args:
+            query: Query text for BM25 (and the encoder)
+            top_k: Number of results
+            query_vector: Semantic query vector; encoded from `query` when omitted
+
+        Returns:
+            (sentence_id, score) pairs, best first
+        """
+        if not self.semantic or (query_vector is None and self.encoder is None):
+            return self.bm25.search(query, top_k)
+
+        import numpy as np
+
+        if query_vector is None:
+            query_vector = self.encoder([query])[0]
+        query_vector = np.asarray(query_vector, dtype=np.float32)
+
+        lexical = np.zeros(len(self.bm25.ids), dtype=np.float32)
+        for doc, score in self.bm25.scores(query).items():
+            lexical[doc] = score
+        if lexical.max() > 0:
+            lexical /= lexical.max()
+
+        semantic = self._semantic_scores(query_vector)
+        spread = semantic.max() - semantic.min()
+        if spread > 0:
+            semantic = (semantic - semantic.min()) / spread
+
+        fused = self.lexical_weight * lexical + (1 - self.lexical_weight) * semantic
+        best = np.argsort(-fused, kind="stable")[:top_k]
+        return [(self.bm25.ids[doc], float(fused[doc])) for doc in best]
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="BM25 and hybrid search over hymn sentences")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    build_parser = subparsers.add_parser("build", help="Build the BM25 index from hymns.json")
+    build_parser.add_argument("--output", type=str, default=str(INDEX_PATH), help="Index output file")
+
+    search_parser = subparsers.add_parser("search", help="Rank sentences for a query")
+    search_parser.add_argument("query", type=str, nargs="?", default="",
+                               help="Query text (may be empty with --like)")
+    search_parser.add_argument("--top-k", type=int, default=10, help="Number of results")
+    search_parser.add_argument("--hybrid", action="store_true",
+                               help="Load the Universal Sentence Encoder and fuse with embedding scores")
+    search_parser.add_argument("--like", type=str, metavar="ID",
+                               help="Use the stored embedding of a sentence or span as the semantic query "
+                                    "(hybrid ranking without loading a model)")
+    search_parser.add_argument("--sentence-embeddings", type=str, default=str(SENTENCE_EMBEDDINGS_PATH),
+                               help="Sentence embeddings file (spans alone are used when it is missing)")
+    search_parser.add_argument("--lexical-weight", type=float, default=0.5,
+                               help="Weight of the BM25 score in hybrid mode (0-1)")
+    search_parser.add_argument("--index", type=str, default=str(INDEX_PATH), help="Index file")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start_time = time.perf_counter()
+        index = BM25Index.build(load_sentences())
+        index.save(Path(args.output))
+        print(f"Indexed {len(index.ids)} sentences and {len(index.postings)} terms "
+              f"in {time.perf_counter() - start_time:.2f}s")
+        print(f"Index saved to {args.output}")
+    elif args.command == "search":
+        index_path = Path(args.index)
+        index = BM25Index.load(index_path) if index_path.exists() else BM25Index.build(load_sentences())
+        if not args.query and not args.like:
+            parser.error("a query is required unless --like is given")
+        encoder = None
+        if args.hybrid and not args.like:
+            try:
+                encoder = load_use_encoder()
+            except ImportError:
+                parser.error("--hybrid needs tensorflow and tensorflow_hub; use --like ID to rank by a stored embedding")
+        ranker = HybridRanker(
+            index,
+            encoder=encoder,
+            sentence_embeddings_path=Path(args.sentence_embeddings),
+            lexical_weight=args.lexical_weight,
+            load_embeddings=bool(encoder is not None or args.like)
+        )
+
+        query_vector = None
+        if args.like:
+            query_vector = ranker.stored_vector(args.like)
+            if query_vector is None:
+                parser.error(f"no stored embedding for {args.like}")
+
+        texts = dict(load_sentences())
+        start_time = time.perf_counter()
+        results = ranker.search(args.query, top_k=args.top_k, query_vector=query_vector)
+        elapsed = time.perf_counter() - start_time
+
+        mode = "hybrid" if ranker.semantic and (encoder is not None or query_vector is not None) else "lexical"
+        print(f"Top {len(results)} results ({mode}, {elapsed * 1000:.2f} ms):")
+        for sid, score in results:
+            print(f"  {score:7.3f}  {sid}: {texts.get(sid, '')[:100]}")
+    else:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
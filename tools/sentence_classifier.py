@@ -5,19 +5,44 @@ Sentence Entity Classifier for Cleros Orphicae
 This script maps deity classifications to their positions in sentences.
 It uses the character offset information from the linguistic features
 to identify where each classified entity appears in a given sentence.
+
+A SentenceEntityIndex loads the classifications and entity offsets once, so
+many sentences can be classified in one process (see --file). Sentences
+without a hymn/line reference are matched to the most similar corpus line
+through an inverted word -> line index, and that line's entities are located
+in the sentence with one Aho-Corasick pass (see entity_annotator.py).
 """
 
 import json
 import argparse
+import io
+import math
+import random
+import re
+import sys
+import time
+from contextlib import redirect_stdout
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+# Allow running as a script from the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tools import corpus
+from tools.corpus import CLASSIFICATIONS_PATH, DATA_DIR, DEITIES_DIR, HYMNS_PATH
+from tools.entity_annotator import AhoCorasickAnnotator
+from tools.entity_index import load_entity_index
+from tools.entity_ruler import load_entity_patterns
+from tools.io_utils import atomic_write, iter_json_object_array
 
 # Constants
-DATA_DIR = Path("data")
-LINGUISTICS_DIR = DATA_DIR / "enriched" / "linguistics"
-DEITIES_DIR = DATA_DIR / "enriched" / "deities"
-LINGUISTIC_FEATURES_PATH = LINGUISTICS_DIR / "linguistic_features.json"
-CLASSIFICATIONS_PATH = DEITIES_DIR / "deity_classifications.json"
+ANALYZED_SENTENCES_PATH = DATA_DIR / "analyzed_sentences.jsonl"
+MIN_MATCH_SCORE = 0.5  # Share of the sentence's words a fuzzy line match must contain
+
+WORD_PATTERN = re.compile(r"\w+")
+
+def word_set(text: str) -> frozenset:
+    """Lowercased word set used for fuzzy line matching"""
+    return frozenset(WORD_PATTERN.findall(text.lower()))
 
 class EntityLocation:
     """Entity location and classification information"""
@@ -38,8 +63,7 @@ def load_classifications() -> Dict[str, str]:
         Dictionary mapping entity names to their categories
     """
     try:
-        with open(CLASSIFICATIONS_PATH, 'r') as f:
-            classifications = json.load(f)
+        classifications = corpus.load_json(CLASSIFICATIONS_PATH)
         
         # Create a dictionary mapping entity names to categories
         entity_categories = {}
@@ -58,40 +82,27 @@ def load_classifications() -> Dict[str, str]:
 
 def load_entity_offsets() -> Dict[str, List[Tuple[str, int, int, int, int]]]:
     """
-    Load entity offsets from linguistic_features.json
+    Load entity offsets from the entity occurrence index
     
     Returns:
         Dictionary mapping hymn+line identifiers to lists of 
         (entity, start_char, end_char, hymn_id, line_num) tuples
     """
     try:
-        with open(LINGUISTIC_FEATURES_PATH, 'r') as f:
-            features_data = json.load(f)
+        index = load_entity_index()
         
-        # Extract entities with their offsets
+        # Group entity offsets by line
         line_entities = {}
-        
-        # Process each hymn
-        for hymn in features_data:
-            hymn_id = hymn.get("hymn_id", "unknown")
-            
-            # Process each line in the hymn
-            for line_data in hymn.get("per_line", []):
-                line_num = line_data.get("line_num", 0)
-                line_key = f"Hymn {hymn_id}, Line {line_num}"
-                
-                # Get line entities
-                entities = []
-                for entity in line_data.get("entities", []):
-                    entity_text = entity.get("text", "")
-                    start_char = entity.get("start_char", 0)
-                    end_char = entity.get("end_char", 0)
-                    
-                    if entity_text and start_char < end_char:
-                        entities.append((entity_text, start_char, end_char, hymn_id, line_num))
-                
-                if entities:
-                    line_entities[line_key] = entities
+        for occurrence in index:
+            if occurrence.start_char < occurrence.end_char:
+                line_key = f"Hymn {occurrence.hymn_id}, Line {occurrence.line_num}"
+                line_entities.setdefault(line_key, []).append((
+                    occurrence.entity,
+                    occurrence.start_char,
+                    occurrence.end_char,
+                    occurrence.hymn_id,
+                    occurrence.line_num
+                ))
         
         return line_entities
     
@@ -99,84 +110,196 @@ def load_entity_offsets() -> Dict[str, List[Tuple[str, int, int, int, int]]]:
         print(f"Error loading entity offsets: {e}")
         return {}
 
-def classify_sentence(sentence: str, hymn_id: str = None, line_num: int = None) -> List[EntityLocation]:
+def load_line_texts() -> Dict[str, str]:
     """
-    Classify entities in a sentence and return their locations
+    Load the text of every line with entities from the entity occurrence index
     
-    Args:
-        sentence: The sentence text to classify
-        hymn_id: Optional hymn ID to help with lookup
-        line_num: Optional line number to help with lookup
-        
     Returns:
-        List of EntityLocation objects with entity, category, and character positions
+        Dictionary mapping hymn+line identifiers to the line text
     """
-    # Load classifications and entity offsets
-    classifications = load_classifications()
-    line_entities = load_entity_offsets()
+    try:
+        return {f"Hymn {hymn_id}, Line {line_num}": text for hymn_id, line_num, text in load_entity_index().lines}
     
-    # Create a key for lookup if hymn_id and line_num are provided
-    line_key = f"Hymn {hymn_id}, Line {line_num}" if hymn_id is not None and line_num is not None else None
+    except Exception as e:
+        print(f"Error loading line texts: {e}")
+        return {}
+
+class SentenceEntityIndex:
+    """Entity categories and per-line entity offsets, loaded once and kept in memory"""
     
-    # If we have a direct line key match
-    if line_key and line_key in line_entities:
-        entities = line_entities[line_key]
-        
-        # Map entities to their classifications
-        locations = []
-        for entity_text, start_char, end_char, _, _ in entities:
-            category = classifications.get(entity_text, "Unknown")
-            locations.append(EntityLocation(entity_text, category, start_char, end_char))
+    def __init__(
+        self,
+        classifications: Dict[str, str],
+        line_entities: Dict[str, List[Tuple[str, int, int, int, int]]],
+        line_texts: Optional[Dict[str, str]] = None
+    ):
+        """
+        Args:
+            classifications: Entity name -> category (see `load_classifications`)
+            line_entities: Line key -> entity offsets (see `load_entity_offsets`)
+            line_texts: Line key -> text (see `load_line_texts`), for fuzzy matching
+        """
+        self.classifications = classifications
+        self.line_entities = line_entities
+        self._annotator: Optional[AhoCorasickAnnotator] = None
         
-        return locations
+        # Inverted index over the lines that have entities: word -> line ids,
+        # with each line's word set precomputed for scoring
+        self.line_keys: List[str] = []
+        self.line_words: List[frozenset] = []
+        self.postings: Dict[str, List[int]] = {}
+        for line_key, text in (line_texts or {}).items():
+            if line_key not in line_entities:
+                continue
+            line_id = len(self.line_keys)
+            self.line_keys.append(line_key)
+            self.line_words.append(word_set(text))
+            for word in self.line_words[line_id]:
+                self.postings.setdefault(word, []).append(line_id)
     
-    # If we don't have a direct line key match, we need to find the best match
-    # by comparing the sentence with the contexts in our entity data
+    @classmethod
+    def load(cls) -> "SentenceEntityIndex":
+        """Load the classifications and the entity occurrence index"""
+        return cls(load_classifications(), load_entity_offsets(), load_line_texts())
     
-    # Find the most similar line by simple string matching
-    best_match_key = None
-    best_match_score = 0
+    def __repr__(self):
+        return (f"SentenceEntityIndex(entities={len(self.classifications)}, "
+                f"lines={len(self.line_entities)})")
     
-    for line_key in line_entities.keys():
-        # Extract the actual text from the line key, which is in format "Hymn X, Line Y: text"
-        if ": " in line_key:
-            line_text = line_key.split(": ", 1)[1]
+    @property
+    def annotator(self) -> AhoCorasickAnnotator:
+        """Automaton over every entity text of the indexed lines, built on first use"""
+        if self._annotator is None:
+            self._annotator = AhoCorasickAnnotator({
+                entity_text: self.classifications.get(entity_text, "Unknown")
+                for entities in self.line_entities.values()
+                for entity_text, *_ in entities
+            })
+        return self._annotator
+    
+    def best_line(self, sentence: str, min_score: float = MIN_MATCH_SCORE) -> Tuple[Optional[str], float]:
+        """
+        Find the corpus line sharing the largest share of the sentence's words
+        
+        A line scoring at least min_score shares at least ceil(min_score * n)
+        of the sentence's n words, so it must contain one of the sentence's
+        n - ceil(min_score * n) + 1 rarest words. Only the postings of those
+        words are read for candidates, and only candidates are scored.
+        
+        Args:
+            sentence: Sentence text
+            min_score: Minimum share of sentence words
             
-            # Calculate a simple similarity score (number of matching words)
-            sentence_words = set(sentence.lower().split())
-            line_words = set(line_text.lower().split())
-            common_words = sentence_words.intersection(line_words)
+        Returns:
+            (line key, score) of the best line, or (None, 0.0) if none reaches min_score
+        """
+        words = word_set(sentence)
+        if not words:
+            return None, 0.0
+        
+        needed = max(1, math.ceil(min_score * len(words)))
+        rarest = sorted(words, key=lambda word: len(self.postings.get(word, ())))
+        candidates = set()
+        for word in rarest[:len(words) - needed + 1]:
+            candidates.update(self.postings.get(word, ()))
+        
+        best_id, best_score = None, 0.0
+        for line_id in sorted(candidates):
+            score = len(words & self.line_words[line_id]) / len(words)
+            if score > best_score:
+                best_id, best_score = line_id, score
+        
+        if best_id is None or best_score < min_score:
+            return None, 0.0
+        return self.line_keys[best_id], best_score
+    
+    def classify(self, sentence: str, hymn_id: str = None, line_num: int = None) -> List[EntityLocation]:
+        """
+        Classify entities in a sentence and return their locations
+        
+        Args:
+            sentence: The sentence text to classify
+            hymn_id: Optional hymn ID to help with lookup
+            line_num: Optional line number to help with lookup
             
-            # Weight by the ratio of common words to total words in the sentence
-            score = len(common_words) / max(1, len(sentence_words))
+        Returns:
+            List of EntityLocation objects with entity, category, and character positions
+        """
+        # Create a key for lookup if hymn_id and line_num are provided
+        line_key = f"Hymn {hymn_id}, Line {line_num}" if hymn_id is not None and line_num is not None else None
+        
+        # If we have a direct line key match
+        if line_key and line_key in self.line_entities:
+            entities = self.line_entities[line_key]
             
-            if score > best_match_score:
-                best_match_score = score
-                best_match_key = line_key
-    
-    # If we found a good match (at least 50% of words match)
-    if best_match_score >= 0.5 and best_match_key:
-        entities = line_entities[best_match_key]
-        
-        # Map entities to their classifications
-        locations = []
-        for entity_text, start_char, end_char, _, _ in entities:
-            # We need to adjust offsets since we're using a different text
-            # Find the entity in the sentence
-            entity_pos = sentence.find(entity_text)
-            if entity_pos >= 0:
-                category = classifications.get(entity_text, "Unknown")
-                locations.append(EntityLocation(
-                    entity_text, 
-                    category, 
-                    entity_pos, 
-                    entity_pos + len(entity_text)
-                ))
+            # Map entities to their classifications
+            locations = []
+            for entity_text, start_char, end_char, _, _ in entities:
+                category = self.classifications.get(entity_text, "Unknown")
+                locations.append(EntityLocation(entity_text, category, start_char, end_char))
+            
+            return locations
+        
+        # If we don't have a direct line key match, find the corpus line
+        # sharing the most words with the sentence
+        best_match_key, best_match_score = self.best_line(sentence)
         
-        return locations
+        # If we found a good match (at least 50% of words match)
+        if best_match_key:
+            entities = self.line_entities[best_match_key]
+            
+            # Offsets differ in a different text, so find the line's entities
+            # in the sentence with one pass of the automaton; matches never
+            # overlap, and a repeated entity is found at each occurrence
+            line_texts = {entity_text for entity_text, *_ in entities}
+            return [
+                EntityLocation(match.text, match.category, match.start, match.end)
+                for match in self.annotator.find(sentence)
+                if match.text in line_texts
+            ]
+        
+        # If we couldn't find a good match, return an empty list
+        return []
+    
+    def classify_many(
+        self,
+        sentences: Iterable[Tuple[str, Optional[str], Optional[int]]]
+    ) -> List[List[EntityLocation]]:
+        """
+        Classify a batch of sentences
+        
+        Args:
+            sentences: (sentence, hymn_id, line_num) tuples; IDs may be None
+            
+        Returns:
+            One list of EntityLocation objects per sentence, in input order
+        """
+        return [self.classify(sentence, hymn_id, line_num) for sentence, hymn_id, line_num in sentences]
+
+def classify_sentence(
+    sentence: str,
+    hymn_id: str = None,
+    line_num: int = None,
+    index: Optional[SentenceEntityIndex] = None
+) -> List[EntityLocation]:
+    """
+    Classify entities in a sentence and return their locations
+    
+    Without an index, the classifications and entity offsets are loaded for
+    this call only; use a shared SentenceEntityIndex for repeated calls.
     
-    # If we couldn't find a good match, return an empty list
-    return []
+    Args:
+        sentence: The sentence text to classify
+        hymn_id: Optional hymn ID to help with lookup
+        line_num: Optional line number to help with lookup
+        index: Optional preloaded SentenceEntityIndex
+        
+    Returns:
+        List of EntityLocation objects with entity, category, and character positions
+    """
+    if index is None:
+        index = SentenceEntityIndex.load()
+    return index.classify(sentence, hymn_id, line_num)
 
 def annotate_sentence(sentence: str, locations: List[EntityLocation]) -> str:
     """
@@ -189,23 +312,19 @@ def annotate_sentence(sentence: str, locations: List[EntityLocation]) -> str:
     Returns:
         Sentence with entity annotations
     """
-    # Sort locations by start position in reverse order (to avoid position shifts)
-    locations.sort(key=lambda loc: loc.start, reverse=True)
-    
-    # Make a copy of the sentence
-    annotated = sentence
-    
-    # Insert annotations
-    for loc in locations:
-        prefix = annotated[:loc.end]
-        suffix = annotated[loc.end:]
-        annotated = f"{prefix}[{loc.category}]{suffix}"
-        
-        prefix = annotated[:loc.start]
-        suffix = annotated[loc.start:]
-        annotated = f"{prefix}«{suffix}"
+    # Collect the text between and inside locations, then join once;
+    # a location overlapping an earlier one (or repeating it) is skipped
+    pieces = []
+    position = 0
+    for loc in sorted(locations, key=lambda loc: (loc.start, -loc.end)):
+        if loc.start < position:
+            continue
+        pieces.append(sentence[position:loc.start])
+        pieces.append(f"«{sentence[loc.start:loc.end]}[{loc.category}]")
+        position = loc.end
+    pieces.append(sentence[position:])
     
-    return annotated
+    return "".join(pieces)
 
 def print_entity_info(sentence: str, locations: List[EntityLocation]):
     """Print information about entities in a sentence"""
@@ -219,6 +338,241 @@ def print_entity_info(sentence: str, locations: List[EntityLocation]):
     print("\nAnnotated sentence:")
     print(annotate_sentence(sentence, locations))
 
+def read_sentence_file(path: Path) -> List[Tuple[str, Optional[str], Optional[int]]]:
+    """
+    Read sentences to classify, one per line
+    
+    Lines are either plain sentences or "hymn_id<TAB>line_num<TAB>sentence";
+    blank lines are skipped.
+    
+    Returns:
+        (sentence, hymn_id, line_num) tuples
+    """
+    sentences = []
+    with open(path, 'r', encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip():
+                continue
+            parts = line.split("\t", 2)
+            if len(parts) == 3 and parts[1].isdigit():
+                sentences.append((parts[2], parts[0], int(parts[1])))
+            else:
+                sentences.append((line, None, None))
+    return sentences
+
+def classify_file(input_path: Path, output_path: Optional[Path] = None) -> None:
+    """
+    Classify every sentence of a file with one SentenceEntityIndex
+    
+    Args:
+        input_path: Sentence file (see `read_sentence_file`)
+        output_path: Optional JSONL output, one record per sentence;
+            annotated sentences are printed otherwise
+    """
+    index = SentenceEntityIndex.load()
+    sentences = read_sentence_file(input_path)
+    
+    start_time = time.perf_counter()
+    results = index.classify_many(sentences)
+    elapsed = time.perf_counter() - start_time
+    
+    if output_path:
+        with open(output_path, 'w', encoding="utf-8") as f:
+            for (sentence, hymn_id, line_num), locations in zip(sentences, results):
+                f.write(json.dumps({
+                    "sentence": sentence,
+                    "hymn_id": hymn_id,
+                    "line_num": line_num,
+                    "entities": [
+                        {"entity": loc.entity, "category": loc.category, "start": loc.start, "end": loc.end}
+                        for loc in locations
+                    ]
+                }, ensure_ascii=False) + "\n")
+        print(f"Results saved to {output_path}")
+    else:
+        for (sentence, _, _), locations in zip(sentences, results):
+            print(annotate_sentence(sentence, locations))
+    
+    found = sum(len(locations) for locations in results)
+    print(f"Classified {len(sentences)} sentences ({found} entities) in {elapsed * 1000:.1f} ms")
+
+def iter_corpus_sentences(path: Path) -> Iterator[Tuple[str, int, str]]:
+    """
+    Stream (hymn_id, sentence_index, text) from a sentence corpus
+    
+    Supports web/public/data/hymns.json (decoded one hymn at a time) and
+    JSONL files with one sentence per line, like data/analyzed_sentences.jsonl.
+    """
+    if path.suffix == ".jsonl":
+        with open(path, 'r', encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield str(record.get("hymn_id")), record.get("sentence_index"), record.get("text", "")
+    else:
+        for hymn in iter_json_object_array(path, "hymns"):
+            for position, sentence in enumerate(hymn.get("sentences", [])):
+                yield str(hymn.get("id")), sentence.get("index", position), sentence.get("text", "")
+
+def annotate_corpus(
+    input_path: Path,
+    output_path: Path,
+    matcher: str = "patterns",
+    limit: Optional[int] = None,
+    progress_every: int = 1000
+) -> None:
+    """
+    Annotate every sentence of a corpus, writing JSONL as it goes
+    
+    Sentences are streamed in and written out one at a time, so memory
+    holds the loaded matcher and a single sentence, not the corpus.
+    
+    Args:
+        input_path: hymns.json or a sentence JSONL file (see `iter_corpus_sentences`)
+        output_path: Annotated JSONL output, replaced atomically when complete
+        matcher: "patterns" for the Aho-Corasick automaton over all entity
+            patterns, or "lines" for a SentenceEntityIndex (fuzzy corpus line match)
+        limit: Optional maximum number of sentences
+        progress_every: Print a progress line every this many sentences
+    """
+    start_time = time.perf_counter()
+    if matcher == "patterns":
+        annotator = AhoCorasickAnnotator(load_entity_patterns())
+        find = lambda text: [(m.text, m.category, m.start, m.end) for m in annotator.find(text)]
+    else:
+        index = SentenceEntityIndex.load()
+        find = lambda text: [(l.entity, l.category, l.start, l.end) for l in index.classify(text)]
+    print(f"Loaded {matcher} matcher in {time.perf_counter() - start_time:.2f}s")
+    
+    count = 0
+    found = 0
+    start_time = time.perf_counter()
+    with atomic_write(output_path) as f:
+        for hymn_id, sentence_index, text in iter_corpus_sentences(input_path):
+            if limit is not None and count >= limit:
+                break
+            entities = find(text)
+            locations = [EntityLocation(entity, category, start, end) for entity, category, start, end in entities]
+            f.write(json.dumps({
+                "hymn_id": hymn_id,
+                "sentence_index": sentence_index,
+                "text": text,
+                "annotated": annotate_sentence(text, locations),
+                "entities": [
+                    {"entity": entity, "category": category, "start": start, "end": end}
+                    for entity, category, start, end in entities
+                ]
+            }, ensure_ascii=False) + "\n")
+            count += 1
+            found += len(entities)
+            if progress_every and count % progress_every == 0:
+                elapsed = time.perf_counter() - start_time
+                print(f"  {count} sentences ({count / elapsed:,.0f} sentences/s)")
+    
+    elapsed = time.perf_counter() - start_time
+    print(f"Annotated {count} sentences ({found} entities) in {elapsed:.2f}s "
+          f"({count / max(elapsed, 1e-9):,.0f} sentences/s)")
+    print(f"Results saved to {output_path}")
+
+def linear_best_line(line_texts: Dict[str, str], sentence: str, min_score: float = MIN_MATCH_SCORE) -> Optional[str]:
+    """Reference fuzzy match: score every line, building both word sets per call"""
+    best_key, best_score = None, 0.0
+    for line_key, text in line_texts.items():
+        words = word_set(sentence)
+        score = len(words & word_set(text)) / max(1, len(words))
+        if score > best_score:
+            best_key, best_score = line_key, score
+    return best_key if best_score >= min_score else None
+
+def benchmark_fuzzy(count: int, scales: List[int]) -> None:
+    """
+    Compare fuzzy line matching by full scan and by inverted index as the
+    corpus grows
+    
+    The corpus is scaled with synthetic lines whose words are drawn from the
+    real corpus' word distribution; queries are real lines with their first
+    word dropped and no hymn/line reference.
+    
+    Args:
+        count: Number of query sentences
+        scales: Corpus size multipliers
+    """
+    line_entities = load_entity_offsets()
+    line_texts = {key: text for key, text in load_line_texts().items() if key in line_entities}
+    queries = [" ".join(text.split()[1:]) for text in list(line_texts.values())[:count]]
+    corpus_words = [word for text in line_texts.values() for word in text.split()]
+    lengths = [len(text.split()) for text in line_texts.values()]
+    rng = random.Random(0)
+    
+    print(f"{'lines':>8} | {'full scan':>12} | {'inverted index':>14} | {'scored/query':>12} | same")
+    for scale in scales:
+        texts = dict(line_texts)
+        entities = dict(line_entities)
+        for i in range(len(line_texts) * (scale - 1)):
+            key = f"Synthetic {i}"
+            texts[key] = " ".join(rng.choices(corpus_words, k=rng.choice(lengths)))
+            entities[key] = []
+        index = SentenceEntityIndex({}, entities, texts)
+        
+        start_time = time.perf_counter()
+        linear = [linear_best_line(texts, query) for query in queries]
+        linear_time = time.perf_counter() - start_time
+        
+        start_time = time.perf_counter()
+        indexed = [index.best_line(query)[0] for query in queries]
+        index_time = time.perf_counter() - start_time
+        
+        # Candidate lines scored per query
+        scored = 0
+        for query in queries:
+            words = word_set(query)
+            needed = max(1, math.ceil(MIN_MATCH_SCORE * len(words)))
+            rarest = sorted(words, key=lambda word: len(index.postings.get(word, ())))
+            scored += len({line_id for word in rarest[:len(words) - needed + 1] for line_id in index.postings.get(word, ())})
+        
+        n = max(1, len(queries))
+        print(f"{len(texts):>8} | {linear_time / n * 1000:9.3f} ms | {index_time / n * 1000:11.3f} ms | "
+              f"{scored / n:12.1f} | {linear == indexed}")
+
+def benchmark_index(count: int) -> None:
+    """
+    Compare per-sentence latency of classify_sentence (loading per call)
+    against a shared SentenceEntityIndex, on corpus lines with entities
+    
+    Args:
+        count: Number of sentences to classify with each method
+    """
+    lines = load_entity_index().lines
+    sentences = [(text, hymn_id, line_num) for hymn_id, line_num, text in lines[:count]]
+    
+    # The per-call loaders print a status line each time
+    with redirect_stdout(io.StringIO()):
+        start_time = time.perf_counter()
+        per_call = [classify_sentence(*sentence) for sentence in sentences]
+        per_call_time = time.perf_counter() - start_time
+        
+        start_time = time.perf_counter()
+        index = SentenceEntityIndex.load()
+        load_time = time.perf_counter() - start_time
+    
+    start_time = time.perf_counter()
+    shared = index.classify_many(sentences)
+    shared_time = time.perf_counter() - start_time
+    
+    same = all(
+        [(l.entity, l.category, l.start, l.end) for l in a] == [(l.entity, l.category, l.start, l.end) for l in b]
+        for a, b in zip(per_call, shared)
+    )
+    n = max(1, len(sentences))
+    print(f"Sentences: {len(sentences)}")
+    print(f"classify_sentence:   {per_call_time / n * 1000:8.3f} ms/sentence")
+    print(f"SentenceEntityIndex: {shared_time / n * 1000:8.3f} ms/sentence "
+          f"(plus {load_time * 1000:.1f} ms one-time load)")
+    print(f"Speedup: {per_call_time / max(shared_time + load_time, 1e-9):.1f}x including load, "
+          f"{per_call_time / max(shared_time, 1e-9):.0f}x per sentence")
+    print(f"Identical results: {same}")
+
 def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(
@@ -228,10 +582,33 @@ def main():
     parser.add_argument("--sentence", type=str, help="Sentence to classify")
     parser.add_argument("--hymn", type=str, help="Hymn ID", default=None)
     parser.add_argument("--line", type=int, help="Line number", default=None)
+    parser.add_argument("--file", type=str, default=None,
+                        help="Classify every sentence in a file (plain lines or hymn_id<TAB>line_num<TAB>sentence)")
+    parser.add_argument("--output", type=str, default=None, help="JSONL output for --file or --bulk")
+    parser.add_argument("--bulk", type=str, nargs="?", const=str(HYMNS_PATH), default=None, metavar="CORPUS",
+                        help=f"Annotate a whole corpus (default {HYMNS_PATH}; or {ANALYZED_SENTENCES_PATH})")
+    parser.add_argument("--matcher", type=str, choices=["patterns", "lines"], default="patterns",
+                        help="Bulk matcher: Aho-Corasick over entity patterns, or fuzzy corpus line match")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum sentences for --bulk")
+    parser.add_argument("--benchmark", type=int, default=None, metavar="N",
+                        help="Compare per-sentence latency of classify_sentence and SentenceEntityIndex on N lines")
+    parser.add_argument("--benchmark-fuzzy", type=int, default=None, metavar="N",
+                        help="Compare full-scan and inverted-index fuzzy matching latency on N queries")
+    parser.add_argument("--scales", type=str, default="1,4,16,64",
+                        help="Comma-separated corpus size multipliers for --benchmark-fuzzy")
     
     args = parser.parse_args()
     
-    if args.sentence:
+    if args.benchmark:
+        benchmark_index(args.benchmark)
+    elif args.benchmark_fuzzy:
+        benchmark_fuzzy(args.benchmark_fuzzy, [int(n) for n in args.scales.split(",")])
+    elif args.bulk:
+        output_path = Path(args.output) if args.output else DEITIES_DIR / "annotated_sentences.jsonl"
+        annotate_corpus(Path(args.bulk), output_path, args.matcher, args.limit)
+    elif args.file:
+        classify_file(Path(args.file), Path(args.output) if args.output else None)
+    elif args.sentence:
         locations = classify_sentence(args.sentence, args.hymn, args.line)
         print_entity_info(args.sentence, locations)
     else:
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Classification Service Load Test for Cleros Orphicae
+
+This script starts classification_service.py in a separate process (or
+targets a running one with --url) and drives one of its endpoints with a
+fixed number of closed-loop clients per concurrency level, reporting
+requests/s, sentences/s and latency percentiles.
+
+Request sentences are the corpus lines of the entity occurrence index, sent
+with their hymn/line reference unless --fuzzy is given.
+"""
+
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import aiohttp
+
+# Allow running as a script from the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tools.classifier_load_test import latency_report
+from tools.entity_index import load_entity_index
+
+# Constants
+SERVICE_PORT = 8766  # Keeps the test service clear of one on the default port
+ENDPOINTS = ["classify", "annotate", "classify/batch", "annotate/batch"]
+
+def request_sentences(fuzzy: bool = False) -> List[Dict[str, Any]]:
+    """Corpus lines with entities as request sentence objects"""
+    sentences = []
+    for hymn_id, line_num, text in load_entity_index().lines:
+        if fuzzy:
+            sentences.append({"sentence": text})
+        else:
+            sentences.append({"sentence": text, "hymn_id": hymn_id, "line_num": line_num})
+    return sentences
+
+async def wait_for_service(session: aiohttp.ClientSession, base_url: str, timeout: float = 30.0) -> Dict[str, Any]:
+    """Poll /health until the service answers"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            async with session.get(f"{base_url}/health") as response:
+                return await response.json()
+        except aiohttp.ClientConnectionError:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"classification service at {base_url} did not start within {timeout:.0f}s")
+            await asyncio.sleep(0.1)
+
+async def run_load(
+    session: aiohttp.ClientSession,
+    base_url: str,
+    endpoint: str,
+    sentences: List[Dict[str, Any]],
+    requests: int,
+    concurrency: int,
+    batch_size: int,
+    matcher: str
+) -> Dict[str, Any]:
+    """
+    Send `requests` requests from `concurrency` closed-loop clients
+
+    Returns:
+        Elapsed time, per-request latencies, sentences sent and failed requests
+    """
+    url = f"{base_url}/{endpoint}"
+    batch = endpoint.endswith("/batch")
+    latencies: List[float] = []
+    failed = 0
+    sent = 0
+    next_request = 0
+
+    async def client() -> None:
+        nonlocal failed, sent, next_request
+        while next_request < requests:
+            n = next_request
+            next_request += 1
+            if batch:
+                items = [sentences[(n * batch_size + i) % len(sentences)] for i in range(batch_size)]
+                payload = {"sentences": items, "matcher": matcher}
+            else:
+                items = [sentences[n % len(sentences)]]
+                payload = dict(items[0], matcher=matcher)
+
+            request_start = time.perf_counter()
+            async with session.post(url, json=payload) as response:
+                await response.read()
+                ok = response.status == 200
+            latencies.append(time.perf_counter() - request_start)
+            failed += not ok
+            sent += len(items)
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return {"elapsed": time.perf_counter() - start_time, "latencies": latencies, "sentences": sent, "failed": failed}
+
+async def run_load_tests(
+    url: str,
+    endpoint: str,
+    requests: int,
+    concurrency_levels: List[int],
+    batch_size: int,
+    matcher: str,
+    fuzzy: bool
+) -> None:
+    """Run every concurrency level and print a report line for each"""
+    sentences = request_sentences(fuzzy)
+    connector = aiohttp.TCPConnector(limit=max(concurrency_levels))
+    async with aiohttp.ClientSession(connector=connector) as session:
+        health = await wait_for_service(session, url)
+        print(f"Service at {url}: {health['entities']} entities, {health['lines']} lines, {health['patterns']} patterns")
+        print(f"Load testing POST /{endpoint} ({matcher} matcher"
+              f"{f', {batch_size} sentences per request' if endpoint.endswith('/batch') else ''}"
+              f"{', no hymn/line references' if fuzzy else ''}), {requests} requests per level\n")
+
+        # Warm up connections and the annotator's transition cache
+        await run_load(session, url, endpoint, sentences, min(requests, 200), max(concurrency_levels), batch_size, matcher)
+
+        for concurrency in concurrency_levels:
+            result = await run_load(session, url, endpoint, sentences, requests, concurrency, batch_size, matcher)
+            elapsed = result["elapsed"]
+            print(f"concurrency {concurrency:>3} | {requests / elapsed:8.0f} requests/s | "
+                  f"{result['sentences'] / elapsed:9.0f} sentences/s | {latency_report(result['latencies'])} | "
+                  f"{result['failed']} failed")
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Load test the classification service")
+    parser.add_argument("--url", type=str, default=None,
+                        help="Base URL of a running service; omit to start one in a subprocess")
+    parser.add_argument("--endpoint", choices=ENDPOINTS, default="classify", help="Endpoint to load")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per concurrency level")
+    parser.add_argument("--concurrency", type=str, default="1,4,16,64",
+                        help="Comma-separated client concurrency levels")
+    parser.add_argument("--batch-size", type=int, default=32, help="Sentences per batch request")
+    parser.add_argument("--matcher", choices=["lines", "patterns"], default="lines", help="Service matcher")
+    parser.add_argument("--fuzzy", action="store_true", help="Send sentences without hymn/line references")
+    args = parser.parse_args()
+
+    process = None
+    url = args.url
+    if url is None:
+        url = f"http://127.0.0.1:{SERVICE_PORT}"
+        process = subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve().parent / "classification_service.py"),
+             "--port", str(SERVICE_PORT)],
+            stdout=subprocess.DEVNULL
+        )
+
+    try:
+        asyncio.run(run_load_tests(
+            url.rstrip("/"),
+            args.endpoint,
+            args.requests,
+            [int(n) for n in args.concurrency.split(",")],
+            args.batch_size,
+            args.matcher,
+            args.fuzzy
+        ))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+if __name__ == "__main__":
+    main()
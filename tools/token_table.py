@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Columnar Token Table for Cleros Orphicae
+
+This script exports the linguistic features as a columnar token table in a
+NumPy .npz file, so corpus statistics are vectorized array operations
+instead of Python loops over nested per-line dicts.
+
+Token columns (one entry per token, corpus order):
+    hymn, line, position    integers (hymn is a code into the hymn_id vocabulary)
+    text, lemma, pos, dep   dictionary-encoded: int32 codes into a string vocabulary
+    head                    head token position within the line
+    chunk_root              1 if the token is the root of a noun chunk
+
+The lemma column is only present when the features store real lemmas
+(linguistic_features.jsonl version 2); features without them would only
+give lowercased words, so the column is left out rather than mislabelled.
+
+Entity columns (one entry per named entity):
+    ent_hymn, ent_line      integers
+    ent_text, ent_label     dictionary-encoded
+
+The table is rebuilt automatically when it is missing or older than the
+linguistics output; run the `build` command to rebuild it explicitly.
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# Allow running as a script from the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tools import corpus
+from tools.io_utils import atomic_write
+
+# Constants
+DATA_DIR = Path("data")
+LINGUISTICS_DIR = DATA_DIR / "enriched" / "linguistics"
+TABLE_PATH = LINGUISTICS_DIR / "token_table.npz"
+TABLE_VERSION = 2
+
+# Dictionary-encoded columns and the vocabulary each one uses
+ENCODED_COLUMNS = {"hymn": "hymn", "text": "text", "lemma": "lemma", "pos": "pos", "dep": "dep",
+                   "ent_hymn": "hymn", "ent_text": "ent_text", "ent_label": "ent_label"}
+
+class _Encoder:
+    """Assign consecutive integer codes to strings"""
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+
+    def __call__(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.codes)
+        return code
+
+    def vocabulary(self) -> np.ndarray:
+        return np.array(list(self.codes), dtype=str)
+
+class TokenTable:
+    """Column arrays plus the vocabularies of the dictionary-encoded columns"""
+
+    def __init__(self, columns: Dict[str, np.ndarray], vocabularies: Dict[str, np.ndarray]):
+        """
+        Args:
+            columns: Column name -> 1-D array (token columns share one length,
+                entity columns another)
+            vocabularies: Vocabulary name -> array of strings, indexed by code
+        """
+        self.columns = columns
+        self.vocabularies = vocabularies
+        self._codes: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def build(cls, features=None) -> "TokenTable":
+        """
+        Build the table from decoded hymn features
+
+        Args:
+            features: Hymn features; defaults to streaming the linguistics output
+        """
+        if features is None:
+            features = corpus.hymn_features()
+        encoders = {name: _Encoder() for name in set(ENCODED_COLUMNS.values())}
+        token_columns = {name: [] for name in ("hymn", "line", "position", "text", "lemma", "pos", "dep",
+                                               "head", "chunk_root")}
+        entity_columns = {name: [] for name in ("ent_hymn", "ent_line", "ent_text", "ent_label")}
+        has_lemmas = True
+
+        for hymn in features:
+            hymn_code = encoders["hymn"](str(hymn["hymn_id"]))
+            for line in hymn["per_line"]:
+                has_lemmas = has_lemmas and not line.get("lemmas_inferred")
+                n = len(line["tokens"])
+                roots = [0] * n
+                for chunk in line["noun_chunks"]:
+                    if chunk.get("root") is not None and chunk["root"] < n:
+                        roots[chunk["root"]] = 1
+                token_columns["hymn"].extend([hymn_code] * n)
+                token_columns["line"].extend([line["line_num"]] * n)
+                token_columns["position"].extend(range(n))
+                for name in ("text", "lemma", "pos", "dep"):
+                    source = line["tokens"] if name == "text" else line["lemmas" if name == "lemma" else name]
+                    token_columns[name].extend(map(encoders[name], source))
+                token_columns["head"].extend(line["heads"])
+                token_columns["chunk_root"].extend(roots)
+
+                for entity in line["entities"]:
+                    entity_columns["ent_hymn"].append(hymn_code)
+                    entity_columns["ent_line"].append(line["line_num"])
+                    entity_columns["ent_text"].append(encoders["ent_text"](entity["text"]))
+                    entity_columns["ent_label"].append(encoders["ent_label"](entity["label"]))
+
+        columns = {name: np.array(values, dtype=np.int32) for name, values in token_columns.items()}
+        columns["chunk_root"] = columns["chunk_root"].astype(np.int8)
+        columns.update({name: np.array(values, dtype=np.int32) for name, values in entity_columns.items()})
+        vocabularies = {name: encoder.vocabulary() for name, encoder in encoders.items()}
+        if not has_lemmas:
+            print("Warning: the features have no lemmas; the token table is built without a lemma column",
+                  file=sys.stderr)
+            del columns["lemma"], vocabularies["lemma"]
+        return cls(columns, vocabularies)
+
+    def save(self, path: Path = TABLE_PATH) -> None:
+        """Write the table as an uncompressed .npz (fast to load)"""
+        arrays = {f"column_{name}": array for name, array in self.columns.items()}
+        arrays.update({f"vocab_{name}": vocabulary for name, vocabulary in self.vocabularies.items()})
+        arrays["version"] = np.array(TABLE_VERSION)
+        with atomic_write(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: Path = TABLE_PATH) -> "TokenTable":
+        """Load a table written by `save`"""
+        with np.load(path) as data:
+            if int(data["version"]) != TABLE_VERSION:
+                raise ValueError(f"{path} has table version {int(data['version'])}, expected {TABLE_VERSION}")
+            columns = {key[len("column_"):]: data[key] for key in data.files if key.startswith("column_")}
+            vocabularies = {key[len("vocab_"):]: data[key] for key in data.files if key.startswith("vocab_")}
+        return cls(columns, vocabularies)
+
+    def __len__(self) -> int:
+        return len(self.columns["text"])
+
+    def __repr__(self):
+        return (f"TokenTable(tokens={len(self)}, entities={len(self.columns['ent_text'])}, "
+                f"hymns={len(self.vocabularies['hymn'])})")
+
+    @property
+    def has_lemmas(self) -> bool:
+        return "lemma" in self.columns
+
+    def column(self, name: str) -> np.ndarray:
+        """A column's array; raises ValueError for the lemma column of a table without lemmas"""
+        if name not in self.columns:
+            if name == "lemma":
+                raise ValueError("this token table has no lemma column (the features have no lemmas); "
+                                 "use the text column or re-run the linguistics stage")
+            raise ValueError(f"unknown column '{name}'")
+        return self.columns[name]
+
+    def vocabulary(self, column: str) -> np.ndarray:
+        """String vocabulary of a dictionary-encoded column"""
+        self.column(column)
+        return self.vocabularies[ENCODED_COLUMNS[column]]
+
+    def code(self, column: str, value: str) -> int:
+        """Code of a string in a column's vocabulary, or -1 if it never occurs"""
+        name = ENCODED_COLUMNS[column]
+        if name not in self._codes:
+            self._codes[name] = {value: code for code, value in enumerate(self.vocabularies[name].tolist())}
+        return self._codes[name].get(value, -1)
+
+    def mask(self, **filters: Union[str, int, Sequence]) -> np.ndarray:
+        """
+        Boolean row mask from equality filters, combined with AND
+
+        Keys are column names (token columns and entity columns cannot be
+        mixed); values are a single value or a list of accepted values.
+        Dictionary-encoded columns take strings, e.g.
+        mask(pos=["NOUN", "PROPN"], hymn="0").
+        """
+        result = None
+        for column, value in filters.items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            if column in ENCODED_COLUMNS:
+                values = [self.code(column, str(v)) for v in values]
+            array = self.column(column)
+            condition = array == values[0] if len(values) == 1 else np.isin(array, values)
+            result = condition if result is None else result & condition
+        if result is None:
+            raise ValueError("mask() needs at least one filter")
+        return result
+
+    def frequencies(self, column: str, mask: Optional[np.ndarray] = None, top: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Value counts of a dictionary-encoded column, most frequent first
+
+        Ties keep first-occurrence order (within the mask), like Counter.most_common.
+
+        Args:
+            column: Column name, e.g. "pos" or "ent_text"
+            mask: Optional boolean row mask
+            top: Number of values to return (all by default)
+        """
+        codes = self.column(column) if mask is None else self.column(column)[mask]
+        values, first, counts = np.unique(codes, return_index=True, return_counts=True)
+        order = np.lexsort((first, -counts))[:top]
+        return list(zip(self.vocabulary(column)[values[order]].tolist(), counts[order].tolist()))
+
+    def cooccurrence(
+        self,
+        column: str = "lemma",
+        mask: Optional[np.ndarray] = None,
+        top: int = 200
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Line-level co-occurrence counts of the `top` most frequent values
+
+        Args:
+            column: Token column, e.g. "lemma"
+            mask: Optional boolean row mask applied before counting
+            top: Vocabulary size of the (dense) result
+
+        Returns:
+            (values, counts) where counts[i, j] is the number of lines that
+            contain both values[i] and values[j] (the diagonal counts lines
+            containing values[i])
+        """
+        codes = self.column(column)
+        line_ids = self.line_ids()
+        if mask is not None:
+            codes, line_ids = codes[mask], line_ids[mask]
+
+        vocabulary = self.vocabulary(column)
+        counts = np.bincount(codes, minlength=len(vocabulary))
+        kept = np.argsort(-counts, kind="stable")[:top]
+        kept = kept[counts[kept] > 0]
+        slot = np.full(len(vocabulary), -1, dtype=np.int64)
+        slot[kept] = np.arange(len(kept))
+
+        # Line x value incidence matrix, then one matrix product
+        rows = slot[codes] >= 0
+        incidence = np.zeros((int(line_ids.max(initial=-1)) + 1, len(kept)), dtype=np.float32)
+        incidence[line_ids[rows], slot[codes[rows]]] = 1
+        return vocabulary[kept], (incidence.T @ incidence).astype(np.int64)
+
+    def line_ids(self) -> np.ndarray:
+        """Corpus-wide line number of every token (0-based, in corpus order)"""
+        hymn, line = self.columns["hymn"], self.columns["line"]
+        starts = np.ones(len(hymn), dtype=bool)
+        starts[1:] = (hymn[1:] != hymn[:-1]) | (line[1:] != line[:-1])
+        return np.cumsum(starts) - 1
+
+    def pos_distribution(self) -> Dict[str, int]:
+        """Token count per POS tag (linguistics_summary's pos_distribution)"""
+        return dict(self.frequencies("pos"))
+
+    def common_entities(self, top: int = 50) -> List[Tuple[str, int]]:
+        """Most frequent entity texts (linguistics_summary's most_common_entities)"""
+        return self.frequencies("ent_text", top=top)
+
+    def common_nouns(self, top: int = 50) -> List[Tuple[str, int]]:
+        """Most frequent noun-chunk root nouns (linguistics_summary's most_common_nouns)"""
+        return self.frequencies("text", mask=self.mask(pos="NOUN") & (self.columns["chunk_root"] == 1), top=top)
+
+def load_token_table(path: Path = TABLE_PATH) -> TokenTable:
+    """
+    Load the token table, building and saving it first if it is missing or
+    older than the linguistics output it was built from.
+    """
+    source = corpus.features_path()
+    if path.exists() and (not source.exists() or path.stat().st_mtime >= source.stat().st_mtime):
+        try:
+            return TokenTable.load(path)
+        except ValueError as e:
+            print(f"{e}; rebuilding")
+
+    print(f"Building token table from {source}...")
+    table = TokenTable.build()
+    table.save(path)
+    return table
+
+def loop_statistics() -> Dict[str, object]:
+    """The same statistics with Python loops over the decoded features, for comparison"""
+    pos_counts, entity_counts, noun_counts = Counter(), Counter(), Counter()
+    for hymn in corpus.hymn_features():
+        for line in hymn["per_line"]:
+            pos_counts.update(line["pos"])
+            entity_counts.update(e["text"] for e in line["entities"])
+            noun_counts.update(c["root_text"] for c in line["noun_chunks"] if c["root_pos"] == "NOUN")
+    return {
+        "pos_distribution": dict(pos_counts.most_common()),
+        "most_common_entities": entity_counts.most_common(50),
+        "most_common_nouns": noun_counts.most_common(50)
+    }
+
+def run_statistics(table: TokenTable, compare: bool = False, repeat: int = 20) -> None:
+    """Print and time the corpus statistics; optionally compare with Python loops"""
+    def timed(function):
+        start_time = time.perf_counter()
+        for _ in range(repeat):
+            result = function()
+        return result, (time.perf_counter() - start_time) / repeat
+
+    stats = {}
+    timings = {}
+    stats["pos_distribution"], timings["pos_distribution"] = timed(table.pos_distribution)
+    stats["most_common_entities"], timings["most_common_entities"] = timed(table.common_entities)
+    stats["most_common_nouns"], timings["most_common_nouns"] = timed(table.common_nouns)
+    # Without lemmas, co-occurrence is counted over surface forms and labelled as such
+    word_column = "lemma" if table.has_lemmas else "text"
+    (values, counts), timings[f"{word_column}_cooccurrence"] = timed(
+        lambda: table.cooccurrence(word_column, mask=table.mask(pos=["NOUN", "PROPN", "ADJ"]), top=300)
+    )
+
+    print(f"{table!r}\n")
+    print("Most common parts of speech:")
+    for pos, count in list(stats["pos_distribution"].items())[:8]:
+        print(f"  {pos}: {count}")
+    print("\nMost common entities:")
+    for entity, count in stats["most_common_entities"][:8]:
+        print(f"  {entity}: {count}")
+    print("\nMost common nouns:")
+    for noun, count in stats["most_common_nouns"][:8]:
+        print(f"  {noun}: {count}")
+
+    # Strongest co-occurring pairs (upper triangle, diagonal excluded)
+    upper = np.triu(counts, k=1)
+    pairs = np.dstack(np.unravel_index(np.argsort(-upper, axis=None)[:8], upper.shape))[0]
+    print(f"\nMost frequent same-line noun/adjective {'lemma' if table.has_lemmas else 'word'} pairs:")
+    for i, j in pairs:
+        print(f"  {values[i]} + {values[j]}: {upper[i, j]} lines")
+
+    print("\nTimings (mean of {} runs):".format(repeat))
+    for name, elapsed in timings.items():
+        print(f"  {name}: {elapsed * 1000:.2f} ms")
+
+    if compare:
+        start_time = time.perf_counter()
+        reference = loop_statistics()
+        loop_time = time.perf_counter() - start_time
+        vector_time = sum(timings[name] for name in ("pos_distribution", "most_common_entities", "most_common_nouns"))
+        same = (reference["pos_distribution"] == stats["pos_distribution"]
+                and reference["most_common_entities"] == stats["most_common_entities"]
+                and reference["most_common_nouns"] == stats["most_common_nouns"])
+        print(f"\nPython loops over the features file: {loop_time * 1000:.1f} ms "
+              f"(token table: {vector_time * 1000:.2f} ms), identical results: {same}")
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Build and query the columnar token table")
+    parser.add_argument("--table", type=str, default=str(TABLE_PATH), help="Token table file")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    subparsers.add_parser("build", help="Build the table from the linguistics output")
+
+    stats_parser = subparsers.add_parser("stats", help="Corpus statistics with timings")
+    stats_parser.add_argument("--compare", action="store_true",
+                              help="Also compute them with Python loops over the features")
+    stats_parser.add_argument("--repeat", type=int, default=20, help="Timed runs per statistic")
+
+    freq_parser = subparsers.add_parser("freq", help="Value counts of a column, with optional filters")
+    freq_parser.add_argument("column", type=str, choices=sorted(ENCODED_COLUMNS), help="Column to count")
+    freq_parser.add_argument("--where", type=str, nargs="*", default=[], metavar="COLUMN=VALUE",
+                             help="Filters, e.g. pos=NOUN hymn=0 (comma-separate several values)")
+    freq_parser.add_argument("--top", type=int, default=20, help="Values to print")
+
+    args = parser.parse_args()
+    path = Path(args.table)
+
+    if args.command == "build":
+        start_time = time.perf_counter()
+        table = TokenTable.build()
+        table.save(path)
+        print(f"Built {table!r} in {time.perf_counter() - start_time:.2f}s")
+        print(f"Table saved to {path} ({path.stat().st_size / 1024:.0f} KB)")
+    elif args.command == "stats":
+        start_time = time.perf_counter()
+        table = load_token_table(path)
+        print(f"Loaded in {(time.perf_counter() - start_time) * 1000:.1f} ms")
+        run_statistics(table, args.compare, args.repeat)
+    elif args.command == "freq":
+        table = load_token_table(path)
+        filters = {}
+        for condition in args.where:
+            column, _, value = condition.partition("=")
+            if column not in table.columns and column != "lemma":
+                parser.error(f"unknown column '{column}'")
+            filters[column] = [v if column in ENCODED_COLUMNS else int(v) for v in value.split(",")]
+        if not table.has_lemmas and (args.column == "lemma" or "lemma" in filters):
+            parser.error("the token table has no lemma column (the features have no lemmas)")
+        start_time = time.perf_counter()
+        counts = table.frequencies(args.column, mask=table.mask(**filters) if filters else None, top=args.top)
+        elapsed = time.perf_counter() - start_time
+        for value, count in counts:
+            print(f"  {value}: {count}")
+        print(f"\n({elapsed * 1000:.2f} ms)")
+    else:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
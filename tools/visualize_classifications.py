@@ -4,292 +4,381 @@ Visualize Deity Classifications
 
 This script generates visualizations of deity classifications from the Cleros Orphicae project.
 It displays the distribution of deity types and attributes in a user-friendly format.
+
+The classifications are reduced once to a small set of precomputed aggregates
+(category counts, a category/confidence frame with its median order, the
+attribute text and the top-entity table) that every figure draws from.
+Plotting libraries are imported only by the outputs that need them; --csv
+needs none. With --jobs the figures are rendered in parallel worker
+processes using the headless Agg backend; this only pays off on multi-core
+machines, and the job count is capped at the CPU count.
 """
 
-import json
 import argparse
-from pathlib import Path
-import matplotlib.pyplot as plt
-import pandas as pd
-from typing import Dict, List, Any
-import seaborn as sns
+import csv
+import os
+import sys
+import time
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+# Allow running as a script from the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tools import corpus
 
 # Constants
 DATA_DIR = Path("data")
 DEITIES_DIR = DATA_DIR / "enriched" / "deities"
 DEFAULT_INPUT = DEITIES_DIR / "deity_classifications.json"
+DEFAULT_DPI = 300
+TOP_N = 20
+
+# Figure name -> output file name, in rendering order
+FIGURES = {
+    "categories": "category_distribution.png",
+    "confidence": "confidence_by_category.png",
+    "attributes": "attribute_word_cloud.png",
+    "table": "top_entities.png"
+}
 
 def load_classifications(input_file: str = str(DEFAULT_INPUT)) -> List[Dict[str, Any]]:
     """Load deity classifications from JSON file"""
     try:
-        with open(input_file, 'r') as f:
-            classifications = json.load(f)
-        
+        classifications = corpus.load_json(Path(input_file))
+
         print(f"Loaded {len(classifications)} deity classifications from {input_file}")
         return classifications
     except Exception as e:
         print(f"Error loading classifications: {e}")
         return []
 
-def create_category_pie_chart(classifications: List[Dict[str, Any]], output_file: str = None) -> None:
+def sort_by_confidence(classifications: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Classifications sorted by descending confidence (stable for ties)"""
+    return sorted(classifications, key=lambda c: -c.get('confidence', 0.0))
+
+def truncate_context(context: str, length: int = 50) -> str:
+    return context[:length] + '...' if len(context) > length else context
+
+def compute_aggregates(classifications: List[Dict[str, Any]], top_n: int = TOP_N) -> Dict[str, Any]:
+    """
+    Precompute everything the figures draw, in one pass over the classifications
+
+    The result holds only plain Python values, so it is cheap to send to
+    worker processes.
+
+    Returns:
+        Dictionary with:
+            category_counts: [(category, count), ...] in first-seen order
+            confidence: {"category": [...], "confidence": [...]} columns
+            category_order: categories by descending median confidence
+            attribute_text: all attributes joined by spaces
+            table_columns, table_rows: the top_n entities by confidence
+    """
+    category_counts = Counter()
+    confidence_columns = {'category': [], 'confidence': []}
+    by_category: Dict[str, List[float]] = {}
+    attributes = []
+    for c in classifications:
+        category = c.get('category', 'Unknown')
+        confidence = c.get('confidence', 0.0)
+        category_counts[category] += 1
+        confidence_columns['category'].append(category)
+        confidence_columns['confidence'].append(confidence)
+        by_category.setdefault(category, []).append(confidence)
+        attributes.extend(c.get('attributes', []))
+
+    def median(values: List[float]) -> float:
+        values = sorted(values)
+        middle = len(values) // 2
+        return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+    category_order = sorted(by_category, key=lambda category: (-median(by_category[category]), category))
+
+    table_rows = [
+        [
+            c.get('entity', 'Unknown'),
+            c.get('category', 'Unknown'),
+            f"{c.get('confidence', 0.0):.1%}",
+            ', '.join(c.get('attributes', [])[:3]),  # Show just top 3 attributes
+            truncate_context(c.get('context', '')),
+            c.get('description', '')
+        ]
+        for c in sort_by_confidence(classifications)[:top_n]
+    ]
+
+    return {
+        "category_counts": list(category_counts.items()),
+        "confidence": confidence_columns,
+        "category_order": category_order,
+        "attribute_text": ' '.join(attributes),
+        "table_columns": ['Entity', 'Category', 'Confidence', 'Attributes', 'Context', 'Description'],
+        "table_rows": table_rows
+    }
+
+def finish_figure(plt, output_file: Optional[str], dpi: int) -> None:
+    """Save or display the current figure, then close it"""
+    if output_file:
+        plt.savefig(output_file, dpi=dpi, bbox_inches='tight')
+    else:
+        plt.tight_layout()
+        plt.show()
+    plt.close()
+
+def create_category_pie_chart(aggregates: Dict[str, Any], output_file: str = None, dpi: int = DEFAULT_DPI) -> None:
     """Create a pie chart of deity categories"""
-    # Extract categories
-    categories = [c.get('category', 'Unknown') for c in classifications]
-    category_counts = Counter(categories)
-    
+    import matplotlib.pyplot as plt
+
+    labels = [category for category, _ in aggregates["category_counts"]]
+    counts = [count for _, count in aggregates["category_counts"]]
+
     # Create figure
     plt.figure(figsize=(10, 7))
-    
+
     # Create pie chart
     plt.pie(
-        category_counts.values(), 
-        labels=category_counts.keys(),
-        autopct='%1.1f%%', 
+        counts,
+        labels=labels,
+        autopct='%1.1f%%',
         startangle=90,
-        explode=[0.05] * len(category_counts),
+        explode=[0.05] * len(counts),
         shadow=True,
         wedgeprops={'edgecolor': 'white', 'linewidth': 1}
     )
     plt.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
-    
+
     # Add title
     plt.title('Distribution of Deity Categories in Orphic Hymns', fontsize=16, pad=20)
-    
-    # Save or display
-    if output_file:
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
-        print(f"Saved category pie chart to {output_file}")
-    else:
-        plt.tight_layout()
-        plt.show()
-    plt.close()
 
-def create_confidence_boxplot(classifications: List[Dict[str, Any]], output_file: str = None) -> None:
+    finish_figure(plt, output_file, dpi)
+
+def create_confidence_boxplot(aggregates: Dict[str, Any], output_file: str = None, dpi: int = DEFAULT_DPI) -> None:
     """Create a boxplot of confidence scores by category"""
-    # Extract data
-    data = []
-    for c in classifications:
-        data.append({
-            'category': c.get('category', 'Unknown'),
-            'confidence': c.get('confidence', 0.0),
-            'entity': c.get('entity', 'Unknown')
-        })
-    
-    # Create dataframe
-    df = pd.DataFrame(data)
-    
-    # Sort by median confidence
-    category_order = df.groupby('category')['confidence'].median().sort_values(ascending=False).index
-    
+    import matplotlib.pyplot as plt
+    import pandas as pd
+    import seaborn as sns
+
+    df = pd.DataFrame(aggregates["confidence"])
+    category_order = aggregates["category_order"]
+
     # Create figure
     plt.figure(figsize=(12, 8))
-    
+
     # Create boxplot
     sns.boxplot(x='category', y='confidence', data=df, order=category_order)
-    
+
     # Add individual points
     sns.stripplot(
-        x='category', 
-        y='confidence', 
-        data=df, 
+        x='category',
+        y='confidence',
+        data=df,
         order=category_order,
-        size=5, 
-        color='black', 
+        size=5,
+        color='black',
         alpha=0.5,
         jitter=True
     )
-    
+
     # Add labels and title
     plt.xlabel('Deity Category', fontsize=12)
     plt.ylabel('Confidence Score', fontsize=12)
     plt.title('Confidence Scores by Deity Category', fontsize=16)
     plt.xticks(rotation=45, ha='right')
     plt.grid(axis='y', linestyle='--', alpha=0.7)
-    
-    # Save or display
-    if output_file:
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
-        print(f"Saved confidence boxplot to {output_file}")
-    else:
-        plt.tight_layout()
-        plt.show()
-    plt.close()
 
-def create_attribute_word_cloud(classifications: List[Dict[str, Any]], output_file: str = None) -> None:
-    """Create a word cloud of deity attributes"""
+    finish_figure(plt, output_file, dpi)
+
+def create_attribute_word_cloud(aggregates: Dict[str, Any], output_file: str = None, dpi: int = DEFAULT_DPI) -> bool:
+    """
+    Create a word cloud of deity attributes
+
+    Returns:
+        False if it was skipped (wordcloud missing or no attributes)
+    """
     try:
         from wordcloud import WordCloud
-        
-        # Extract attributes
-        all_attributes = []
-        for c in classifications:
-            all_attributes.extend(c.get('attributes', []))
-        
-        # Create attribute text
-        attribute_text = ' '.join(all_attributes)
-        
-        # Create word cloud
-        wordcloud = WordCloud(
-            width=800, 
-            height=400, 
-            background_color='white',
-            colormap='viridis',
-            contour_width=1,
-            contour_color='steelblue',
-            max_words=100
-        ).generate(attribute_text)
-        
-        # Create figure
-        plt.figure(figsize=(12, 8))
-        
-        # Plot word cloud
-        plt.imshow(wordcloud, interpolation='bilinear')
-        plt.axis("off")
-        plt.title('Common Attributes of Deities in Orphic Hymns', fontsize=16, pad=20)
-        
-        # Save or display
-        if output_file:
-            plt.savefig(output_file, dpi=300, bbox_inches='tight')
-            print(f"Saved attribute word cloud to {output_file}")
-        else:
-            plt.tight_layout()
-            plt.show()
-        plt.close()
-        
     except ImportError:
         print("WordCloud package not installed. Run 'pip install wordcloud' to enable this visualization.")
+        return False
+
+    if not aggregates["attribute_text"].strip():
+        print("No entity attributes in the classifications, skipping the attribute word cloud.")
+        return False
+
+    import matplotlib.pyplot as plt
 
-def create_entity_table(classifications: List[Dict[str, Any]], top_n: int = 20, output_file: str = None) -> None:
+    # Create word cloud
+    wordcloud = WordCloud(
+        width=800,
+        height=400,
+        background_color='white',
+        colormap='viridis',
+        contour_width=1,
+        contour_color='steelblue',
+        max_words=100
+    ).generate(aggregates["attribute_text"])
+
+    # Create figure
+    plt.figure(figsize=(12, 8))
+
+    # Plot word cloud
+    plt.imshow(wordcloud, interpolation='bilinear')
+    plt.axis("off")
+    plt.title('Common Attributes of Deities in Orphic Hymns', fontsize=16, pad=20)
+
+    finish_figure(plt, output_file, dpi)
+    return True
+
+def create_entity_table(aggregates: Dict[str, Any], output_file: str = None, dpi: int = DEFAULT_DPI) -> None:
     """Create a table of top entities with their classifications"""
-    # Extract data
-    data = []
-    for c in classifications:
-        data.append({
-            'Entity': c.get('entity', 'Unknown'),
-            'Category': c.get('category', 'Unknown'),
-            'Confidence': c.get('confidence', 0.0),
-            'Attributes': ', '.join(c.get('attributes', [])[:3]),  # Show just top 3 attributes
-            'Context': c.get('context', '')[:50] + '...' if len(c.get('context', '')) > 50 else c.get('context', ''),
-            'Description': c.get('description', '')
-        })
-    
-    # Create dataframe
-    df = pd.DataFrame(data)
-    
-    # Sort by confidence
-    df = df.sort_values('Confidence', ascending=False).head(top_n)
-    
-    # Format confidence as percentage
-    df['Confidence'] = df['Confidence'].apply(lambda x: f"{x:.1%}")
-    
+    import matplotlib.pyplot as plt
+
+    rows = aggregates["table_rows"]
+    top_n = len(rows)
+
     # Create figure
-    plt.figure(figsize=(16, top_n * 0.6))  # Make figure wider to accommodate the context
-    
+    plt.figure(figsize=(16, max(top_n, 1) * 0.6))  # Make figure wider to accommodate the context
+
     # Hide axes
     ax = plt.gca()
     ax.axis('off')
-    
+
     # Create table
     table = plt.table(
-        cellText=df.values,
-        colLabels=df.columns,
+        cellText=rows,
+        colLabels=aggregates["table_columns"],
         loc='center',
         cellLoc='left',
         colWidths=[0.12, 0.12, 0.08, 0.15, 0.25, 0.28]  # Adjusted column widths
     )
-    
+
     # Style table
     table.auto_set_font_size(False)
     table.set_fontsize(9)  # Slightly smaller font to fit more text
     table.scale(1, 1.5)
-    
+
     # Add title
     plt.title(f'Top {top_n} Entities by Classification Confidence', fontsize=16, pad=20)
-    
-    # Save or display
-    if output_file:
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
-        print(f"Saved entity table to {output_file}")
-    else:
-        plt.tight_layout()
-        plt.show()
-    plt.close()
+
+    finish_figure(plt, output_file, dpi)
+
+RENDERERS = {
+    "categories": create_category_pie_chart,
+    "confidence": create_confidence_boxplot,
+    "attributes": create_attribute_word_cloud,
+    "table": create_entity_table
+}
+
+def render_figure(name: str, aggregates: Dict[str, Any], output_file: Optional[str], dpi: int) -> Tuple[str, bool, float]:
+    """
+    Render one figure and time it
+
+    Returns:
+        (name, whether it was drawn, wall-clock seconds)
+    """
+    start_time = time.perf_counter()
+    drawn = RENDERERS[name](aggregates, output_file, dpi) is not False
+    return name, drawn, time.perf_counter() - start_time
+
+def _use_agg() -> None:
+    """Worker initializer: headless rendering"""
+    import matplotlib
+    matplotlib.use("Agg")
 
 def export_csv(classifications: List[Dict[str, Any]], output_file: str) -> None:
     """Export classifications to CSV for easier viewing"""
-    # Extract data
-    data = []
-    for c in classifications:
-        data.append({
-            'Entity': c.get('entity', 'Unknown'),
-            'Category': c.get('category', 'Unknown'),
-            'Confidence': c.get('confidence', 0.0),
-            'Description': c.get('description', ''),
-            'Attributes': ', '.join(c.get('attributes', [])),
-            'Context': c.get('context', '')
-        })
-    
-    # Create dataframe
-    df = pd.DataFrame(data)
-    
-    # Sort by confidence
-    df = df.sort_values('Confidence', ascending=False)
-    
-    # Save to CSV
-    df.to_csv(output_file, index=False)
-    print(f"Exported {len(df)} classifications to {output_file}")
-
-def create_visualizations(input_file: str, output_dir: str = None, show: bool = False) -> None:
-    """Create all visualizations from classifications"""
+    columns = ['Entity', 'Category', 'Confidence', 'Description', 'Attributes', 'Context']
+    with open(output_file, 'w', newline='', encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for c in sort_by_confidence(classifications):
+            writer.writerow([
+                c.get('entity', 'Unknown'),
+                c.get('category', 'Unknown'),
+                c.get('confidence', 0.0),
+                c.get('description', ''),
+                ', '.join(c.get('attributes', [])),
+                c.get('context', '')
+            ])
+    print(f"Exported {len(classifications)} classifications to {output_file}")
+
+def create_visualizations(
+    input_file: str,
+    output_dir: str = None,
+    show: bool = False,
+    jobs: int = 1,
+    dpi: int = DEFAULT_DPI,
+    figures: Optional[List[str]] = None
+) -> None:
+    """
+    Create all visualizations from classifications
+
+    Args:
+        input_file: Classification JSON file
+        output_dir: Directory for the figures and the CSV export
+        show: Display the figures instead of saving them
+        jobs: Worker processes for saving figures (1 renders in this process);
+            capped at the CPU count and the number of figures
+        dpi: Resolution of saved figures
+        figures: Figure names to render (default: all of FIGURES)
+    """
     # Load classifications
     classifications = load_classifications(input_file)
-    
+
     if not classifications:
         return
-    
-    # Create output directory if needed
-    if output_dir:
-        output_path = Path(output_dir)
-        output_path.mkdir(parents=True, exist_ok=True)
-    
-    # Generate visualizations
+    if not show and not output_dir:
+        return
+
+    start_time = time.perf_counter()
+    aggregates = compute_aggregates(classifications)
+    print(f"Computed figure aggregates in {(time.perf_counter() - start_time) * 1000:.1f} ms")
+    names = figures or list(FIGURES)
+
     if show:
         # Display visualizations
-        create_category_pie_chart(classifications)
-        create_confidence_boxplot(classifications)
-        create_attribute_word_cloud(classifications)
-        create_entity_table(classifications)
+        for name in names:
+            render_figure(name, aggregates, None, dpi)
+        return
+
+    # Save visualizations
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    outputs = {name: str(output_path / FIGURES[name]) for name in names}
+
+    # Extra processes only add start-up and pickling cost without spare cores
+    cpus = os.cpu_count() or 1
+    if jobs > cpus:
+        print(f"Capping --jobs {jobs} at {cpus} (CPU count)")
+    jobs = max(1, min(jobs, cpus, len(names)))
+
+    start_time = time.perf_counter()
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_use_agg) as executor:
+            futures = [executor.submit(render_figure, name, aggregates, outputs[name], dpi) for name in names]
+            results = [future.result() for future in futures]
     else:
-        # Save visualizations
-        if output_dir:
-            create_category_pie_chart(
-                classifications, 
-                output_file=str(output_path / "category_distribution.png")
-            )
-            create_confidence_boxplot(
-                classifications, 
-                output_file=str(output_path / "confidence_by_category.png")
-            )
-            create_attribute_word_cloud(
-                classifications, 
-                output_file=str(output_path / "attribute_word_cloud.png")
-            )
-            create_entity_table(
-                classifications, 
-                output_file=str(output_path / "top_entities.png")
-            )
-            
-            # Export to CSV for easier viewing
-            export_csv(
-                classifications,
-                output_file=str(output_path / "deity_classifications.csv")
-            )
+        _use_agg()
+        results = [render_figure(name, aggregates, outputs[name], dpi) for name in names]
+
+    for name, drawn, elapsed in results:
+        if drawn:
+            print(f"Saved {name} figure to {outputs[name]} ({elapsed:.2f}s)")
+    mode = f"in {jobs} processes" if jobs > 1 else "serially"
+    print(f"Rendered {sum(drawn for _, drawn, _ in results)} figures {mode} in "
+          f"{time.perf_counter() - start_time:.2f}s wall-clock")
+
+    # Export to CSV for easier viewing
+    export_csv(
+        classifications,
+        output_file=str(output_path / "deity_classifications.csv")
+    )
 
 def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(description="Visualize deity classifications")
-    
+
     parser.add_argument("--input", type=str, default=str(DEFAULT_INPUT),
                         help="Input classification JSON file")
     parser.add_argument("--output-dir", type=str, default=None,
@@ -297,16 +386,28 @@ def main():
     parser.add_argument("--show", action="store_true",
                         help="Display visualizations instead of saving")
     parser.add_argument("--csv", type=str, help="Export results to CSV file")
-    
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Render saved figures in this many processes (0 = one per CPU; capped at "
+                             "the CPU count). Only faster on multi-core machines")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI, help="Resolution of saved figures")
+    parser.add_argument("--figures", type=str, default=None,
+                        help=f"Comma-separated figures to render: {', '.join(FIGURES)} (default: all)")
+
     args = parser.parse_args()
-    
+
+    figures = args.figures.split(",") if args.figures else None
+    unknown = set(figures or []) - set(FIGURES)
+    if unknown:
+        parser.error(f"unknown figure(s): {', '.join(sorted(unknown))}")
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+
     # Load classifications for CSV export
     if args.csv:
         classifications = load_classifications(args.input)
         if classifications:
             export_csv(classifications, args.csv)
     else:
-        create_visualizations(args.input, args.output_dir, args.show)
+        create_visualizations(args.input, args.output_dir, args.show, jobs, args.dpi, figures)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()